@@ -1,8 +1,11 @@
 import streamlit as st
-from PyPDF2 import PdfReader
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from screener import instrumentation, screen_resumes
+from screener.structure import hybrid_scores
+from st_cache import (extract_uploads, file_digest, inputs_key, rank_incremental, recall_result, recall_trace,
+                      remember_result, remember_trace)
+from st_jobs import forget_job, job_panel, run_in_background, submit_job
+from st_perf import performance_panel
+from st_results import duplicates_panel, ranked_results, results_view
 
 # Set Streamlit Page Config
 st.set_page_config(
@@ -95,29 +98,22 @@ div[data-testid="stSubheader"] { /* Subheaders */
 """
 st.markdown(custom_css, unsafe_allow_html=True)
 
-# Function to extract text from PDFs
-def extract_text_from_pdf(uploaded_file):
-    pdf = PdfReader(uploaded_file)
-    text = ""
-    for page in pdf.pages:
-        page_text = page.extract_text()
-        if page_text:  
-            text += page_text + "\n"
-    return text  
+# Function to extract text from many PDFs at once (parallel worker processes,
+# cached by content so reruns with the same uploads skip parsing)
+def extract_texts_from_pdfs(uploaded_files, progress_bar=None):
+    return extract_uploads(uploaded_files, progress_bar=progress_bar)
 
 # Function to rank resumes based on job description
 def rank_resumes(job_description, resumes_text_list): # Renamed for clarity
-    documents = [job_description] + resumes_text_list # Use the list of resume texts
-    vectorizer = TfidfVectorizer(stop_words='english').fit_transform(documents) # Added stop_words
-    vectors = vectorizer.toarray()
-
-    # Calculate cosine similarity
-    job_description_vector = vectors[0]  
-    resume_vectors = vectors[1:]  
-    cosine_similarities = cosine_similarity([job_description_vector], resume_vectors).flatten()
-    
+    # Sparse TF-IDF cosine similarity; resumes already seen for this JD in the
+    # session are not re-tokenized (same scores as a full refit)
+    cosine_similarities = rank_incremental("app", job_description, resumes_text_list)
     return cosine_similarities
 
+# Text similarity blended with the structural match (skills, titles, degree, experience)
+def rank_resumes_hybrid(job_description, resumes_text_list):
+    return hybrid_scores(job_description, resumes_text_list, rank_resumes(job_description, resumes_text_list)).scores
+
 # --- Streamlit App UI ---
 st.markdown("<h1 style='text-align: center;'>🚀 AI Resume Screening & Candidate Ranking</h1>", unsafe_allow_html=True)
 st.markdown("---") # Add a horizontal rule for separation
@@ -135,75 +131,86 @@ uploaded_files = st.file_uploader(
     key="resume_uploader"
 )
 
+use_structure = st.checkbox("Blend in skills, titles, degree and experience", value=False, key="use_structure")
+profile_run = st.checkbox("Profile this run (cProfile + tracemalloc)", value=False, key="profile_run")
+background = run_in_background(len(uploaded_files or []), "background")
+
+# Results are kept in session state keyed by the inputs, so reruns caused by
+# other widgets (top-K, download button, ...) redraw them without recomputing
+ranking_key = inputs_key(job_description, [file_digest(f) for f in uploaded_files or []], use_structure)
+
 # "Rank Resumes" Button
 if st.button("✨ Rank Resumes", key="rank_button"):
-    if uploaded_files and job_description.strip(): # Ensure job description is not just whitespace
-        with st.spinner("Analyzing resumes... Please wait. 🧠"):
-            resumes_data = [] # To store file names and extracted text
-            for file in uploaded_files:
-                text = extract_text_from_pdf(file)
-                if text.strip(): # Ensure extracted text is not empty
-                    resumes_data.append({"name": file.name, "text": text})
-                else:
-                    st.warning(f"Could not extract text from '{file.name}' or it's empty. Skipping.")
-            
-            if not resumes_data:
-                st.error("No processable text found in the uploaded resumes. Please check the PDF files.")
-            else:
-                resume_texts_for_ranking = [r["text"] for r in resumes_data]
-                resume_names_for_display = [r["name"] for r in resumes_data]
-
-                # Rank resumes
-                scores = rank_resumes(job_description, resume_texts_for_ranking)
-
-                # Convert scores to percentage and format
-                # IMPORTANT: Consider how you want to scale this.
-                # A direct multiplication by 100 might be too simplistic.
-                # You might want to normalize or apply a curve if scores are often low.
-                # For this example, we'll do a direct conversion and add a threshold interpretation.
-                
-                acceptability_scores_percent = [score * 100 for score in scores]
-
-                # Display results
-                results_df = pd.DataFrame({
-                    "Resume File Name": resume_names_for_display, 
-                    "Acceptability Score (%)": acceptability_scores_percent
-                })
-                results_df = results_df.sort_values(by="Acceptability Score (%)", ascending=False)
-                
-                # Format the score to two decimal places
-                results_df["Acceptability Score (%)"] = results_df["Acceptability Score (%)"].map('{:.2f}%'.format)
-
-
-                st.markdown("---") # Separator
-                st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🏆 Ranked Candidate Results 🏆</h3>", unsafe_allow_html=True)
-                
-                # Display results table (using st.dataframe for better interactivity if needed, or st.table for static)
-                # st.dataframe(results_df.style.set_properties(**{ # Old styling
-                #     'background-color': '#1e1e1e',
-                #     'color': 'white',
-                #     'border-color': '#00ffcc'
-                # }))
-                # For full width and custom CSS application:
-                st.markdown(results_df.to_html(escape=False, index=False), unsafe_allow_html=True)
-
-
-                # Optional: Add interpretation based on scores
-                st.markdown("---")
-                st.subheader("💡 Score Interpretation Guide (Example)")
-                st.info("""
-                - **> 80%:** Strong match, high potential.
-                - **60% - 80%:** Good match, worth considering.
-                - **40% - 60%:** Moderate match, review details carefully.
-                - **< 40%:** Low match, likely not suitable based on text similarity.
-                
-                *Note: This TF-IDF based score primarily reflects keyword similarity. For deeper contextual understanding, more advanced models (like BERT, mentioned in Future Scope) would be beneficial.*
-                """)
+    if uploaded_files and job_description.strip() and background:
+        # Extraction and ranking run in a worker process; the page follows the job via ?job=
+        submit_job(uploaded_files, job_description=job_description, structure=use_structure)
+    elif uploaded_files and job_description.strip(): # Ensure job description is not just whitespace
+        forget_job()
+        with st.spinner("Analyzing resumes... Please wait. 🧠"), \
+                instrumentation.trace("app_rank", profile=profile_run) as rank_trace:
+            progress_bar = st.progress(0.0)
+            extracted = extract_texts_from_pdfs(uploaded_files, progress_bar)
+            progress_bar.empty()
+
+            # Skips empty/unreadable files (reported as warnings) and ranks the rest
+            ranking = screen_resumes(job_description, extracted,
+                                     rank=rank_resumes_hybrid if use_structure else rank_resumes)
+            del extracted  # the texts are vectorized; only names and scores are kept
+        remember_result("app", ranking_key, ranking)
+        remember_trace("app", ranking_key, rank_trace)
     elif not job_description.strip():
         st.error("🚨 Please enter a job description before ranking.")
     elif not uploaded_files:
         st.error("🚨 Please upload at least one resume before ranking.")
 
+# A finished background job (followed through the query string) takes the place of a session result
+finished_job = job_panel()
+if finished_job is not None:
+    ranking_key = inputs_key("job", finished_job.job_id)
+    ranking, rank_trace = finished_job.ranking, finished_job.trace
+else:
+    ranking, rank_trace = recall_result("app", ranking_key), recall_trace("app", ranking_key)
+render_trace = None
+if ranking is not None:
+    for warning in ranking.warnings:
+        st.warning(warning.message)
+    duplicates_panel(ranking.duplicates)
+
+    if ranking.scores is None:
+        st.error("No processable text found in the uploaded resumes. Please check the PDF files.")
+    else:
+        resume_names_for_display = ranking.names
+        scores = ranking.scores
+
+        # Convert scores to percentage and format
+        # IMPORTANT: Consider how you want to scale this.
+        # A direct multiplication by 100 might be too simplistic.
+        # You might want to normalize or apply a curve if scores are often low.
+        # For this example, we'll do a direct conversion and add a threshold interpretation.
+        
+        st.markdown("---") # Separator
+        st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🏆 Ranked Candidate Results 🏆</h3>", unsafe_allow_html=True)
+
+        # The full ranking stays server-side; only one page of the selected
+        # score band is formatted and sent, and downloads are built on click
+        with instrumentation.trace("app_render") as render_trace:
+            results = ranked_results(ranking_key, resume_names_for_display, scores)
+            results_view(results, "app_results", score_header="Acceptability Score (%)")
+
+        # Optional: Add interpretation based on scores
+        st.markdown("---")
+        st.subheader("💡 Score Interpretation Guide (Example)")
+        st.info("""
+        - **> 80%:** Strong match, high potential.
+        - **60% - 80%:** Good match, worth considering.
+        - **40% - 60%:** Moderate match, review details carefully.
+        - **< 40%:** Low match, likely not suitable based on text similarity.
+        
+        *Note: This TF-IDF based score primarily reflects keyword similarity. For deeper contextual understanding, more advanced models (like BERT, mentioned in Future Scope) would be beneficial.*
+        """)
+
+    performance_panel(rank_trace, render_trace)
+
 # Footer or additional information
 st.markdown("---")
 st.markdown("<p style='text-align: center; color: #aaa;'>AI Resume Screening Tool v1.0</p>", unsafe_allow_html=True)
\ No newline at end of file
@@ -1,9 +1,10 @@
 import streamlit as st
-from PyPDF2 import PdfReader
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import operator # For sorting dictionary by value
+import screener
+from screener import instrumentation
+from screener.job_profiles import PREDEFINED_JOB_PROFILES as ALL_JOB_PROFILES
+from st_cache import cached_profile_index, file_digest, inputs_key, recall_result, recall_trace, remember_result, remember_trace
+from st_perf import performance_panel
+from st_results import ranked_results, results_view
 
 # Set Streamlit Page Config
 st.set_page_config(
@@ -34,86 +35,36 @@ div[data-testid="stSubheader"] { background-color: rgba(0, 255, 204, 0.1); paddi
 st.markdown(custom_css, unsafe_allow_html=True)
 
 # --- Predefined Job Profiles ---
-# For a real application, load these from files or a database
+# The technical subset of the shared profiles in screener/job_profiles.py
 PREDEFINED_JOB_PROFILES = {
-    "Software Engineer (Backend)": """
-        We are looking for a skilled Backend Software Engineer proficient in Python, Django, and REST APIs.
-        Experience with database technologies like PostgreSQL or MySQL, and cloud platforms like AWS or Azure is essential.
-        Responsibilities include designing and developing server-side logic, defining and maintaining databases,
-        and ensuring high performance and responsiveness to requests from the front-end.
-        Familiarity with version control (Git) and agile methodologies is a plus.
-        Strong problem-solving skills and ability to work in a team.
-    """,
-    "Data Scientist": """
-        Seeking a Data Scientist with a strong background in statistical analysis, machine learning, and data visualization.
-        Proficiency in Python (Pandas, NumPy, Scikit-learn, TensorFlow/PyTorch) and SQL is required.
-        The ideal candidate will be able to develop predictive models, perform data mining,
-        and communicate insights effectively to stakeholders. Experience with big data technologies (e.g., Spark) is a plus.
-        Master's or PhD in a quantitative field preferred.
-    """,
-    "Frontend Developer (React)": """
-        Join our team as a Frontend Developer specializing in React.js.
-        You will be responsible for developing and implementing user interface components using React.js concepts and workflows such as Redux, Flux, and Webpack.
-        Strong proficiency in JavaScript, HTML, CSS, and experience with RESTful APIs are crucial.
-        Experience with UI/UX design principles and modern frontend build pipelines and tools.
-        Ability to translate designs and wireframes into high-quality code.
-    """,
-    "DevOps Engineer": """
-        We need a DevOps Engineer to help us build and maintain our CI/CD pipelines and cloud infrastructure.
-        Skills in scripting (Bash, Python), containerization (Docker, Kubernetes), infrastructure as code (Terraform, Ansible),
-        and cloud platforms (AWS, GCP, Azure) are required.
-        Experience with monitoring tools (Prometheus, Grafana) and version control (Git).
-        Focus on automation, scalability, and reliability.
-    """,
-    "UX/UI Designer": """
-        Creative UX/UI Designer needed to craft intuitive and engaging user experiences for web and mobile applications.
-        Proficiency in design tools like Figma, Sketch, or Adobe XD.
-        Strong portfolio showcasing user-centered design solutions, wireframes, prototypes, and visual designs.
-        Understanding of usability principles, interaction design, and responsive design.
-        Ability to conduct user research and translate findings into design improvements.
-    """
+    name: ALL_JOB_PROFILES[name]
+    for name in [
+        "Software Engineer (Backend)",
+        "Data Scientist",
+        "Frontend Developer (React)",
+        "DevOps Engineer",
+        "UX/UI Designer",
+    ]
 }
 
-# Function to extract text from PDFs
+# Function to extract text from PDFs (cached by content; page errors come back as warnings)
 def extract_text_from_pdf(uploaded_file):
-    pdf = PdfReader(uploaded_file)
-    text = ""
-    for page_num, page in enumerate(pdf.pages): # Added page_num for potential debugging
-        try:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        except Exception as e:
-            st.warning(f"Could not extract text from page {page_num + 1} of {uploaded_file.name}. Error: {e}")
-    return text.strip()
+    result = screener.extract_text_from_pdf(uploaded_file)
+    for page_warning in result.warnings:
+        st.warning(page_warning)
+    return result.text
 
 # Function to find the best matching job profiles for a single resume
 def match_resume_to_profiles(resume_text, job_profiles_dict):
-    profile_names = list(job_profiles_dict.keys())
-    profile_descriptions = list(job_profiles_dict.values())
-
-    # The resume text is the "query document"
-    # The profile descriptions are the "corpus documents"
-    documents = [resume_text] + profile_descriptions
-    
-    try:
-        vectorizer = TfidfVectorizer(stop_words='english').fit_transform(documents)
-        vectors = vectorizer.toarray()
-    except ValueError as e:
+    # The profile side is fitted once (vocabulary/IDF + normalized profile matrix),
+    # cached across sessions and reruns; only the resume is transformed on each call.
+    match = screener.match_resume_to_profiles(resume_text, job_profiles_dict, index_loader=cached_profile_index)
+    for warning in match.warnings:
         # This can happen if all documents are empty after stopword removal
-        st.error(f"TF-IDF Vectorization Error: {e}. This might be due to very short or common text in resume/profiles.")
-        return {} # Return empty dict on error
-
-    resume_vector = vectors[0]
-    profile_vectors = vectors[1:]
-
-    similarities = cosine_similarity([resume_vector], profile_vectors).flatten()
-
-    # Create a dictionary of profile names and their scores
-    matched_scores = dict(zip(profile_names, similarities))
+        st.error(f"{warning.message} This might be due to very short or common text in resume/profiles.")
 
-    # Sort by score in descending order
-    sorted_matches = dict(sorted(matched_scores.items(), key=operator.itemgetter(1), reverse=True))
+    # Profile names -> scores, already sorted by score in descending order
+    sorted_matches = match.matches
     
     return sorted_matches
 
@@ -129,9 +80,14 @@ uploaded_resume = st.file_uploader(
     key="resume_matcher_uploader"
 )
 
+# Last match is kept in session state keyed by the uploaded file, so reruns redraw it for free
+match_key = inputs_key(file_digest(uploaded_resume)) if uploaded_resume is not None else None
+profile_run = st.checkbox("Profile this run (cProfile + tracemalloc)", value=False, key="profile_run")
+
 if st.button("🔍 Find Matching Job Profiles", key="match_button"):
     if uploaded_resume is not None:
-        with st.spinner("Analyzing your resume against job profiles... 🛠️"):
+        with st.spinner("Analyzing your resume against job profiles... 🛠️"), \
+                instrumentation.trace("app2_match", profile=profile_run) as match_trace:
             resume_text = extract_text_from_pdf(uploaded_resume)
 
             if not resume_text:
@@ -141,45 +97,38 @@ if st.button("🔍 Find Matching Job Profiles", key="match_button"):
                 # st.info(resume_text[:500] + "...")
 
                 matched_profiles_scores = match_resume_to_profiles(resume_text, PREDEFINED_JOB_PROFILES)
-
-                if not matched_profiles_scores:
-                    st.warning("Could not calculate matches. Please check the console for errors if any.")
-                else:
-                    st.markdown("---")
-                    st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🌟 Top Matching Job Profiles 🌟</h3>", unsafe_allow_html=True)
-
-                    # Prepare data for display
-                    profile_names = []
-                    match_percentages = []
-                    descriptions_to_show = [] # To show snippets of job descriptions
-
-                    for profile, score in matched_profiles_scores.items():
-                        profile_names.append(profile)
-                        match_percentages.append(f"{score*100:.2f}%")
-                        # Show first 150 chars of the job description as a snippet
-                        descriptions_to_show.append(PREDEFINED_JOB_PROFILES[profile][:150].replace('\n', ' ') + "...")
-
-
-                    results_df = pd.DataFrame({
-                        "Job Profile": profile_names,
-                        "Match Score": match_percentages,
-                        "Description Snippet": descriptions_to_show 
-                    })
-                    
-                    # Display results table
-                    st.markdown(results_df.to_html(escape=False, index=False), unsafe_allow_html=True)
-                    
-                    # Optionally, display the full description of the top match
-                    if results_df.shape[0] > 0:
-                        top_match_profile_name = results_df.iloc[0]["Job Profile"]
-                        st.markdown("---")
-                        st.subheader(f"Details for Top Match: {top_match_profile_name}")
-                        with st.expander("View Full Job Description"):
-                            st.markdown(f"<pre style='color:white; background-color:rgba(30,30,30,0.7); padding:10px; border-radius:5px; white-space:pre-wrap;'>{PREDEFINED_JOB_PROFILES[top_match_profile_name]}</pre>", unsafe_allow_html=True)
-
+                remember_result("app2", match_key, matched_profiles_scores)
+        remember_trace("app2", match_key, match_trace)
 
     else:
         st.error("🚨 Please upload a resume before matching.")
 
+matched_profiles_scores = recall_result("app2", match_key) if match_key is not None else None
+if matched_profiles_scores is not None:
+    if not matched_profiles_scores:
+        st.warning("Could not calculate matches. Please check the console for errors if any.")
+    else:
+        st.markdown("---")
+        st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🌟 Top Matching Job Profiles 🌟</h3>", unsafe_allow_html=True)
+
+        # Description snippets are built for the rows on the current page only
+        def description_snippets(rows):
+            # Show first 150 chars of the job description as a snippet
+            return {"Description Snippet": [PREDEFINED_JOB_PROFILES[results.names[i]][:150].replace('\n', ' ') + "..." for i in rows]}
+
+        with instrumentation.trace("app2_render") as render_trace:
+            results = ranked_results(match_key, matched_profiles_scores.keys(), list(matched_profiles_scores.values()))
+            results_view(results, "app2_results", name_header="Job Profile", score_header="Match Score",
+                         file_stem="matching_profiles", details=description_snippets)
+
+        # Optionally, display the full description of the top match
+        top_match_profile_name = results.names[results.order[0]]
+        st.markdown("---")
+        st.subheader(f"Details for Top Match: {top_match_profile_name}")
+        with st.expander("View Full Job Description"):
+            st.markdown(f"<pre style='color:white; background-color:rgba(30,30,30,0.7); padding:10px; border-radius:5px; white-space:pre-wrap;'>{PREDEFINED_JOB_PROFILES[top_match_profile_name]}</pre>", unsafe_allow_html=True)
+
+        performance_panel(recall_trace("app2", match_key), render_trace)
+
 st.markdown("---")
 st.markdown("<p style='text-align: center; color: #aaa;'>AI Job Profile Matcher v1.0</p>", unsafe_allow_html=True)
\ No newline at end of file
@@ -1,9 +1,19 @@
+import json
+import re
+from pathlib import Path
+
+import numpy as np
 import streamlit as st
-from PyPDF2 import PdfReader
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import operator # For sorting dictionary by value
+import screener
+from screener import instrumentation
+from screener.job_profiles import PREDEFINED_JOB_PROFILES  # shared with the library/service
+from screener.results import matrix_export
+from screener.structure import hybrid_scores
+from st_cache import (cached_profile_index, extract_uploads, file_digest, inputs_key,
+                      rank_incremental, recall_result, recall_trace, remember_result, remember_trace)
+from st_jobs import forget_job, job_panel, run_in_background, submit_job
+from st_perf import performance_panel
+from st_results import duplicates_panel, export_bytes, ranked_results, results_view
 
 # Set Streamlit Page Config
 st.set_page_config(
@@ -54,121 +64,113 @@ div[data-testid="stSubheader"] { background-color: rgba(0, 255, 204, 0.1); paddi
 """
 st.markdown(custom_css, unsafe_allow_html=True)
 
-# --- Predefined Job Profiles ---
-PREDEFINED_JOB_PROFILES = {
-    "Software Engineer (Backend)": """
-        We are looking for a skilled Backend Software Engineer proficient in Python, Django, and REST APIs.
-        Experience with database technologies like PostgreSQL or MySQL, and cloud platforms like AWS or Azure is essential.
-        Responsibilities include designing and developing server-side logic, defining and maintaining databases,
-        and ensuring high performance and responsiveness to requests from the front-end.
-        Familiarity with version control (Git) and agile methodologies is a plus.
-        Strong problem-solving skills and ability to work in a team.
-    """,
-    "Data Scientist": """
-        Seeking a Data Scientist with a strong background in statistical analysis, machine learning, and data visualization.
-        Proficiency in Python (Pandas, NumPy, Scikit-learn, TensorFlow/PyTorch) and SQL is required.
-        The ideal candidate will be able to develop predictive models, perform data mining,
-        and communicate insights effectively to stakeholders. Experience with big data technologies (e.g., Spark) is a plus.
-        Master's or PhD in a quantitative field preferred.
-    """,
-    "Frontend Developer (React)": """
-        Join our team as a Frontend Developer specializing in React.js.
-        You will be responsible for developing and implementing user interface components using React.js concepts and workflows such as Redux, Flux, and Webpack.
-        Strong proficiency in JavaScript, HTML, CSS, and experience with RESTful APIs are crucial.
-        Experience with UI/UX design principles and modern frontend build pipelines and tools.
-        Ability to translate designs and wireframes into high-quality code.
-    """,
-    "DevOps Engineer": """
-        We need a DevOps Engineer to help us build and maintain our CI/CD pipelines and cloud infrastructure.
-        Skills in scripting (Bash, Python), containerization (Docker, Kubernetes), infrastructure as code (Terraform, Ansible),
-        and cloud platforms (AWS, GCP, Azure) are required.
-        Experience with monitoring tools (Prometheus, Grafana) and version control (Git).
-        Focus on automation, scalability, and reliability.
-    """,
-    "UX/UI Designer": """
-        Creative UX/UI Designer needed to craft intuitive and engaging user experiences for web and mobile applications.
-        Proficiency in design tools like Figma, Sketch, or Adobe XD.
-        Strong portfolio showcasing user-centered design solutions, wireframes, prototypes, and visual designs.
-        Understanding of usability principles, interaction design, and responsive design.
-        Ability to conduct user research and translate findings into design improvements.
-    """,
-    "Human Resources (HR) Manager": """
-        Experienced HR Manager to oversee all aspects of human resources practices and processes.
-        Responsibilities include developing and implementing HR strategies and initiatives aligned with the overall business strategy,
-        managing recruitment and selection process, bridging management and employee relations, and managing compensation and benefits.
-        Strong knowledge of labor law and HR best practices. Degree in Human Resources or related field.
-    """,
-    "Recruitment Specialist (Talent Acquisition)": """
-        Dynamic Recruitment Specialist to lead our talent acquisition efforts.
-        This role involves sourcing candidates through various channels, planning interview and selection procedures,
-        hosting or participating in career events, and developing long-term recruiting strategies.
-        Proven experience as a Recruitment Specialist, Technical Recruiter or similar role.
-        Excellent communication and interpersonal skills. Familiarity with Applicant Tracking Systems (ATS) and resume databases.
-    """,
-    "Project Manager (IT)": """
-        Seeking an IT Project Manager to be responsible for planning, executing, and finalizing IT projects according to strict deadlines and within budget.
-        This includes acquiring resources and coordinating the efforts of team members and third-party contractors or consultants.
-        Proven working experience in project management in the information technology sector.
-        Solid technical background, with understanding or hands-on experience in software development and web technologies. PMP certification is a plus.
-    """,
-    "Marketing Manager": """
-        Innovative Marketing Manager to develop and implement marketing strategies to strengthen the company’s market presence and help it find a “voice” that will make a difference.
-        Responsibilities include planning and executing campaigns, tracking and analyzing performance, managing budgets, and overseeing marketing material.
-        Proven experience as Marketing Manager or similar role. Demonstrable experience leading and managing SEO/SEM, marketing database, email, social media and/or display advertising campaigns.
-    """,
-    "Operations Manager": """
-        Detail-oriented Operations Manager to direct and coordinate the internal operational activities of the organization in accordance with policies, goals, and objectives established by the CEO and the Board of Directors.
-        Key responsibilities include formulating policies, managing daily operations, personnel, and material resources to achieve specific goals.
-        Proven experience as Operations Manager or relevant role. Understanding of business functions such as HR, Finance, marketing etc. Demonstrable competency in strategic planning and business development.
-    """
-}
-
 # --- Helper Functions ---
+# Thin Streamlit wrappers over the headless `screener` library
 def extract_text_from_pdf(uploaded_file):
-    # ... (same as before)
-    pdf = PdfReader(uploaded_file)
-    text = ""
-    for page_num, page in enumerate(pdf.pages):
-        try:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        except Exception as e:
-            st.warning(f"Could not extract text from page {page_num + 1} of {uploaded_file.name}. Error: {e}")
-    return text.strip()
+    result = screener.extract_text_from_pdf(uploaded_file)
+    for page_warning in result.warnings:
+        st.warning(page_warning)
+    return result.text
+
+def extract_texts_from_pdfs(uploaded_files, progress_bar=None):
+    # Bulk variant: parses in parallel worker processes, results come back in upload order.
+    # Files already extracted in this session are served from the text cache.
+    return extract_uploads(uploaded_files, progress_bar=progress_bar)
 
 def rank_resumes_against_jd(job_description, resumes_text_list):
-    # ... (same as original 'rank_resumes' function)
-    documents = [job_description] + resumes_text_list
-    vectorizer = TfidfVectorizer(stop_words='english').fit_transform(documents)
-    vectors = vectorizer.toarray()
-    job_description_vector = vectors[0]
-    resume_vectors = vectors[1:]
-    cosine_similarities = cosine_similarity([job_description_vector], resume_vectors).flatten()
+    # Sparse scoring against the JD row; resumes already tokenized for this JD
+    # in the session are reused (same scores as a full refit)
+    cosine_similarities = rank_incremental("app3", job_description, resumes_text_list)
     return cosine_similarities
 
+def rank_resumes_hybrid(job_description, resumes_text_list):
+    # Text similarity blended with the structural match (skills, titles, degree, experience)
+    return hybrid_scores(job_description, resumes_text_list, rank_resumes_against_jd(job_description, resumes_text_list)).scores
+
+def add_job_description(job_descriptions, role, text):
+    # Repeated role names get a " (2)", " (3)" ... suffix instead of overwriting each other
+    role = role.strip() or f"Role {len(job_descriptions) + 1}"
+    unique, n = role, 1
+    while unique in job_descriptions:
+        n += 1
+        unique = f"{role} ({n})"
+    job_descriptions[unique] = text
+
+def collect_job_descriptions(pasted_text, uploaded_files, profile_names):
+    # Pasted blocks separated by a line of "---" (first line names the role), uploaded
+    # .txt files (one JD each, named after the file) or .jsonl files ({"id", "text"} per line),
+    # and any of the predefined profiles
+    job_descriptions = {}
+    for block in re.split(r"(?m)^\s*-{3,}\s*$", pasted_text or ""):
+        block = block.strip()
+        if block:
+            add_job_description(job_descriptions, block.splitlines()[0][:60], block)
+    for uploaded_file in uploaded_files or []:
+        content = uploaded_file.getvalue().decode("utf-8", errors="replace")
+        if uploaded_file.name.lower().endswith(".jsonl"):
+            for line_number, line in enumerate(content.splitlines(), 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    role = str(record.get("id", f"{Path(uploaded_file.name).stem}:{line_number}"))
+                    add_job_description(job_descriptions, role, record["text"])
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    st.warning(f"Skipped line {line_number} of '{uploaded_file.name}': expected a JSON object with a 'text' field.")
+        elif content.strip():
+            add_job_description(job_descriptions, Path(uploaded_file.name).stem, content)
+    for name in profile_names:
+        add_job_description(job_descriptions, name, PREDEFINED_JOB_PROFILES[name])
+    return {role: text for role, text in job_descriptions.items() if isinstance(text, str) and text.strip()}
+
+def show_matrix_results(ranking, ranking_key):
+    # Per-role pages come from a column of the matrix; "best role" from each row's top two roles
+    view = st.radio("View", ["Top candidates per role", "Best role per candidate"], horizontal=True, key="matrix_view")
+    if view == "Top candidates per role":
+        role = st.selectbox("Role", ranking.roles, key="matrix_role")
+        role_index = ranking.roles.index(role)
+        results = ranked_results((ranking_key, role), ranking.names, ranking.scores[:, role_index])
+        file_stem = "ranked_for_" + (re.sub(r"\W+", "_", role).strip("_").lower() or "role")
+        results_view(results, "matrix_role_results", file_stem=file_stem)
+    else:
+        top_two = np.argsort(-ranking.scores, axis=1, kind="stable")[:, :2]
+        best_scores = ranking.scores[np.arange(len(ranking.names)), top_two[:, 0]]
+        results = ranked_results((ranking_key, None), ranking.names, best_scores)
+
+        def best_roles(rows):
+            columns = {"Best role": [ranking.roles[top_two[i, 0]] for i in rows]}
+            if len(ranking.roles) > 1:
+                columns["Runner-up role"] = [ranking.roles[top_two[i, 1]] for i in rows]
+                columns["Runner-up score (%)"] = [f"{ranking.scores[i, top_two[i, 1]] * 100:.2f}" for i in rows]
+            return columns
+
+        results_view(results, "matrix_best_results", score_header="Best Score (%)",
+                     file_stem="best_role_per_candidate", details=best_roles)
+
+    st.download_button(
+        f"⬇️ Download the full {len(ranking.names)} x {len(ranking.roles)} score matrix (CSV)",
+        data=export_bytes(lambda: matrix_export(ranking.names, ranking.roles, ranking.scores)),
+        file_name="score_matrix.csv",
+        mime="text/csv",
+        key="matrix_download_csv",
+        on_click="ignore",
+    )
+
+
 def match_resume_to_profiles(resume_text, job_profiles_dict):
-    # ... (same as before)
-    profile_names = list(job_profiles_dict.keys())
-    profile_descriptions = list(job_profiles_dict.values())
-    documents = [resume_text] + profile_descriptions
-    try:
-        vectorizer = TfidfVectorizer(stop_words='english').fit_transform(documents)
-        vectors = vectorizer.toarray()
-    except ValueError as e:
-        st.error(f"TF-IDF Vectorization Error: {e}.")
-        return {}
-    resume_vector = vectors[0]
-    profile_vectors = vectors[1:]
-    similarities = cosine_similarity([resume_vector], profile_vectors).flatten()
-    matched_scores = dict(zip(profile_names, similarities))
-    sorted_matches = dict(sorted(matched_scores.items(), key=operator.itemgetter(1), reverse=True))
-    return sorted_matches
+    # Fitted once per profile set (shared across sessions); scoring is transform + one sparse product
+    match = screener.match_resume_to_profiles(resume_text, job_profiles_dict, index_loader=cached_profile_index)
+    for warning in match.warnings:
+        st.error(warning.message)
+    return match.matches
 
 # --- Streamlit App UI ---
 st.markdown("<h1 style='text-align: center;'>🚀 AI Resume & Job Profile Matcher 🎯</h1>", unsafe_allow_html=True)
 st.markdown("---")
 
+# Applies to whichever tab's button is pressed next
+profile_run = st.sidebar.checkbox("Profile the next run (cProfile + tracemalloc)", value=False, key="profile_run")
+
 # Create tabs for different functionalities
 tab1_title = "📄➡️👔 Rank Resumes vs. Job Description"
 tab2_title = "👔➡️📄 Find Job Profiles for a Resume"
@@ -176,10 +178,23 @@ tab1, tab2 = st.tabs([tab1_title, tab2_title])
 
 # --- TAB 1: Rank Resumes vs. Job Description ---
 with tab1:
-    st.header("Rank Multiple Resumes Against a Single Job Description")
-    st.markdown("Upload a job description and multiple resumes to see which candidates are the best textual fit.")
+    st.header("Rank Multiple Resumes Against Job Descriptions")
+    st.markdown("Upload a job description and multiple resumes to see which candidates are the best textual fit, "
+                "or score every resume against several roles at once.")
 
-    jd_input_ranker = st.text_area("Paste the complete job description here:", height=200, key="jd_ranker")
+    jd_mode = st.radio("Job descriptions", ["One job description", "Several job descriptions (matrix)"],
+                       horizontal=True, key="jd_mode_ranker")
+    matrix_mode = jd_mode != "One job description"
+    if matrix_mode:
+        jds_pasted = st.text_area("Paste job descriptions, separated by a line containing only '---' "
+                                  "(the first line of each names the role):", height=200, key="jds_ranker")
+        jd_files = st.file_uploader("...or upload them (.txt: one per file; .jsonl: {\"id\", \"text\"} per line):",
+                                    type=["txt", "jsonl"], accept_multiple_files=True, key="jd_files_ranker")
+        jd_profiles = st.multiselect("...or add predefined job profiles:", list(PREDEFINED_JOB_PROFILES), key="jd_profiles_ranker")
+        job_descriptions = collect_job_descriptions(jds_pasted, jd_files, jd_profiles)
+        st.caption(f"{len(job_descriptions)} job description(s): {', '.join(job_descriptions) or '—'}")
+    else:
+        jd_input_ranker = st.text_area("Paste the complete job description here:", height=200, key="jd_ranker")
     
     resumes_input_ranker = st.file_uploader(
         "Upload candidate resumes (PDFs, multiple allowed):",
@@ -188,50 +203,85 @@ with tab1:
         key="resumes_ranker"
     )
 
+    use_structure = st.checkbox("Blend in skills, titles, degree and experience", value=False, key="use_structure_ranker")
+    background = run_in_background(len(resumes_input_ranker or []), "background_ranker")
+
+    # Results live in session state keyed by the inputs, so switching tabs or
+    # paging through them redraws them without re-extracting or re-ranking
+    resume_digests = [file_digest(f) for f in resumes_input_ranker or []]
+    if matrix_mode:
+        ranker_key = inputs_key(sorted(job_descriptions.items()), resume_digests, use_structure)
+    else:
+        ranker_key = inputs_key(jd_input_ranker, resume_digests, use_structure)
+    scope = "app3_matrix" if matrix_mode else "app3_ranker"
+    has_jd = bool(job_descriptions) if matrix_mode else bool(jd_input_ranker.strip())
+
     if st.button("✨ Rank Candidate Resumes", key="rank_resumes_button"):
-        if resumes_input_ranker and jd_input_ranker.strip():
-            with st.spinner("Ranking resumes against JD... Please wait. 🧠"):
-                resumes_data_ranker = []
-                for file in resumes_input_ranker:
-                    text = extract_text_from_pdf(file)
-                    if text.strip():
-                        resumes_data_ranker.append({"name": file.name, "text": text})
-                    else:
-                        st.warning(f"Could not extract text from '{file.name}' or it's empty. Skipping.")
-                
-                if not resumes_data_ranker:
-                    st.error("No processable text found in the uploaded resumes for ranking.")
+        if resumes_input_ranker and has_jd and background:
+            # Extraction and ranking run in a worker process; the page follows the job via ?job=
+            jds = {"job_descriptions": job_descriptions} if matrix_mode else {"job_description": jd_input_ranker}
+            submit_job(resumes_input_ranker, structure=use_structure, **jds)
+        elif resumes_input_ranker and has_jd:
+            forget_job()
+            with st.spinner("Ranking resumes against JD... Please wait. 🧠"), \
+                    instrumentation.trace("app3_rank", profile=profile_run) as rank_trace:
+                progress_bar = st.progress(0.0)
+                extracted = extract_texts_from_pdfs(resumes_input_ranker, progress_bar)
+                progress_bar.empty()
+
+                if matrix_mode:
+                    # One vectorization of the resumes, one sparse product for all roles
+                    ranking = screener.screen_resumes_matrix(
+                        job_descriptions, extracted,
+                        rank=screener.rank_resumes_matrix_hybrid if use_structure else screener.rank_resumes_matrix)
                 else:
-                    resume_texts_for_ranking = [r["text"] for r in resumes_data_ranker]
-                    resume_names_for_display = [r["name"] for r in resumes_data_ranker]
-
-                    scores = rank_resumes_against_jd(jd_input_ranker, resume_texts_for_ranking)
-                    acceptability_scores_percent = [score * 100 for score in scores]
-
-                    results_df_ranker = pd.DataFrame({
-                        "Resume File Name": resume_names_for_display,
-                        "Match Score (%)": acceptability_scores_percent
-                    })
-                    results_df_ranker = results_df_ranker.sort_values(by="Match Score (%)", ascending=False)
-                    results_df_ranker["Match Score (%)"] = results_df_ranker["Match Score (%)"].map('{:.2f}%'.format)
-
-                    st.markdown("---")
-                    st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🏆 Ranked Candidate Results 🏆</h3>", unsafe_allow_html=True)
-                    st.markdown(results_df_ranker.to_html(escape=False, index=False), unsafe_allow_html=True)
-                    
-                    st.markdown("---")
-                    st.subheader("💡 Score Interpretation Guide (Example)")
-                    st.info("""
-                    - **> 80%:** Strong match with the job description.
-                    - **60% - 80%:** Good match, worth further review.
-                    - **< 60%:** Lower textual similarity.
-                    *Note: TF-IDF scores reflect keyword similarity.*
-                    """)
-        elif not jd_input_ranker.strip():
+                    ranking = screener.screen_resumes(jd_input_ranker, extracted,
+                                                      rank=rank_resumes_hybrid if use_structure else rank_resumes_against_jd)
+                del extracted  # the texts are vectorized; only names and scores are kept
+            remember_result(scope, ranker_key, ranking)
+            remember_trace(scope, ranker_key, rank_trace)
+        elif not has_jd:
             st.error("🚨 Please enter a job description for the Ranker.")
         elif not resumes_input_ranker:
             st.error("🚨 Please upload resumes for the Ranker.")
 
+    # A finished background job (followed through the query string) takes the place of a session result
+    finished_job = job_panel()
+    if finished_job is not None:
+        ranker_key = inputs_key("job", finished_job.job_id)
+        ranking, rank_trace = finished_job.ranking, finished_job.trace
+    else:
+        ranking, rank_trace = recall_result(scope, ranker_key), recall_trace(scope, ranker_key)
+    if ranking is not None:
+        for warning in ranking.warnings:
+            st.warning(warning.message)
+        duplicates_panel(ranking.duplicates)
+
+        if ranking.scores is None:
+            st.error("No processable text found in the uploaded resumes for ranking.")
+        else:
+            resume_names_for_display = ranking.names
+            scores = ranking.scores
+            st.markdown("---")
+            st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🏆 Ranked Candidate Results 🏆</h3>", unsafe_allow_html=True)
+            # One page of the full ranking (kept server-side) per rerun
+            with instrumentation.trace("app3_render") as render_trace:
+                if isinstance(ranking, screener.MatrixRankingResult):
+                    show_matrix_results(ranking, ranker_key)
+                else:
+                    results = ranked_results(ranker_key, resume_names_for_display, scores)
+                    results_view(results, "ranker_results")
+
+            st.markdown("---")
+            st.subheader("💡 Score Interpretation Guide (Example)")
+            st.info("""
+            - **> 80%:** Strong match with the job description.
+            - **60% - 80%:** Good match, worth further review.
+            - **< 60%:** Lower textual similarity.
+            *Note: TF-IDF scores reflect keyword similarity.*
+            """)
+            performance_panel(rank_trace, render_trace)
+
 # --- TAB 2: Find Job Profiles for a Resume ---
 with tab2:
     st.header("Find Matching Job Profiles for a Single Resume")
@@ -244,46 +294,43 @@ with tab2:
         key="resume_matcher"
     )
 
+    matcher_key = inputs_key(file_digest(resume_input_matcher)) if resume_input_matcher is not None else None
+
     if st.button("🔍 Find Matching Job Profiles", key="match_profiles_button"):
         if resume_input_matcher is not None:
-            with st.spinner("Matching resume to profiles... Please wait. 🛠️"):
+            with st.spinner("Matching resume to profiles... Please wait. 🛠️"), \
+                    instrumentation.trace("app3_match", profile=profile_run) as match_trace:
                 resume_text_matcher = extract_text_from_pdf(resume_input_matcher)
 
                 if not resume_text_matcher:
                     st.error(f"Could not extract text from '{resume_input_matcher.name}'. Please try a different PDF.")
                 else:
                     matched_profiles_scores = match_resume_to_profiles(resume_text_matcher, PREDEFINED_JOB_PROFILES)
-
-                    if not matched_profiles_scores:
-                        st.warning("Could not calculate matches for profiles.")
-                    else:
-                        st.markdown("---")
-                        st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🌟 Top Matching Job Profiles 🌟</h3>", unsafe_allow_html=True)
-
-                        profile_names = []
-                        match_percentages = []
-
-                        for profile, score in matched_profiles_scores.items():
-                            profile_names.append(profile)
-                            match_percentages.append(f"{score*100:.2f}%")
-
-                        results_df_matcher = pd.DataFrame({
-                            "Job Profile": profile_names,
-                            "Match Score (%)": match_percentages,
-                        })
-                        # No need to sort again, match_resume_to_profiles already returns sorted
-                        
-                        st.markdown(results_df_matcher.to_html(escape=False, index=False), unsafe_allow_html=True)
-                        
-                        if results_df_matcher.shape[0] > 0:
-                            top_match_profile_name = results_df_matcher.iloc[0]["Job Profile"]
-                            st.markdown("---")
-                            st.subheader(f"📄 Details for Top Match: {top_match_profile_name}")
-                            with st.expander("View Full Job Description for Top Match"):
-                                st.markdown(f"<pre style='color:white; background-color:rgba(30,30,30,0.7); padding:10px; border-radius:5px; white-space:pre-wrap;'>{PREDEFINED_JOB_PROFILES[top_match_profile_name]}</pre>", unsafe_allow_html=True)
+                    remember_result("app3_matcher", matcher_key, matched_profiles_scores)
+            remember_trace("app3_matcher", matcher_key, match_trace)
         else:
             st.error("🚨 Please upload a resume for the Profile Matcher.")
 
+    matched_profiles_scores = recall_result("app3_matcher", matcher_key) if matcher_key is not None else None
+    if matched_profiles_scores is not None:
+        if not matched_profiles_scores:
+            st.warning("Could not calculate matches for profiles.")
+        else:
+            st.markdown("---")
+            st.markdown("<h3 style='color: #00ffcc; text-align:center;'>🌟 Top Matching Job Profiles 🌟</h3>", unsafe_allow_html=True)
+
+            with instrumentation.trace("app3_render") as render_trace:
+                results = ranked_results(matcher_key, matched_profiles_scores.keys(), list(matched_profiles_scores.values()))
+                results_view(results, "matcher_results", name_header="Job Profile", file_stem="matching_profiles")
+
+            top_match_profile_name = results.names[results.order[0]]
+            st.markdown("---")
+            st.subheader(f"📄 Details for Top Match: {top_match_profile_name}")
+            with st.expander("View Full Job Description for Top Match"):
+                st.markdown(f"<pre style='color:white; background-color:rgba(30,30,30,0.7); padding:10px; border-radius:5px; white-space:pre-wrap;'>{PREDEFINED_JOB_PROFILES[top_match_profile_name]}</pre>", unsafe_allow_html=True)
+
+            performance_panel(recall_trace("app3_matcher", matcher_key), render_trace)
+
 
 st.markdown("---")
 st.markdown("<p style='text-align: center; color: #aaa;'>AI Resume & Job Profile Matcher by Vikas </p>", unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,285 @@
+# Headless batch ranking: score a directory of resumes against many job
+# descriptions without starting Streamlit.
+#
+#   python batch_rank.py --resumes resumes/ --jd jds/ --output scores.csv
+#
+# Resumes are .pdf or .txt files. --jd is a single .txt file, a .jsonl file
+# with {"id": ..., "text": ...} per line, or a directory of .txt files.
+# The whole run is vectorized in one pass: one vocabulary, one JD matrix, one
+# resume matrix and a single sparse product for the full JD x resume scores.
+#
+# With --pool DIR the resumes live in an on-disk feature store instead
+# (screener/feature_store.py). New files from --resumes are appended to it, and
+# every JD is scored against the whole stored pool without re-extracting or
+# re-vectorizing anything already there:
+#
+#   python batch_rank.py --pool pool/ --resumes new_batch/ --jd jd.txt --top-k 100 --output scores.csv
+#
+# Adding --ann answers each JD from an approximate nearest-neighbour index over
+# the pool (screener/ann.py) instead of scoring every stored resume. The index
+# is built on first use and rebuilt once enough new resumes are unindexed.
+# --n-probe and --shortlist trade latency for recall.
+#
+# --structure blends the text scores with the structural match (skills, job
+# titles, degree, years of experience; screener/structure.py). Each resume is
+# scanned once and its features are reused for every JD.
+#
+# Duplicate resumes are collapsed before scoring, as in the apps; --no-dedup
+# (or RESUME_DEDUP=0) keeps every file. With --pool, a new file is also
+# dropped when the pool already stores its exact content (by word digest);
+# near duplicates are only found within the new batch.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from screener import collect_resumes, deduplicate_resumes, extract_texts
+from screener.core import DEFAULT_DEDUP
+from screener.extraction import DEFAULT_TIMEOUT, DEFAULT_WORKERS
+from screener.scoring import score_matrix, top_k_indices
+
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _log(message):
+    print(message, file=sys.stderr)
+
+
+def load_job_descriptions(path):
+    """Return a list of (jd_id, text) from a .txt file, a .jsonl file or a directory."""
+    if os.path.isdir(path):
+        jds = []
+        for file_name in sorted(os.listdir(path)):
+            if file_name.lower().endswith(".txt"):
+                with open(os.path.join(path, file_name), encoding="utf-8") as f:
+                    jds.append((os.path.splitext(file_name)[0], f.read()))
+        return jds
+    if path.lower().endswith(".jsonl"):
+        jds = []
+        with open(path, encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                if line.strip():
+                    record = json.loads(line)
+                    jds.append((str(record.get("id", line_num)), record["text"]))
+        return jds
+    with open(path, encoding="utf-8") as f:
+        return [(os.path.splitext(os.path.basename(path))[0], f.read())]
+
+
+def load_resumes(directory, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, use_cache=True):
+    """Return a list of (file_name, text) for every readable resume in `directory`.
+
+    Unreadable or empty resumes are reported on stderr and skipped.
+    """
+    pdf_paths, resumes = [], []
+    for file_name in sorted(os.listdir(directory)):
+        full_path = os.path.join(directory, file_name)
+        if file_name.lower().endswith(".pdf"):
+            pdf_paths.append(full_path)
+        elif file_name.lower().endswith(".txt"):
+            with open(full_path, encoding="utf-8") as f:
+                resumes.append((file_name, f.read().strip()))
+
+    def on_progress(done, total):
+        if done == total or done % 500 == 0:
+            _log(f"Extracted {done}/{total} PDFs")
+
+    results = extract_texts(
+        pdf_paths,
+        progress=on_progress,
+        use_cache=use_cache,
+        max_workers=max_workers,
+        timeout=timeout,
+    )
+    names, texts, warnings = collect_resumes(results)
+    for warning in warnings:
+        _log(f"warning: {warning.message}")
+    resumes.extend(zip(names, texts))
+
+    kept = [(name, text) for name, text in resumes if text.strip()]
+    for name, text in resumes:
+        if not text.strip():
+            _log(f"warning: '{name}' is empty. Skipping.")
+    return kept
+
+
+def collapse_duplicates(resumes):
+    """`resumes` without exact and near-duplicate copies; each collapsed file is reported on stderr."""
+    names, texts, duplicates = deduplicate_resumes([name for name, _ in resumes], [text for _, text in resumes])
+    for duplicate in duplicates:
+        _log(f"duplicate: '{duplicate.name}' collapsed into '{duplicate.kept}' "
+             f"({duplicate.kind}, {duplicate.similarity:.0%} similar)")
+    if duplicates:
+        _log(f"Collapsed {len(duplicates)} duplicate resumes")
+    return list(zip(names, texts))
+
+
+def iter_score_rows(jd_ids, resume_names, scores, min_score=0.0, top_k=None):
+    """Yield one dict per (JD, resume) pair, ranked within each JD."""
+    for jd_pos, jd_id in enumerate(jd_ids):
+        row_scores = scores[jd_pos]
+        for rank, resume_pos in enumerate(top_k_indices(row_scores, top_k, min_score), 1):
+            score = float(row_scores[resume_pos])
+            yield {"jd_id": jd_id, "rank": rank, "resume": resume_names[resume_pos], "score": score}
+
+
+def write_rows(rows, output_path, output_format):
+    fields = ["jd_id", "rank", "resume", "score"]
+    if output_format == "csv":
+        with open(output_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif output_format == "jsonl":
+        with open(output_path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    elif output_format == "parquet":
+        import pandas as pd  # only needed (with pyarrow) for parquet output
+
+        pd.DataFrame(list(rows), columns=fields).to_parquet(output_path, index=False)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+
+def new_pool_resumes(store, resumes, dedup=True):
+    """The `(name, text)` resumes to append to the pool `store`.
+
+    A file is already in the pool when its name is stored with the same
+    content (`dedup.content_digest`). A stored name with different content is
+    reported and skipped, since the store is append-only and ids must stay
+    unique. With `dedup`, a resume whose content is stored under another name
+    is skipped too, and the rest are collapsed among themselves; near
+    duplicates of stored resumes are not detected (the pool keeps no MinHash
+    signatures).
+    """
+    from screener.dedup import content_digest
+
+    kept = []
+    for name, text in resumes:
+        stored = store.find_content(content_digest(text))
+        if stored == name:
+            continue
+        if name in store:
+            _log(f"warning: '{name}' is already in the pool with different content. Skipping; "
+                 "rename the file to add this version.")
+        elif stored is not None and dedup:
+            _log(f"duplicate: '{name}' is already in the pool as '{stored}'")
+        else:
+            kept.append((name, text))
+    return collapse_duplicates(kept) if dedup else kept
+
+
+def rank_pool(args, jds, started):
+    """--pool mode: append new resumes to the feature store, then score every JD against all of it."""
+    from screener.feature_store import FeatureStore
+
+    store = FeatureStore.open_or_create(args.pool)
+    if args.resumes:
+        resumes = new_pool_resumes(
+            store, load_resumes(args.resumes, args.workers, args.timeout, use_cache=not args.no_cache), args.dedup)
+        store.append([name for name, _ in resumes], [text for _, text in resumes])
+        _log(f"Added {len(resumes)} new resumes to the pool at {args.pool}")
+    if not len(store):
+        _log(f"error: the pool at {args.pool} is empty")
+        return 2
+    _log(f"Pool holds {len(store)} resumes ({store.nnz} stored terms); ready in {time.perf_counter() - started:.1f}s")
+
+    output_format = _output_format(args.output, args.format)
+    if args.ann:
+        if store.ann_is_stale():
+            ann_started = time.perf_counter()
+            store.build_ann()
+            _log(f"Built the ANN index over {len(store)} resumes in {time.perf_counter() - ann_started:.1f}s")
+        scoring_started = time.perf_counter()
+        results = [(jd_id, store.search(text, args.top_k, args.n_probe, args.shortlist)) for jd_id, text in jds]
+        _log(f"Searched {len(jds)} JDs in {time.perf_counter() - scoring_started:.2f}s")
+        rows = ({"jd_id": jd_id, "rank": rank, "resume": store.ids[row], "score": float(score)}
+                for jd_id, (found, scores) in results
+                for rank, (row, score) in enumerate(((r, s) for r, s in zip(found, scores) if s >= args.min_score), 1))
+        write_rows(rows, args.output, output_format)
+        _log(f"Wrote {output_format} results to {args.output}")
+        return 0
+
+    scoring_started = time.perf_counter()
+    scores = [store.score(text) for _, text in jds]
+    _log(f"Scored {len(jds)} x {len(store)} pairs in {time.perf_counter() - scoring_started:.1f}s")
+
+    rows = iter_score_rows([jd_id for jd_id, _ in jds], store.ids, scores, args.min_score, args.top_k)
+    write_rows(rows, args.output, output_format)
+    _log(f"Wrote {output_format} results to {args.output}")
+    return 0
+
+
+def _output_format(path, explicit):
+    if explicit:
+        return explicit
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in OUTPUT_FORMATS else "csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank a directory of resumes against one or more job descriptions.")
+    parser.add_argument("--resumes", help="Directory of resume .pdf/.txt files")
+    parser.add_argument("--pool", help="Feature store directory: append --resumes to it and rank the whole pool")
+    parser.add_argument("--jd", required=True, help="JD .txt file, .jsonl file, or directory of .txt files")
+    parser.add_argument("--output", required=True, help="Output file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Output format (default: from the file extension)")
+    parser.add_argument("--top-k", type=int, help="Keep only the best K resumes per JD")
+    parser.add_argument("--structure", action="store_true",
+                        help="Blend in skills, titles, degree and experience (weights: RESUME_HYBRID_WEIGHTS)")
+    parser.add_argument("--ann", action="store_true", help="With --pool: approximate top-K search (needs --top-k)")
+    parser.add_argument("--n-probe", type=int, help="ANN lists scanned per query (more: higher recall, slower)")
+    parser.add_argument("--shortlist", type=int, help="ANN candidates re-scored exactly per query")
+    parser.add_argument("--dedup", action=argparse.BooleanOptionalAction, default=DEFAULT_DEDUP,
+                        help="Collapse exact and near-duplicate resumes (MinHash, RESUME_DEDUP_THRESHOLD) before "
+                             "scoring (default: on unless RESUME_DEDUP=0, as in the apps)")
+    parser.add_argument("--min-score", type=float, default=0.0, help="Drop pairs scoring below this (0-1)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-PDF extraction timeout in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the extracted-text cache")
+    args = parser.parse_args(argv)
+    if not args.resumes and not args.pool:
+        parser.error("Give --resumes, --pool, or both")
+    if args.ann and not (args.pool and args.top_k):
+        parser.error("--ann needs --pool and --top-k")
+    if args.structure and args.pool:
+        parser.error("--structure needs the resume texts; it cannot be combined with --pool")
+
+    started = time.perf_counter()
+    jds = load_job_descriptions(args.jd)
+    if not jds:
+        parser.error(f"No job descriptions found in {args.jd}")
+    if args.pool:
+        return rank_pool(args, jds, started)
+    resumes = load_resumes(args.resumes, args.workers, args.timeout, use_cache=not args.no_cache)
+    if not resumes:
+        parser.error(f"No processable resumes found in {args.resumes}")
+    if args.dedup:
+        resumes = collapse_duplicates(resumes)
+    _log(f"Loaded {len(jds)} job descriptions and {len(resumes)} resumes in {time.perf_counter() - started:.1f}s")
+
+    scoring_started = time.perf_counter()
+    jd_ids = [jd_id for jd_id, _ in jds]
+    resume_names = [name for name, _ in resumes]
+    scores = score_matrix([text for _, text in jds], [text for _, text in resumes])
+    if args.structure:
+        from screener.structure import blend, component_scores, get_matcher
+
+        matcher = get_matcher()
+        features = matcher.extract_many([text for _, text in resumes])
+        for jd_pos, (_, jd_text) in enumerate(jds):
+            scores[jd_pos] = blend(scores[jd_pos], component_scores(matcher.requirements(jd_text), features))
+    del resumes  # vectorized; the texts are not needed for writing the results
+    _log(f"Scored {scores.shape[0]} x {scores.shape[1]} pairs in {time.perf_counter() - scoring_started:.1f}s")
+
+    output_format = _output_format(args.output, args.format)
+    write_rows(iter_score_rows(jd_ids, resume_names, scores, args.min_score, args.top_k), args.output, output_format)
+    _log(f"Wrote {output_format} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# Recall and latency of ANN search against exact scoring.
+#
+#   python -m benchmarks.ann_recall --pool-size 200000 --profiles 15000 --probes 4,8,16,32 --output ann.json
+#
+# Two workloads, matching how the index is used:
+#   pool      synthetic resumes in a temporary feature store; each synthetic JD
+#             is answered by `FeatureStore.search` and by a full `score` scan
+#   profiles  a synthetic taxonomy in a `ProfileIndex`; each resume is answered
+#             by `match(text, top_k)` with and without the ANN index
+# For every `n_probe` (the shortlist scales with it), the report holds
+# recall@K against the exact top-K plus the median and worst query latency.
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes
+from screener.ann import DEFAULT_N_PROBE, DEFAULT_SHORTLIST
+from screener.feature_store import FeatureStore
+from screener.profile_index import ProfileIndex
+from screener.scoring import top_k_indices
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _summary(recalls, seconds):
+    return {"recall": round(float(np.mean(recalls)), 4),
+            "median_ms": round(1000 * float(np.median(seconds)), 3),
+            "max_ms": round(1000 * float(np.max(seconds)), 3)}
+
+
+def _shortlist(n_probe):
+    return max(DEFAULT_SHORTLIST * n_probe // DEFAULT_N_PROBE, 1)
+
+
+def bench_pool(size, queries, probes, top_k, doc_words, seed):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="screener-ann-") as path:
+        store = FeatureStore.create(path)
+        resumes = generate_resumes(size, doc_words=doc_words, seed=seed)
+        store.append([r.doc_id for r in resumes], [r.text for r in resumes])
+        del resumes
+        started = time.perf_counter()
+        store.build_ann()
+        build_seconds = time.perf_counter() - started
+
+        truths, exact_seconds = [], []
+        for query in queries:
+            started = time.perf_counter()
+            truths.append(set(top_k_indices(store.score(query), top_k).tolist()))
+            exact_seconds.append(time.perf_counter() - started)
+        results.append({"workload": "pool", "n": size, "n_probe": None, "build_seconds": round(build_seconds, 3),
+                        **_summary([1.0], exact_seconds)})
+        for n_probe in probes:
+            recalls, seconds = [], []
+            for query, truth in zip(queries, truths):
+                started = time.perf_counter()
+                rows, _ = store.search(query, top_k, n_probe, _shortlist(n_probe))
+                seconds.append(time.perf_counter() - started)
+                recalls.append(len(truth & set(rows.tolist())) / top_k)
+            results.append({"workload": "pool", "n": size, "n_probe": n_probe, **_summary(recalls, seconds)})
+        store.close()
+    return results
+
+
+def bench_profiles(size, queries, probes, top_k, seed):
+    profiles = {f"{d.role} #{i}": d.text for i, d in enumerate(generate_resumes(size, doc_words=80, seed=seed))}
+    index = ProfileIndex.build(profiles)
+    started = time.perf_counter()
+    index.build_ann()
+    build_seconds = time.perf_counter() - started
+
+    ann, index.ann = index.ann, None
+    truths, exact_seconds = [], []
+    for query in queries:
+        started = time.perf_counter()
+        truths.append(set(index.match(query, top_k)))
+        exact_seconds.append(time.perf_counter() - started)
+    index.ann = ann
+    results = [{"workload": "profiles", "n": size, "n_probe": None, "build_seconds": round(build_seconds, 3),
+                **_summary([1.0], exact_seconds)}]
+    for n_probe in probes:
+        ann.n_probe, ann.shortlist = n_probe, _shortlist(n_probe)
+        recalls, seconds = [], []
+        for query, truth in zip(queries, truths):
+            started = time.perf_counter()
+            found = index.match(query, top_k)
+            seconds.append(time.perf_counter() - started)
+            recalls.append(len(truth & set(found)) / top_k)
+        results.append({"workload": "profiles", "n": size, "n_probe": n_probe, **_summary(recalls, seconds)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure ANN recall@K and query latency on the synthetic corpus.")
+    parser.add_argument("--pool-size", type=int, default=200000, help="Resumes in the pool (0 to skip)")
+    parser.add_argument("--profiles", type=int, default=15000, help="Profiles in the taxonomy (0 to skip)")
+    parser.add_argument("--probes", type=_int_list, default=_int_list("4,8,16,32"))
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--doc-words", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    if args.pool_size:
+        jds = generate_job_descriptions(seed=args.seed + 1)
+        queries = [jds[i % len(jds)].text for i in range(args.queries)]
+        results.extend(bench_pool(args.pool_size, queries, args.probes, args.top_k, args.doc_words, args.seed))
+    if args.profiles:
+        queries = [r.text for r in generate_resumes(args.queries, doc_words=args.doc_words, seed=args.seed + 2)]
+        results.extend(bench_profiles(args.profiles, queries, args.probes, args.top_k, args.seed + 3))
+    for record in results:
+        label = "exact" if record["n_probe"] is None else f"n_probe={record['n_probe']}"
+        print(f"{record['workload']:<9} n={record['n']:<7} {label:<12} recall={record['recall']:.3f} "
+              f"median={record['median_ms']:.2f}ms max={record['max_ms']:.2f}ms", file=sys.stderr)
+
+    payload = json.dumps({"args": {k: v for k, v in vars(args).items() if k != "output"}, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
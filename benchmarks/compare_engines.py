@@ -0,0 +1,88 @@
+# Accuracy of the hashed scoring engine against exact TF-IDF.
+#
+#   python -m benchmarks.compare_engines --sizes 1000,10000 --n-features 16,18,20 --output engines.json
+#
+# For every corpus size and hash width, each synthetic JD ranks the same
+# resumes with `rank_documents` (exact TfidfVectorizer) and with
+# `rank_documents_hashed`. The report holds the Spearman and Kendall rank
+# correlation of the two score vectors, the overlap of their top-K sets, the
+# largest absolute score difference and both engines' wall time, averaged over
+# the JDs. The "streamed" column feeds the resumes as a generator, which goes
+# through the on-disk spill path.
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from scipy.stats import kendalltau, spearmanr
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes
+from screener.hashing import rank_documents_hashed
+from screener.scoring import rank_documents, top_k_indices
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def compare(jds, texts, n_features, top_k, streamed=False):
+    rows = []
+    for jd in jds:
+        started = time.perf_counter()
+        exact = rank_documents(jd.text, texts)
+        exact_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        documents = (t for t in texts) if streamed else texts
+        hashed = rank_documents_hashed(jd.text, documents, n_features=n_features)
+        hashed_seconds = time.perf_counter() - started
+
+        k = min(top_k, len(texts))
+        overlap = len(set(top_k_indices(exact, k).tolist()) & set(top_k_indices(hashed, k).tolist())) / k
+        rows.append({
+            "spearman": spearmanr(exact, hashed).correlation,
+            "kendall": kendalltau(exact, hashed).correlation,
+            "top_k_overlap": overlap,
+            "max_abs_diff": float(np.abs(exact - hashed).max()),
+            "exact_seconds": exact_seconds,
+            "hashed_seconds": hashed_seconds,
+        })
+    return {key: round(float(np.mean([r[key] for r in rows])), 6) for key in rows[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare hashed and exact TF-IDF rankings on the synthetic corpus.")
+    parser.add_argument("--sizes", type=_int_list, default=_int_list("1000,10000"))
+    parser.add_argument("--n-features", type=_int_list, default=_int_list("14,16,18,20"),
+                        help="Comma-separated hash widths as powers of two")
+    parser.add_argument("--doc-words", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--streamed", action="store_true", help="Also time the generator (spill-to-disk) path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    jds = generate_job_descriptions(seed=args.seed + 1)
+    results = []
+    for size in args.sizes:
+        texts = [r.text for r in generate_resumes(size, doc_words=args.doc_words, seed=args.seed)]
+        for bits in args.n_features:
+            for streamed in ([False, True] if args.streamed else [False]):
+                record = {"n_docs": size, "n_features": 2 ** bits, "streamed": streamed}
+                record.update(compare(jds, texts, 2 ** bits, args.top_k, streamed))
+                results.append(record)
+                print(f"n={size:<7} 2**{bits:<3} streamed={streamed!s:<5} spearman={record['spearman']:.6f} "
+                      f"top{args.top_k}={record['top_k_overlap']:.3f}", file=sys.stderr)
+
+    payload = json.dumps({"args": {k: v for k, v in vars(args).items() if k != "output"}, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+# Ranking quality and cost of every scoring engine on a labeled relevance set.
+#
+#   python -m benchmarks.evaluate --dataset labeled.json --output eval.json
+#   python -m benchmarks.evaluate --synthetic 2000 --engines tfidf,hashing,hybrid,matrix,ann --output eval.json
+#
+# A dataset is one JSON file:
+#   {"resumes":          [{"id": "r1", "text": "..."}, {"id": "r2", "path": "pdfs/r2.pdf"}, ...],
+#    "job_descriptions": [{"id": "jd1", "text": "..."}, ...],
+#    "judgments":        [{"jd": "jd1", "resume": "r1", "grade": 2}, ...]}
+# Ids must be unique within resumes and within job descriptions. Grades are
+# integers >= 0 (0 = not relevant) and unjudged pairs count as 0.
+# PDF paths are relative to the dataset file and go through the normal
+# extractor. `--synthetic N` labels N synthetic resumes instead (grade 1 for
+# the JDs of the resume's own role); `--write-dataset` saves that set as a
+# starting point for a real one.
+#
+# Every JD ranks all resumes with each engine ("ranking" task), and every
+# resume is matched against the JDs as profiles through
+# `match_resume_to_profiles` ("profiles" task). For each engine the report
+# holds precision, recall, F1 and NDCG at each K, averaged over the queries
+# that have a relevant item; the Spearman and Kendall correlation of the
+# scores and the top-K overlap with the baseline TF-IDF ranker; per-query
+# latency; and the peak memory traced (tracemalloc) while ranking one query.
+# The token cache is cleared before each engine, so none of them profits
+# from the tokenization of another. `matrix` scores every JD in one call
+# (its latency is that call split evenly), and `ann` searches a temporary
+# feature store, so only its top K are scored and its memory includes
+# building the index.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.stats import kendalltau, spearmanr
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes
+from screener import tokens
+from screener.core import (
+    match_resume_to_profiles,
+    rank_resumes,
+    rank_resumes_hybrid,
+    rank_resumes_matrix,
+)
+from screener.hashing import rank_documents_hashed
+from screener.scoring import top_k_indices
+
+BASELINE = "tfidf"
+RANKING_ENGINES = ("tfidf", "hashing", "embedding", "hybrid", "matrix", "ann")
+PROFILE_ENGINES = ("tfidf", "hashing", "embedding")
+DEFAULT_ENGINES = "tfidf,hashing,hybrid,matrix"
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _str_list(value):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+# --- Datasets ---
+def load_dataset(path):
+    """`(resumes, jds, grades)`: id/text pairs and a JDs x resumes int grade matrix."""
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    resumes = payload["resumes"]
+    pdfs = [i for i, r in enumerate(resumes) if "text" not in r]
+    if pdfs:
+        from screener.core import extract_texts
+
+        base = os.path.dirname(os.path.abspath(path))
+        extracted = extract_texts([os.path.join(base, resumes[i]["path"]) for i in pdfs])
+        for i, result in zip(pdfs, extracted):
+            if result.error is not None:
+                raise ValueError(f"Could not extract text from {resumes[i]['path']!r}: {result.error}")
+            resumes[i] = {"id": resumes[i]["id"], "text": result.text}
+    resumes = [(r["id"], r["text"]) for r in resumes]
+    jds = [(j["id"], j["text"]) for j in payload["job_descriptions"]]
+    for kind, items in (("resume", resumes), ("job description", jds)):
+        seen = set()
+        for item_id, _ in items:
+            if item_id in seen:
+                raise ValueError(f"Duplicate {kind} id {item_id!r}")
+            seen.add(item_id)
+
+    resume_rows = {resume_id: i for i, (resume_id, _) in enumerate(resumes)}
+    jd_rows = {jd_id: i for i, (jd_id, _) in enumerate(jds)}
+    grades = np.zeros((len(jds), len(resumes)), dtype=np.int32)
+    for judgment in payload["judgments"]:
+        try:
+            grades[jd_rows[judgment["jd"]], resume_rows[judgment["resume"]]] = int(judgment["grade"])
+        except KeyError as e:
+            raise ValueError(f"Judgment {judgment} names an unknown id {e}") from None
+    return resumes, jds, grades
+
+
+def synthetic_dataset(n_resumes, doc_words=300, seed=0, on_topic=0.35):
+    """Synthetic resumes and one JD per role; a resume is relevant (grade 1) to the JDs of its role.
+
+    `on_topic` is the share of role words in a resume; lower makes the set harder.
+    """
+    resumes = generate_resumes(n_resumes, doc_words=doc_words, seed=seed, on_topic=on_topic)
+    jds = generate_job_descriptions(seed=seed + 1)
+    grades = np.array([[int(r.role == jd.role) for r in resumes] for jd in jds], dtype=np.int32)
+    return [(r.doc_id, r.text) for r in resumes], [(jd.doc_id, jd.text) for jd in jds], grades
+
+
+def write_dataset(path, resumes, jds, grades):
+    judgments = [{"jd": jds[j][0], "resume": resumes[i][0], "grade": int(grades[j, i])}
+                 for j, i in zip(*np.nonzero(grades))]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"resumes": [{"id": i, "text": t} for i, t in resumes],
+                   "job_descriptions": [{"id": i, "text": t} for i, t in jds],
+                   "judgments": judgments}, f, indent=1)
+        f.write("\n")
+
+
+# --- Metrics ---
+def query_metrics(order, grades, ks):
+    """Precision, recall, F1 and NDCG at each K for one ranked list (`order` best first)."""
+    relevant = int((grades > 0).sum())
+    found = grades[order]
+    ideal = np.sort(grades)[::-1]
+    metrics = {}
+    for k in ks:
+        hits = int((found[:k] > 0).sum())
+        precision, recall = hits / k, hits / relevant
+        metrics[f"precision@{k}"] = precision
+        metrics[f"recall@{k}"] = recall
+        metrics[f"f1@{k}"] = 2 * precision * recall / (precision + recall) if hits else 0.0
+        discounts = 1.0 / np.log2(np.arange(2, k + 2))
+        dcg = float(((2.0 ** found[:k] - 1) * discounts[:found[:k].shape[0]]).sum())
+        idcg = float(((2.0 ** ideal[:k] - 1) * discounts[:ideal[:k].shape[0]]).sum())
+        metrics[f"ndcg@{k}"] = dcg / idcg
+    return metrics
+
+
+def agreement(scores, baseline, k):
+    """Rank correlation and top-K overlap of one query's scores with the baseline's."""
+    overlap = len(set(top_k_indices(scores, k).tolist()) & set(top_k_indices(baseline, k).tolist())) / k
+    if np.ptp(scores) == 0 or np.ptp(baseline) == 0:
+        return {"spearman": None, "kendall": None, "top_k_overlap": overlap}
+    return {"spearman": spearmanr(baseline, scores).correlation,
+            "kendall": kendalltau(baseline, scores).correlation,
+            "top_k_overlap": overlap}
+
+
+def _mean(rows, key):
+    values = [r[key] for r in rows if r.get(key) is not None]
+    return round(float(np.mean(values)), 6) if values else None
+
+
+# --- Engines ---
+def _per_query(rank):
+    """Run `rank(query, candidates)` once per query, timing each call."""
+    def run(queries, candidates):
+        scores, seconds = [], []
+        for query in queries:
+            started = time.perf_counter()
+            scores.append(np.asarray(rank(query, candidates), dtype=np.float64))
+            seconds.append(time.perf_counter() - started)
+        return np.vstack(scores), seconds
+    return run
+
+
+def _matrix(queries, candidates):
+    started = time.perf_counter()
+    scores = rank_resumes_matrix(queries, candidates).T.astype(np.float64)
+    return scores, [(time.perf_counter() - started) / len(queries)] * len(queries)
+
+
+def _ann(k):
+    """Top-`k` from a temporary feature store's ANN index; unreturned rows score -inf."""
+    def run(queries, candidates):
+        from screener.feature_store import FeatureStore
+
+        with tempfile.TemporaryDirectory(prefix="screener-eval-") as path:
+            store = FeatureStore.create(path)
+            store.append([str(i) for i in range(len(candidates))], candidates)
+            store.build_ann()
+            scores, seconds = np.full((len(queries), len(candidates)), -np.inf), []
+            for j, query in enumerate(queries):
+                started = time.perf_counter()
+                rows, row_scores = store.search(query, k)
+                seconds.append(time.perf_counter() - started)
+                scores[j, rows] = row_scores
+            store.close()
+        return scores, seconds
+    return run
+
+
+def ranking_engines(names, hash_bits, k):
+    engines = {}
+    for name in names:
+        if name not in RANKING_ENGINES:
+            raise ValueError(f"Unknown engine {name!r}; expected one of {RANKING_ENGINES}")
+        if name in ("tfidf", "hashing", "embedding"):
+            engines[name] = _per_query(lambda jd, texts, engine=name: rank_resumes(jd, texts, engine=engine))
+        elif name == "hybrid":
+            engines[name] = _per_query(rank_resumes_hybrid)
+        elif name == "matrix":
+            engines[name] = _matrix
+        else:
+            engines[name] = _ann(k)
+    for bits in hash_bits:
+        engines[f"hashing-2^{bits}"] = _per_query(
+            lambda jd, texts, bits=bits: rank_documents_hashed(jd, texts, n_features=2 ** bits))
+    return engines
+
+
+def profile_engines(names):
+    def match(engine, profiles):
+        def rank(resume, _):
+            matches = match_resume_to_profiles(resume, profiles, engine=engine).matches
+            return [matches.get(name, 0.0) for name in profiles]
+        return _per_query(rank)
+    return {name: (lambda profiles, name=name: match(name, profiles)) for name in names if name in PROFILE_ENGINES}
+
+
+def _peak_traced_bytes(run, query, candidates):
+    tokens.clear_cache()
+    tracemalloc.start()
+    try:
+        run([query], candidates)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def evaluate(engines, queries, candidates, grades, ks):
+    """One record per engine; the first engine is the baseline the others are compared with."""
+    judged = [j for j in range(len(queries)) if grades[j].any()]
+    ks = sorted({min(k, len(candidates)) for k in ks})
+    baseline, records = None, []
+    for name, run in engines.items():
+        tokens.clear_cache()
+        started = time.perf_counter()
+        scores, seconds = run(queries, candidates)
+        total_seconds = time.perf_counter() - started
+        if baseline is None:
+            baseline = scores
+        rows = [query_metrics(top_k_indices(scores[j], ks[-1]), grades[j], ks) for j in judged]
+        if np.isfinite(scores).all():
+            rows = [dict(row, **agreement(scores[j], baseline[j], ks[-1])) for row, j in zip(rows, judged)]
+        else:  # only the top K are scored
+            rows = [dict(row, top_k_overlap=len(set(top_k_indices(scores[j], ks[-1]).tolist())
+                                                & set(top_k_indices(baseline[j], ks[-1]).tolist())) / ks[-1])
+                    for row, j in zip(rows, judged)]
+        record = {"engine": name, "n_queries": len(judged), "n_candidates": len(candidates)}
+        record.update({key: _mean(rows, key) for key in rows[0]} if rows else {})
+        record.update({
+            "median_ms": round(1000 * float(np.median(seconds)), 3),
+            "max_ms": round(1000 * float(np.max(seconds)), 3),
+            "total_seconds": round(total_seconds, 3),
+            "peak_traced_bytes": _peak_traced_bytes(run, queries[0], candidates),
+        })
+        records.append(record)
+    return records
+
+
+def _print_records(task, records, ks, n_candidates):
+    """One summary line per engine at the largest cut-off `evaluate` used."""
+    k = min(max(ks), n_candidates)
+    for r in records:
+        print(f"{task:<9} {r['engine']:<14} P@{k}={r.get(f'precision@{k}') or 0:.3f} "
+              f"NDCG@{k}={r.get(f'ndcg@{k}') or 0:.3f} F1@{k}={r.get(f'f1@{k}') or 0:.3f} "
+              f"spearman={r.get('spearman') if r.get('spearman') is not None else float('nan'):.4f} "
+              f"median={r['median_ms']:.2f}ms peak={r['peak_traced_bytes'] / 2 ** 20:.1f}MB", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate ranking quality, latency and memory per scoring engine.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dataset", help="Labeled relevance set (JSON, see the module header)")
+    source.add_argument("--synthetic", type=int, metavar="N", help="Label N synthetic resumes instead")
+    parser.add_argument("--engines", type=_str_list, default=_str_list(DEFAULT_ENGINES),
+                        help=f"Comma-separated, from {','.join(RANKING_ENGINES)}; {BASELINE} is always the baseline")
+    parser.add_argument("--hash-bits", type=_int_list, default=[],
+                        help="Also evaluate the hashing engine at these widths (powers of two)")
+    parser.add_argument("--k", type=_int_list, default=_int_list("10,50"), help="Cut-offs for the ranking task")
+    parser.add_argument("--profile-k", type=_int_list, default=_int_list("1,3"), help="Cut-offs for the profiles task")
+    parser.add_argument("--skip-profiles", action="store_true", help="Only evaluate the ranking task")
+    parser.add_argument("--doc-words", type=int, default=300, help="Synthetic resume length")
+    parser.add_argument("--on-topic", type=float, default=0.35,
+                        help="Share of role words in a synthetic resume (lower is harder)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-dataset", help="Save the evaluated set as a dataset JSON file")
+    parser.add_argument("--output", help="Write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.dataset:
+        try:
+            resumes, jds, grades = load_dataset(args.dataset)
+        except (OSError, KeyError, ValueError) as e:
+            parser.error(f"cannot read {args.dataset}: {e}")
+    else:
+        resumes, jds, grades = synthetic_dataset(args.synthetic, args.doc_words, args.seed, args.on_topic)
+    if args.write_dataset:
+        write_dataset(args.write_dataset, resumes, jds, grades)
+    resume_texts, jd_texts = [t for _, t in resumes], [t for _, t in jds]
+    names = [BASELINE] + [name for name in args.engines if name != BASELINE]
+
+    results = {"ranking": evaluate(ranking_engines(names, args.hash_bits, max(args.k)),
+                                   jd_texts, resume_texts, grades, args.k)}
+    _print_records("ranking", results["ranking"], args.k, len(resume_texts))
+    if not args.skip_profiles:
+        profiles = {jd_id: text for jd_id, text in jds}
+        engines = {name: make(profiles) for name, make in profile_engines(names).items()}
+        results["profiles"] = evaluate(engines, resume_texts, list(profiles), grades.T, args.profile_k)
+        _print_records("profiles", results["profiles"], args.profile_k, len(jds))
+
+    arguments = {k: v for k, v in vars(args).items() if k != "output"}
+    payload = json.dumps({"args": arguments, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
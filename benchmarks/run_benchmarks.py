@@ -0,0 +1,168 @@
+# Stage-by-stage benchmark of the screening pipeline on a synthetic corpus.
+#
+#   python -m benchmarks.run_benchmarks --sizes 10,100,1000,10000 --doc-words 150,600 --output bench.json
+#
+# For every (corpus size, document length) pair it times the library calls the
+# apps make: PDF extraction, TF-IDF fit/transform, `scoring.rank_documents`,
+# `screener.rank_resumes` per scoring engine, and the result handling
+# (`RankedResults`, top-K selection, one formatted page, the CSV export).
+# Scoring stages start from a cold token cache, as a fresh upload batch does.
+# Each record reports wall time, throughput and the process peak RSS observed
+# so far, and the whole run is written as JSON so runs can be diffed.
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes, make_pdf
+from screener import SCORING_ENGINES, rank_resumes, tokens
+from screener.extraction import extract_all, parse_pdf_bytes
+from screener.results import RankedResults
+from screener.scoring import rank_documents, top_k_indices
+
+DEFAULT_SIZES = "10,100,1000,10000"
+DEFAULT_DOC_WORDS = "300"
+DEFAULT_ENGINES = "tfidf,hashing"
+
+
+def peak_rss_bytes():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024  # Linux reports KiB
+
+
+def _timed(fn, repeat):
+    best, value = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+class BenchmarkRun:
+    def __init__(self, repeat=1):
+        self.repeat = repeat
+        self.records = []
+
+    def measure(self, stage, n_docs, doc_words, fn, **extra):
+        seconds, value = _timed(fn, self.repeat)
+        record = {
+            "stage": stage,
+            "n_docs": n_docs,
+            "doc_words": doc_words,
+            "seconds": round(seconds, 6),
+            "docs_per_second": round(n_docs / seconds, 1) if seconds > 0 else None,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+        record.update(extra)
+        self.records.append(record)
+        print(f"{stage:<22} n={n_docs:<7} words={doc_words:<5} {seconds * 1000:10.1f} ms", file=sys.stderr)
+        return value
+
+    def skip(self, stage, n_docs, doc_words, reason):
+        self.records.append({"stage": stage, "n_docs": n_docs, "doc_words": doc_words, "skipped": reason})
+
+
+def bench_extraction(run, resumes, doc_words, pdf_limit, workers):
+    pdfs = [make_pdf(r.text) for r in resumes[:pdf_limit]]
+    n = len(pdfs)
+    run.measure("extract_pdf", n, doc_words, lambda: [parse_pdf_bytes(data) for data in pdfs])
+    if workers != 0:
+        run.measure("extract_pdf_parallel", n, doc_words,
+                    lambda: extract_all(pdfs, max_workers=workers), workers=workers or os.cpu_count())
+
+
+def _cold(fn):
+    """`fn` run from an empty token cache, so repeats do not time cache hits."""
+    def run():
+        tokens.clear_cache()
+        return fn()
+    return run
+
+
+def _export_bytes(results):
+    with results.export("csv") as output:
+        return output.read()
+
+
+def bench_ranking(run, jd_text, resumes, doc_words, top_k, engines):
+    texts = [r.text for r in resumes]
+    names = [r.doc_id + ".pdf" for r in resumes]
+    n = len(texts)
+
+    matrix = run.measure("tfidf_fit_transform", n, doc_words,
+                         _cold(lambda: tokens.TermTfidfVectorizer().fit_transform([jd_text] + texts)))
+    scores = run.measure("rank_documents", n, doc_words, _cold(lambda: rank_documents(jd_text, texts)),
+                         vocabulary_size=matrix.shape[1], nnz=int(matrix.nnz))
+    for engine in engines:
+        run.measure(f"rank_resumes_{engine}", n, doc_words,
+                    _cold(lambda: rank_resumes(jd_text, texts, engine=engine)), engine=engine)
+
+    results = run.measure("ranked_results", n, doc_words, lambda: RankedResults(names, scores))
+    run.measure("select_top_k", n, doc_words, lambda: top_k_indices(scores, top_k), top_k=top_k)
+    run.measure("format_page", n, doc_words, lambda: results.page(page_size=top_k), top_k=top_k)
+    run.measure("export_csv", n, doc_words, lambda: _export_bytes(results))
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extraction, vectorization, scoring and rendering.")
+    parser.add_argument("--sizes", type=_int_list, default=_int_list(DEFAULT_SIZES), help="Comma-separated resume counts")
+    parser.add_argument("--doc-words", type=_int_list, default=_int_list(DEFAULT_DOC_WORDS), help="Comma-separated resume lengths (words)")
+    parser.add_argument("--pdf-limit", type=int, default=200, help="Max PDFs per size for the extraction stages (0 to skip)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for parallel extraction (0 to skip, default: CPU count)")
+    parser.add_argument("--engines", default=DEFAULT_ENGINES,
+                        help=f"Comma-separated engines for the rank_resumes stages ({', '.join(SCORING_ENGINES)})")
+    parser.add_argument("--top-k", type=int, default=50, help="Rows selected and formatted as one results page")
+    parser.add_argument("--repeat", type=int, default=1, help="Report the best of N runs per stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = sorted(set(engines) - set(SCORING_ENGINES))
+    if unknown:
+        parser.error(f"unknown engines {unknown}; expected some of {SCORING_ENGINES}")
+
+    run = BenchmarkRun(repeat=args.repeat)
+    jd_text = generate_job_descriptions(1, seed=args.seed + 1)[0].text
+    for doc_words in args.doc_words:
+        for size in args.sizes:
+            resumes = generate_resumes(size, doc_words=doc_words, seed=args.seed)
+            if args.pdf_limit:
+                bench_extraction(run, resumes, doc_words, args.pdf_limit, args.workers)
+            bench_ranking(run, jd_text, resumes, doc_words, args.top_k, engines)
+
+    import sklearn
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "results": run.records,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
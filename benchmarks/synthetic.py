@@ -0,0 +1,116 @@
+# Offline synthetic corpus generator for benchmarks and evaluation.
+#
+# Produces resumes and job descriptions for a fixed set of roles (so every
+# resume has a known "true" role), plus minimal valid PDFs for extraction
+# benchmarks. Everything is driven by a seeded `random.Random`, so the same
+# arguments always give the same corpus.
+import random
+from collections import namedtuple
+
+ROLE_TERMS = {
+    "Backend Engineer": "python django flask rest api postgresql mysql redis microservices aws docker git "
+                        "celery kafka grpc sql orm testing scalability latency",
+    "Data Scientist": "python pandas numpy scikit-learn tensorflow pytorch statistics regression classification "
+                      "sql spark visualization experiments hypothesis modeling forecasting notebooks",
+    "Frontend Developer": "javascript typescript react redux webpack html css sass responsive accessibility "
+                          "components hooks jest storybook figma browser performance",
+    "DevOps Engineer": "kubernetes docker terraform ansible jenkins gitlab ci cd aws gcp azure prometheus grafana "
+                       "bash linux monitoring helm networking reliability",
+    "UX Designer": "figma sketch wireframes prototypes usability research personas journeys interaction "
+                   "visual typography accessibility design systems workshops",
+    "HR Manager": "recruitment onboarding compensation benefits payroll employee relations policies compliance "
+                  "labor law performance reviews training engagement",
+    "Recruiter": "sourcing screening interviews talent acquisition linkedin ats pipeline offers negotiation "
+                 "employer branding referrals hiring managers candidates",
+    "Project Manager": "planning scheduling budget stakeholders agile scrum jira risk milestones delivery "
+                       "pmp roadmap coordination vendors reporting",
+    "Marketing Manager": "campaigns seo sem social media content branding analytics email advertising budget "
+                         "market research positioning conversion funnel",
+    "Operations Manager": "operations logistics supply chain process improvement kpis budgeting vendors "
+                          "inventory lean six sigma staffing strategy",
+}
+
+FILLER = (
+    "experienced professional team results driven worked company projects responsible led managed developed "
+    "improved delivered collaborated across teams years including strong communication skills university degree "
+    "bachelor master certified role responsibilities achievements successfully customers business growth"
+).split()
+
+Document = namedtuple("Document", ["doc_id", "role", "text"])
+
+
+def _words(rng, role, n_words, on_topic):
+    role_terms = ROLE_TERMS[role].split()
+    other_terms = [t for r, terms in ROLE_TERMS.items() if r != role for t in terms.split()]
+    words = []
+    for _ in range(n_words):
+        draw = rng.random()
+        if draw < on_topic:
+            words.append(rng.choice(role_terms))
+        elif draw < on_topic + 0.1:
+            words.append(rng.choice(other_terms))
+        else:
+            words.append(rng.choice(FILLER))
+    return words
+
+
+def generate_resumes(n, doc_words=300, seed=0, roles=None, on_topic=0.35):
+    """`n` resumes of ~`doc_words` words, each written for one role."""
+    rng = random.Random(seed)
+    roles = list(roles or ROLE_TERMS)
+    resumes = []
+    for i in range(n):
+        role = roles[i % len(roles)] if i < len(roles) else rng.choice(roles)
+        words = _words(rng, role, max(doc_words - 4, 1), on_topic)
+        header = f"Candidate {i + 1} {role}".split()
+        # Wrap into lines so the PDF writer gets realistic line lengths
+        lines = [" ".join(header)] + [" ".join(words[j:j + 12]) for j in range(0, len(words), 12)]
+        resumes.append(Document(f"resume_{i + 1:06d}", role, "\n".join(lines)))
+    return resumes
+
+
+def generate_job_descriptions(n=None, doc_words=120, seed=1, roles=None):
+    """One JD per role (or `n` JDs cycling through the roles)."""
+    rng = random.Random(seed)
+    roles = list(roles or ROLE_TERMS)
+    n = len(roles) if n is None else n
+    jds = []
+    for i in range(n):
+        role = roles[i % len(roles)]
+        text = f"We are hiring a {role}. " + " ".join(_words(rng, role, doc_words, on_topic=0.6))
+        jds.append(Document(f"jd_{i + 1:04d}", role, text))
+    return jds
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text, lines_per_page=50):
+    """Minimal valid PDF (Helvetica, one text stream per page) that PyPDF2 can read."""
+    lines = text.split("\n") or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        body = " ".join(f"({_pdf_escape(line)}) '" for line in page_lines)
+        stream = f"BT /F1 10 Tf 40 780 Td 14 TL {body} ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1', 'replace'))} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Contents {content_id} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1", "replace")
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    return bytes(out)
@@ -0,0 +1,43 @@
+# Headless resume screening library shared by the Streamlit apps and the CLI.
+#
+# `screener.core` only imports numpy/sklearn/PyPDF2 inside the functions that
+# need them, so `import screener` stays cheap.
+from .core import (
+    EXTRACTOR_VERSION,
+    SCORING_ENGINES,
+    MatchResult,
+    MatrixRankingResult,
+    RankingResult,
+    ScreeningWarning,
+    collect_resumes,
+    deduplicate_resumes,
+    extract_text_from_pdf,
+    extract_texts,
+    match_resume_to_profiles,
+    rank_resumes,
+    rank_resumes_hybrid,
+    rank_resumes_matrix,
+    rank_resumes_matrix_hybrid,
+    screen_resumes,
+    screen_resumes_matrix,
+)
+
+__all__ = [
+    "EXTRACTOR_VERSION",
+    "SCORING_ENGINES",
+    "MatchResult",
+    "MatrixRankingResult",
+    "RankingResult",
+    "ScreeningWarning",
+    "collect_resumes",
+    "deduplicate_resumes",
+    "extract_text_from_pdf",
+    "extract_texts",
+    "match_resume_to_profiles",
+    "rank_resumes",
+    "rank_resumes_hybrid",
+    "rank_resumes_matrix",
+    "rank_resumes_matrix_hybrid",
+    "screen_resumes",
+    "screen_resumes_matrix",
+]
@@ -0,0 +1,188 @@
+# Approximate nearest-neighbour search over TF-IDF rows (IVF, NumPy only).
+#
+# Build (offline):
+#   1. project every sparse, L2-normalized row to a small dense vector with a
+#      count sketch: each column j adds sign[j] * weight to output dim
+#      bucket[j]. This preserves inner products in expectation, needs no
+#      fitted matrix and works for 2**20 hashed columns.
+#   2. train spherical k-means centroids on a sample of the projected vectors
+#      (the inverted lists), and store every vector grouped by its list.
+# Query:
+#   project the query, scan the `n_probe` lists whose centroids are closest,
+#   keep the `shortlist` best sketch scores, then re-rank that shortlist with
+#   the exact cosine supplied by the caller. More probes and a longer
+#   shortlist raise recall at the cost of latency.
+#
+# An index is a directory of .npy files plus meta.json. Loading memory-maps
+# the arrays, so opening a 200k-row index is instant.
+import json
+import os
+
+import numpy as np
+
+from .instrumentation import stage
+
+INDEX_FORMAT_VERSION = 1
+DEFAULT_DIM = 256
+DEFAULT_N_PROBE = 16
+DEFAULT_SHORTLIST = 400
+KMEANS_ITERATIONS = 12
+KMEANS_TRAIN_PER_LIST = 64
+
+
+class SketchProjection:
+    """Count-sketch projection of `n_features`-column sparse rows to `dim` dense dims."""
+
+    def __init__(self, n_features, dim=DEFAULT_DIM, seed=0):
+        self.n_features = n_features
+        self.dim = dim
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.bucket = rng.integers(0, dim, size=n_features, dtype=np.int32)
+        self.sign = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=n_features)
+
+    def project(self, matrix):
+        """Dense, L2-normalized (n_rows, dim) float32 projection of a CSR matrix."""
+        matrix = matrix.tocsr()
+        n_rows = matrix.shape[0]
+        rows = np.repeat(np.arange(n_rows), np.diff(matrix.indptr))
+        flat = rows * self.dim + self.bucket[matrix.indices]
+        dense = np.bincount(flat, weights=matrix.data * self.sign[matrix.indices],
+                            minlength=n_rows * self.dim).reshape(n_rows, self.dim)
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (dense / norms).astype(np.float32)
+
+
+def _assign(vectors, centroids, chunk_rows=65536):
+    labels = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], chunk_rows):
+        labels[start:start + chunk_rows] = np.argmax(vectors[start:start + chunk_rows] @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(vectors, n_lists, seed=0, n_iter=KMEANS_ITERATIONS):
+    """Spherical k-means on unit vectors; returns (n_lists, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    n_lists = max(1, min(n_lists, vectors.shape[0]))
+    centroids = vectors[rng.choice(vectors.shape[0], size=n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_lists)
+        empty = counts == 0
+        # Re-seed empty lists with random points so every list stays useful
+        sums[empty] = vectors[rng.choice(vectors.shape[0], size=int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class ANNIndex:
+    def __init__(self, projection, centroids, vectors, row_ids, offsets, n_rows,
+                 n_probe=DEFAULT_N_PROBE, shortlist=DEFAULT_SHORTLIST):
+        self.projection = projection
+        self.centroids = centroids  # (n_lists, dim)
+        self.vectors = vectors  # (n_rows, dim), grouped by list
+        self.row_ids = row_ids  # original row of each entry in `vectors`
+        self.offsets = offsets  # list l holds vectors[offsets[l]:offsets[l + 1]]
+        self.n_rows = n_rows
+        self.n_probe = n_probe  # search defaults, persisted with the index
+        self.shortlist = shortlist
+
+    @classmethod
+    def build(cls, chunks, n_features, dim=DEFAULT_DIM, n_lists=None, seed=0,
+              n_probe=DEFAULT_N_PROBE, shortlist=DEFAULT_SHORTLIST):
+        """Index the rows of an iterable of CSR chunks (rows L2-normalized, in row order).
+
+        `n_lists` defaults to about sqrt(n_rows). Only the projected vectors are
+        kept in memory (n_rows x dim float32), never the sparse rows.
+        """
+        projection = SketchProjection(n_features, dim, seed)
+        with stage("ann_project") as record:
+            parts = [projection.project(chunk) for chunk in chunks]
+            vectors = np.concatenate(parts) if parts else np.zeros((0, dim), dtype=np.float32)
+            record["n_documents"] = vectors.shape[0]
+        if not vectors.shape[0]:
+            raise ValueError("Cannot build an ANN index over zero rows")
+        n_lists = n_lists or max(1, int(np.sqrt(vectors.shape[0])))
+
+        with stage("ann_train", n_lists=n_lists):
+            rng = np.random.default_rng(seed)
+            train_size = min(vectors.shape[0], n_lists * KMEANS_TRAIN_PER_LIST)
+            sample = vectors[rng.choice(vectors.shape[0], size=train_size, replace=False)]
+            centroids = train_centroids(sample, n_lists, seed)
+        with stage("ann_assign"):
+            labels = _assign(vectors, centroids)
+            order = np.argsort(labels, kind="stable")
+            offsets = np.zeros(centroids.shape[0] + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(np.bincount(labels, minlength=centroids.shape[0]))
+        return cls(projection, centroids, vectors[order], order.astype(np.int64), offsets, vectors.shape[0],
+                   n_probe, shortlist)
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    def candidates(self, query_row, n_probe=None, shortlist=None):
+        """`(row_ids, sketch_scores)` of the best `shortlist` rows in the `n_probe` nearest lists."""
+        query = self.projection.project(query_row)[0]
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        shortlist = shortlist or self.shortlist
+        lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        slices = [(self.offsets[l], self.offsets[l + 1]) for l in lists]
+        positions = np.concatenate([np.arange(a, b) for a, b in slices]) if slices else np.zeros(0, dtype=np.int64)
+        if not positions.shape[0]:
+            return positions, np.zeros(0)
+        scores = self.vectors[positions] @ query
+        if shortlist < positions.shape[0]:
+            keep = np.argpartition(-scores, shortlist - 1)[:shortlist]
+            positions, scores = positions[keep], scores[keep]
+        return np.asarray(self.row_ids[positions]), scores
+
+    def search(self, query_row, k=10, exact=None, n_probe=None, shortlist=None):
+        """Top-`k` `(row_ids, scores)` for a 1-row CSR query, best first.
+
+        `exact(row_ids) -> scores` re-ranks the shortlist with true cosine
+        similarities; without it the sketch scores are returned. `n_probe` and
+        `shortlist` default to the values the index was built with.
+        """
+        n_probe, shortlist = n_probe or self.n_probe, max(shortlist or self.shortlist, k)
+        with stage("ann_search", n_probe=n_probe, shortlist=shortlist) as record:
+            row_ids, scores = self.candidates(query_row, n_probe, shortlist)
+            record["n_candidates"] = int(row_ids.shape[0])
+            if exact is not None and row_ids.shape[0]:
+                scores = np.asarray(exact(row_ids), dtype=np.float64)
+            order = np.lexsort((row_ids, -scores))[:k]  # ties: lower row first
+            return row_ids[order], scores[order]
+
+    # --- Persistence ---
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ("centroids", "vectors", "row_ids", "offsets"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        meta = {"format": INDEX_FORMAT_VERSION, "n_features": self.projection.n_features,
+                "dim": self.projection.dim, "seed": self.projection.seed, "n_rows": self.n_rows,
+                "n_probe": self.n_probe, "shortlist": self.shortlist}
+        tmp_path = os.path.join(path, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(path, "meta.json"))  # written last: marks the index complete
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported ANN index format in {path}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                  for name in ("centroids", "vectors", "row_ids", "offsets")}
+        projection = SketchProjection(meta["n_features"], meta["dim"], meta["seed"])
+        return cls(projection, np.asarray(arrays["centroids"]), arrays["vectors"], arrays["row_ids"],
+                   np.asarray(arrays["offsets"]), meta["n_rows"], meta["n_probe"], meta["shortlist"])
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, "meta.json"))
@@ -0,0 +1,300 @@
+# Streamlit-free screening API.
+#
+# Everything the three app scripts used to copy between themselves lives here:
+# PDF text extraction, resume-vs-JD ranking and resume-vs-profile matching.
+# Functions return plain values plus a list of `ScreeningWarning`s instead of
+# calling st.warning/st.error, so workers, benchmarks and API processes can use
+# them without starting Streamlit. numpy/scipy/sklearn/PyPDF2 are only imported
+# when a function that needs them is first called, which keeps `import
+# screener` cheap for processes that never score anything.
+import contextvars
+import os
+from collections import namedtuple
+
+from .instrumentation import stage
+
+# Bump when the extraction logic changes so cached texts are not reused
+EXTRACTOR_VERSION = "pypdf2-strip-1"
+
+# "tfidf": exact TfidfVectorizer scoring (fits a vocabulary over the batch).
+# "hashing": vocabulary-free hashed TF-IDF that streams documents in chunks
+# (see screener/hashing.py); rankings agree with "tfidf" up to hash collisions.
+# "embedding": dense semantic embeddings from a local model, or an LSA model
+# fitted on our own corpus (see screener/embeddings.py).
+SCORING_ENGINES = ("tfidf", "hashing", "embedding")
+DEFAULT_ENGINE = os.environ.get("RESUME_SCORING_ENGINE", "tfidf")
+
+# Set while a batch the embedding engine could not score is ranked again
+# (`_rank_or_fall_back`); it overrides every engine choice made inside
+_engine_override = contextvars.ContextVar("screener_engine_override", default=None)
+
+# Collapse exact and near-duplicate resumes before scoring (screener/dedup.py)
+DEFAULT_DEDUP = os.environ.get("RESUME_DEDUP", "1") != "0"
+
+# `code` is machine-readable ("page_unreadable", "truncated", "empty_text",
+# "unreadable_file", "vectorizer_error", "embedding_unavailable"); `name` is
+# the file or profile set the warning is about.
+ScreeningWarning = namedtuple("ScreeningWarning", ["code", "message", "name"])
+
+# Resumes that made it through extraction, with one score per resume (input order)
+# in a float32 array; the texts are not kept. `duplicates` lists the uploads
+# collapsed into a kept resume (`dedup.Duplicate`); they are not in `names`.
+RankingResult = namedtuple("RankingResult", ["names", "scores", "warnings", "duplicates"], defaults=[()])
+
+# Several JDs at once: `scores[i, j]` is candidate `names[i]` against role `roles[j]`
+MatrixRankingResult = namedtuple("MatrixRankingResult", ["names", "roles", "scores", "warnings", "duplicates"])
+
+# Profile name -> score, sorted best first; empty when matching failed
+MatchResult = namedtuple("MatchResult", ["matches", "warnings"])
+
+
+def _page_warnings(result):
+    warnings = [ScreeningWarning("page_unreadable", message, result.name) for message in result.warnings]
+    if result.truncated:
+        warnings.append(ScreeningWarning(
+            "truncated",
+            f"'{result.name}' exceeds the extraction budget; only its first part was used.",
+            result.name,
+        ))
+    return warnings
+
+
+def extract_text_from_pdf(file_obj, use_cache=True, **kwargs):
+    """Text of one PDF (upload, open file, path or bytes) as an `ExtractionResult`.
+
+    `max_pages` / `max_chars` keyword arguments cap how much of it is read.
+    """
+    from .extraction import extract_all
+    from .text_cache import get_default_cache
+
+    with stage("extract_pdf", n_documents=1):
+        return extract_all(
+            [file_obj],
+            max_workers=0,
+            cache=get_default_cache() if use_cache else None,
+            extractor_version=EXTRACTOR_VERSION,
+            **kwargs,
+        )[0]
+
+
+def extract_texts(files, progress=None, use_cache=True, **kwargs):
+    """Extract many PDFs in parallel worker processes; results in input order.
+
+    Extra keyword arguments (`max_workers`, `timeout`, `max_pages`, `max_chars`)
+    go to `extraction.iter_extract`.
+    """
+    from .extraction import extract_all
+    from .text_cache import get_default_cache
+
+    files = list(files)
+    with stage("extract_pdf", n_documents=len(files)):
+        return extract_all(
+            files,
+            progress=progress,
+            cache=get_default_cache() if use_cache else None,
+            extractor_version=EXTRACTOR_VERSION,
+            **kwargs,
+        )
+
+
+def collect_resumes(extraction_results):
+    """Split extraction results into `(names, texts, warnings)`, skipping empty/unreadable files."""
+    names, texts, warnings = [], [], []
+    for result in extraction_results:
+        warnings.extend(_page_warnings(result))
+        if result.error is not None:
+            warnings.append(ScreeningWarning(
+                "unreadable_file",
+                f"Could not extract text from '{result.name}' ({result.error}). Skipping.",
+                result.name,
+            ))
+        elif not result.text.strip():
+            warnings.append(ScreeningWarning(
+                "empty_text",
+                f"Could not extract text from '{result.name}' or it's empty. Skipping.",
+                result.name,
+            ))
+        else:
+            names.append(result.name)
+            texts.append(result.text)
+    return names, texts, warnings
+
+
+def _check_engine(engine):
+    engine = _engine_override.get() or engine or DEFAULT_ENGINE
+    if engine not in SCORING_ENGINES:
+        raise ValueError(f"Unknown scoring engine {engine!r}; expected one of {SCORING_ENGINES}")
+    return engine
+
+
+def rank_resumes(job_description, resumes_text_list, engine=None):
+    """TF-IDF cosine similarity of each resume against the job description (sparse).
+
+    With `engine="hashing"`, `resumes_text_list` may be any iterable (e.g. a
+    generator over a large pool). It is processed in fixed-size chunks.
+    With `engine="embedding"` the scores are cosine similarities of dense
+    embeddings, clipped at 0.
+    """
+    engine = _check_engine(engine)
+    if engine == "hashing":
+        from .hashing import rank_documents_hashed
+
+        return rank_documents_hashed(job_description, resumes_text_list)
+    if engine == "embedding":
+        from .embeddings import rank_documents_embedded
+
+        return rank_documents_embedded(job_description, resumes_text_list)
+
+    from .scoring import rank_documents
+
+    return rank_documents(job_description, resumes_text_list)
+
+
+def rank_resumes_hybrid(job_description, resumes_text_list, engine=None, weights=None):
+    """`rank_resumes` blended with the structural match (skills, titles, degree, experience).
+
+    `weights` maps "text", "skills", "title", "degree" and "experience" to
+    their share; the default comes from RESUME_HYBRID_WEIGHTS (see
+    screener/structure.py).
+    """
+    from .structure import hybrid_scores
+
+    texts = list(resumes_text_list)
+    return hybrid_scores(job_description, texts, rank_resumes(job_description, texts, engine), weights).scores
+
+
+def rank_resumes_matrix(job_descriptions, resumes_text_list, engine=None):
+    """Candidates x roles float32 score matrix: every resume and JD vectorized once, one product.
+
+    All JDs share one vocabulary/IDF with the resumes, so a column differs
+    slightly from `rank_resumes` with that JD alone.
+    """
+    import numpy as np
+
+    engine = _check_engine(engine)
+    job_descriptions, texts = list(job_descriptions), list(resumes_text_list)
+    if engine == "hashing":
+        from .hashing import score_matrix_hashed as score_matrix
+    elif engine == "embedding":
+        from .embeddings import score_matrix_embedded as score_matrix
+    else:
+        from .scoring import score_matrix
+    return np.ascontiguousarray(score_matrix(job_descriptions, texts).T, dtype=np.float32)
+
+
+def rank_resumes_matrix_hybrid(job_descriptions, resumes_text_list, engine=None, weights=None):
+    """`rank_resumes_matrix` with every column blended with the structural match.
+
+    Resumes are scanned for skills, titles, degree and experience once; each
+    JD only adds its own requirements.
+    """
+    from .structure import blend, component_scores, get_matcher
+
+    job_descriptions, texts = list(job_descriptions), list(resumes_text_list)
+    scores = rank_resumes_matrix(job_descriptions, texts, engine)
+    matcher = get_matcher()
+    features = matcher.extract_many(texts)
+    with stage("structure_blend", n_documents=len(texts), n_queries=len(job_descriptions)):
+        for j, job_description in enumerate(job_descriptions):
+            scores[:, j] = blend(scores[:, j], component_scores(matcher.requirements(job_description), features), weights)
+    return scores
+
+
+def _embedding_fallback_warning(error):
+    return ScreeningWarning("embedding_unavailable", f"{error} Scored with TF-IDF instead.", None)
+
+
+def _rank_or_fall_back(rank, *args):
+    """`(scores, warnings)` of `rank(*args)`, re-ranked with TF-IDF when the embedding engine has no model."""
+    from .embeddings import EmbeddingUnavailable
+
+    try:
+        return rank(*args), []
+    except EmbeddingUnavailable as e:
+        token = _engine_override.set("tfidf")
+        try:
+            return rank(*args), [_embedding_fallback_warning(e)]
+        finally:
+            _engine_override.reset(token)
+
+
+def deduplicate_resumes(names, texts):
+    """`(names, texts, duplicates)` with exact and near-duplicate resumes collapsed into their first copy."""
+    from .dedup import duplicate_report, find_duplicates
+
+    deduplication = find_duplicates(texts)
+    keep = deduplication.keep.tolist()
+    return [names[i] for i in keep], [texts[i] for i in keep], duplicate_report(names, deduplication)
+
+
+def screen_resumes(job_description, extraction_results, rank=rank_resumes, dedup=None):
+    """Rank already-extracted resumes against a JD, as a `RankingResult`.
+
+    `scores` is None when no resume had usable text. `rank` can be swapped for
+    any `(job_description, texts) -> scores` function (e.g. an incremental one).
+    Unless `dedup` is False (default: RESUME_DEDUP), duplicate uploads are
+    collapsed first, so only unique resumes are scored and shown. When the
+    embedding engine has no model for the batch, it is ranked with TF-IDF
+    and an "embedding_unavailable" warning says so.
+    """
+    import numpy as np
+
+    names, texts, warnings = collect_resumes(extraction_results)
+    duplicates = []
+    if (DEFAULT_DEDUP if dedup is None else dedup) and len(texts) > 1:
+        names, texts, duplicates = deduplicate_resumes(names, texts)
+    scores = None
+    if texts:
+        scores, fallback = _rank_or_fall_back(rank, job_description, texts)
+        scores = np.asarray(scores, dtype=np.float32)
+        warnings += fallback
+    return RankingResult(names, scores, warnings, duplicates)
+
+
+def screen_resumes_matrix(job_descriptions, extraction_results, rank=rank_resumes_matrix, dedup=None):
+    """Rank already-extracted resumes against several JDs ({role: text}), as a `MatrixRankingResult`.
+
+    `rank(jd_texts, texts)` returns the candidates x roles matrix; `scores`
+    is None when no resume had usable text. Duplicates are collapsed, and the
+    embedding engine falls back to TF-IDF, as in `screen_resumes`.
+    """
+    names, texts, warnings = collect_resumes(extraction_results)
+    duplicates = []
+    if (DEFAULT_DEDUP if dedup is None else dedup) and len(texts) > 1:
+        names, texts, duplicates = deduplicate_resumes(names, texts)
+    roles = list(job_descriptions)
+    scores = None
+    if texts:
+        scores, fallback = _rank_or_fall_back(rank, [job_descriptions[role] for role in roles], texts)
+        warnings += fallback
+    return MatrixRankingResult(names, roles, scores, warnings, duplicates)
+
+
+def match_resume_to_profiles(resume_text, job_profiles_dict, index_loader=None, engine=None, top_k=None):
+    """Match one resume against the job profiles, as a `MatchResult`.
+
+    `index_loader(job_profiles_dict, engine)` returns a fitted `ProfileIndex`;
+    by default the process-wide one from `profile_index.get_profile_index`.
+    With `top_k`, only the best `top_k` profiles are returned (found through
+    the ANN index for large taxonomies). Without an embedding model for the
+    profiles, the embedding engine falls back to TF-IDF with a warning.
+    """
+    engine = _check_engine(engine)
+    if index_loader is None:
+        from .profile_index import get_profile_index as index_loader
+
+    warnings = []
+    try:
+        try:
+            profile_index = index_loader(job_profiles_dict, engine)
+        except ValueError as e:
+            from .embeddings import EmbeddingUnavailable
+
+            if not isinstance(e, EmbeddingUnavailable):
+                raise
+            profile_index = index_loader(job_profiles_dict, "tfidf")
+            warnings.append(_embedding_fallback_warning(e))
+    except ValueError as e:
+        # All profile text was empty after stop-word removal
+        return MatchResult({}, [ScreeningWarning("vectorizer_error", f"TF-IDF Vectorization Error: {e}.", None)])
+    return MatchResult(profile_index.match(resume_text, top_k), warnings)
@@ -0,0 +1,227 @@
+# Near-duplicate resume detection ahead of ranking.
+#
+# The same CV often arrives more than once: a candidate applies twice, or an
+# agency resubmits it with a changed phone number. Every copy would otherwise
+# be vectorized, scored and shown. `find_duplicates` runs in two passes:
+#   - exact: resumes whose word sequences (the shared token ids, so case,
+#     punctuation and whitespace do not matter) hash the same
+#   - near: MinHash signatures (NUM_PERM one-permutation bins) over word
+#     SHINGLE_SIZE-grams, split into LSH bands. Resumes sharing a band bucket are candidates. Each
+#     candidate is compared with the first resume in its bucket only, and the
+#     pair is accepted when the estimated Jaccard similarity reaches
+#     DEFAULT_THRESHOLD.
+# Signatures cost O(total shingles) and the banding is one sort per band, so
+# tens of thousands of resumes never go through an all-pairs comparison.
+# Accepted pairs are merged with union-find. The earliest upload of each group
+# is kept, and the rest are reported as duplicates of it.
+import hashlib
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from .instrumentation import stage
+from .tokens import current_vocabulary, token_ids
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16  # rows per band = NUM_PERM // BANDS; pairs near (1 / BANDS) ** (BANDS / NUM_PERM) ~ 0.7 start to collide
+DEFAULT_THRESHOLD = float(os.environ.get("RESUME_DEDUP_THRESHOLD", "0.85"))
+CHUNK_SHINGLES = 1 << 18  # token ids shingled per block (about a dozen arrays of this length are alive at once)
+DENSIFY_ROWS = 4096  # signatures densified per block
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# `duplicate_of[i]` is the index of the kept resume document i collapses into
+# (-1 when i is kept); `exact[i]` marks exact copies; `similarity[i]` is 1.0
+# for those and the estimated Jaccard similarity to the kept resume otherwise
+Deduplication = namedtuple("Deduplication", ["keep", "duplicate_of", "exact", "similarity"])
+
+# One collapsed upload, for reports: `kind` is "exact" or "near"
+Duplicate = namedtuple("Duplicate", ["name", "kept", "kind", "similarity"])
+
+
+def _mix(values):
+    """splitmix64 finalizer on a uint64 array (wrapping arithmetic)."""
+    with np.errstate(over="ignore"):
+        values = values ^ (values >> np.uint64(30))
+        values = values * np.uint64(0xBF58476D1CE4E5B9)
+        values = values ^ (values >> np.uint64(27))
+        values = values * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def _shingle_hashes(id_arrays, size):
+    """`(hashes, counts)`: uint64 hashes of every `size` consecutive ids of each array, concatenated.
+
+    An array shorter than `size` gives one shingle of all its ids, an empty
+    one none. Duplicate shingles are kept (they cannot change a minimum).
+    """
+    lengths = np.array([ids.shape[0] for ids in id_arrays], dtype=np.int64)
+    counts = np.where(lengths > 0, np.maximum(lengths - size + 1, 1), 0)
+    stream = np.concatenate(id_arrays).astype(np.uint64) if id_arrays else np.zeros(0, dtype=np.uint64)
+    doc_starts = np.cumsum(lengths) - lengths
+    # Position of each shingle's first id in the stream, and how many ids it spans
+    starts = np.repeat(doc_starts, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    spans = np.repeat(np.minimum(lengths, size), counts)
+    hashes = np.zeros(starts.shape[0], dtype=np.uint64)
+    for offset in range(size):
+        inside = spans > offset
+        hashes[inside] = _mix(hashes[inside] ^ stream[starts[inside] + offset])
+    return hashes, counts
+
+
+def minhash_signatures(id_arrays, shingle_size=SHINGLE_SIZE, num_perm=NUM_PERM, seed=0):
+    """`(n_docs, num_perm)` uint64 MinHash signatures of the token-id shingles of each array.
+
+    One-permutation hashing: each shingle is hashed once, its top bits pick
+    one of `num_perm` bins and the rest is the value whose minimum the bin
+    keeps. Bins no shingle fell into are filled from the next non-empty bin
+    to the right, offset by the distance (rotation densification), so two
+    identical sets always get identical signatures. A document without
+    shingles keeps all-max values.
+    """
+    bin_bits = int(num_perm).bit_length() - 1
+    if 1 << bin_bits != num_perm:
+        raise ValueError(f"num_perm must be a power of two, got {num_perm}")
+    value_bits = np.uint64(64 - bin_bits)
+    value_mask = np.uint64((1 << (64 - bin_bits)) - 1)
+    salt = _mix(np.array([seed], dtype=np.uint64))[0]
+
+    signatures = np.full((len(id_arrays), num_perm), _MASK64, dtype=np.uint64)
+    flat = signatures.reshape(-1)
+    doc = 0
+    while doc < len(id_arrays):
+        # Whole documents per block, up to about CHUNK_SHINGLES shingles
+        stop, n_ids = doc, 0
+        while stop < len(id_arrays) and (stop == doc or n_ids + id_arrays[stop].shape[0] <= CHUNK_SHINGLES):
+            n_ids += id_arrays[stop].shape[0]
+            stop += 1
+        hashes, counts = _shingle_hashes(id_arrays[doc:stop], shingle_size)
+        hashes = _mix(hashes ^ salt)
+        rows = np.repeat(np.arange(doc, stop, dtype=np.uint64), counts)
+        slots = rows * np.uint64(num_perm) + (hashes >> value_bits)
+        np.minimum.at(flat, slots.astype(np.intp), hashes & value_mask)
+        doc = stop
+
+    # Densify: an empty bin takes the value d bins to its right plus d * 2**value_bits.
+    # Row blocks keep the rolled copies small.
+    for start in range(0, signatures.shape[0], DENSIFY_ROWS):
+        block = signatures[start:start + DENSIFY_ROWS]
+        empty = block == _MASK64
+        filled = np.any(~empty, axis=1)
+        source, step = block.copy(), 0
+        while np.any(empty[filled]) and step < num_perm - 1:
+            step += 1
+            source = np.roll(source, -1, axis=1)
+            take = empty & (source != _MASK64)
+            take &= filled[:, None]
+            with np.errstate(over="ignore"):
+                block[take] = source[take] + np.uint64(step) * (value_mask + np.uint64(1))
+            empty &= ~take
+    return signatures
+
+
+def _band_candidates(signatures, bands):
+    """(first, other) index pairs sharing a bucket in some band, each pair against its bucket's first member."""
+    n_docs, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    pairs = []
+    for band in range(bands):
+        keys = np.zeros(n_docs, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for column in range(band * rows_per_band, (band + 1) * rows_per_band):
+                keys = _mix(keys ^ signatures[:, column])
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        run = np.diff(np.r_[starts, n_docs])
+        shared = np.repeat(run > 1, run)
+        firsts = order[np.repeat(starts, run)]
+        members = order
+        keep = shared & (members != firsts)
+        pairs.append(np.stack([firsts[keep], members[keep]], axis=1))
+    pairs = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+    return np.unique(pairs, axis=0)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_duplicates(texts, threshold=DEFAULT_THRESHOLD, shingle_size=SHINGLE_SIZE, num_perm=NUM_PERM,
+                    bands=BANDS, seed=0):
+    """`Deduplication` of `texts`: exact copies first, then near-duplicates via MinHash LSH."""
+    texts = list(texts)
+    n_docs = len(texts)
+    duplicate_of = np.full(n_docs, -1, dtype=np.int64)
+    exact = np.zeros(n_docs, dtype=bool)
+    similarity = np.zeros(n_docs, dtype=np.float32)
+
+    with stage("dedup_exact", n_documents=n_docs) as record:
+        vocabulary = current_vocabulary()
+        ids = [token_ids(text, vocabulary=vocabulary) for text in texts]
+        first_seen = {}
+        for i, text_ids in enumerate(ids):
+            digest = hashlib.blake2b(text_ids.tobytes(), digest_size=16).digest()
+            kept = first_seen.setdefault(digest, i)
+            if kept != i:
+                duplicate_of[i], exact[i], similarity[i] = kept, True, 1.0
+        record["duplicates"] = int(np.count_nonzero(duplicate_of >= 0))
+
+    unique = np.flatnonzero(duplicate_of < 0)
+    with stage("dedup_minhash", n_documents=unique.shape[0]) as record:
+        unique_ids = [ids[i] for i in unique.tolist()]
+        signatures = minhash_signatures(unique_ids, shingle_size, num_perm, seed)
+        has_shingles = np.array([text_ids.shape[0] > 0 for text_ids in unique_ids], dtype=bool)
+
+    with stage("dedup_lsh", n_documents=unique.shape[0], bands=bands) as record:
+        pairs = _band_candidates(signatures, bands) if unique.shape[0] > 1 else np.zeros((0, 2), dtype=np.int64)
+        pairs = pairs[has_shingles[pairs[:, 0]] & has_shingles[pairs[:, 1]]]
+        estimates = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        accepted = pairs[estimates >= threshold]
+        record.update(candidate_pairs=int(pairs.shape[0]), accepted_pairs=int(accepted.shape[0]))
+
+        parent = list(range(unique.shape[0]))
+        for a, b in accepted.tolist():
+            root_a, root_b = _find(parent, a), _find(parent, b)
+            if root_a != root_b:
+                # The earlier upload stays the group's root
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        for local in range(unique.shape[0]):
+            root = _find(parent, local)
+            if root != local:
+                i, kept = unique[local], unique[root]
+                duplicate_of[i] = kept
+                similarity[i] = (signatures[local] == signatures[root]).mean()
+        record["duplicates"] = int(np.count_nonzero(duplicate_of >= 0))
+
+    # Exact copies of a resume that itself collapsed follow it to the group's kept resume
+    copies = np.flatnonzero(exact)
+    chained = copies[duplicate_of[duplicate_of[copies]] >= 0]
+    duplicate_of[chained] = duplicate_of[duplicate_of[chained]]
+    return Deduplication(np.flatnonzero(duplicate_of < 0), duplicate_of, exact, similarity)
+
+
+def content_digest(text):
+    """16-byte digest of the words of `text` (case, punctuation and spacing ignored), stable across processes.
+
+    Unlike the exact pass above, which hashes this process's token ids, the
+    words themselves are hashed, so the digest can be stored (feature store).
+    """
+    vocabulary = current_vocabulary()
+    words = vocabulary.words
+    joined = " ".join([words[i] for i in token_ids(text, vocabulary=vocabulary).tolist()])
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=16).digest()
+
+
+def duplicate_report(names, deduplication):
+    """`Duplicate` records (input order) for every collapsed name."""
+    return [
+        Duplicate(names[i], names[kept], "exact" if deduplication.exact[i] else "near",
+                  float(deduplication.similarity[i]))
+        for i, kept in enumerate(deduplication.duplicate_of.tolist()) if kept >= 0
+    ]
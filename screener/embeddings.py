@@ -0,0 +1,397 @@
+# Dense-embedding scoring ("embedding" engine).
+#
+# Two encoders sit behind the same `Embedder`:
+#   - a sentence-transformers model stored locally (RESUME_EMBEDDING_MODEL,
+#     default models/embedding/). It is only used when that directory exists
+#     and sentence-transformers is installed; nothing is downloaded.
+#   - otherwise an LSA model (TF-IDF followed by TruncatedSVD) fitted on our
+#     own corpus. `python -m screener.embeddings fit DIR` fits one on a
+#     directory of .txt resumes and pickles it to RESUME_LSA_MODEL, which is
+#     then used everywhere. Without a saved model, a call with at least
+#     MIN_FIT_DOCUMENTS documents fits a throwaway model on them (nothing is
+#     written to disk implicitly). Smaller calls raise EmbeddingUnavailable:
+#     an SVD of a handful of documents gives meaningless similarities (a
+#     single resume always scores 1.0 or 0.0). `screener.core` then falls
+#     back to TF-IDF with a warning.
+#
+# `Embedder.embed` looks every text up in a cache keyed by model name and text
+# SHA-256 (memory LRU, then SQLite), so the JD, the profiles and resumes seen
+# before are encoded only once. Misses are cut into overlapping word windows
+# when the encoder has a length limit. The windows are sorted by length,
+# encoded in batches on a thread pool, and mean-pooled back into one unit
+# vector per text.
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .instrumentation import stage
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODEL_DIR = os.environ.get("RESUME_EMBEDDING_MODEL", os.path.join(_ROOT, "models", "embedding"))
+DEFAULT_LSA_PATH = os.environ.get("RESUME_LSA_MODEL", os.path.join(_ROOT, ".cache", "lsa_model.pkl"))
+DEFAULT_CACHE_PATH = os.environ.get("RESUME_EMBEDDING_CACHE", os.path.join(_ROOT, ".cache", "embeddings.sqlite"))
+DEFAULT_THREADS = int(os.environ.get("RESUME_EMBEDDING_THREADS", str(os.cpu_count() or 1)))
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_MEMORY_ENTRIES = 50000
+LSA_COMPONENTS = 256
+MIN_FIT_DOCUMENTS = int(os.environ.get("RESUME_EMBEDDING_MIN_FIT_DOCUMENTS", "200"))
+CHUNK_WORDS = 200  # ~256 word pieces, inside typical 384/512-token limits
+CHUNK_OVERLAP = 50
+
+
+class EmbeddingUnavailable(ValueError):
+    """No saved or local embedding model, and too few documents to fit a throwaway one."""
+
+
+def _unit_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def chunk_words(text, max_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """Overlapping windows of at most `max_words` words (the whole text when it fits)."""
+    words = text.split()
+    if max_words is None or len(words) <= max_words:
+        return [text]
+    step = max_words - overlap
+    return [" ".join(words[start:start + max_words]) for start in range(0, len(words) - overlap, step)]
+
+
+# --- Encoders: texts -> (n, dim) float32 unit rows ---
+class SentenceTransformerEncoder:
+    max_words = CHUNK_WORDS
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR):
+        self.model_dir = model_dir
+        self.name = f"st-{os.path.basename(os.path.normpath(model_dir))}"
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _loaded(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(self.model_dir, device="cpu")
+            return self._model
+
+    @property
+    def dim(self):
+        return self._loaded().get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return self._loaded().encode(list(texts), batch_size=len(texts), normalize_embeddings=True,
+                                     convert_to_numpy=True).astype(np.float32)
+
+    def __getstate__(self):
+        return {"model_dir": self.model_dir}  # the weights are reloaded from disk, never pickled
+
+    def __setstate__(self, state):
+        self.__init__(state["model_dir"])
+
+
+class LSAEncoder:
+    max_words = None  # bag-of-words model: any length, no chunking needed
+
+    def __init__(self, vectorizer, svd):
+        self.vectorizer = vectorizer
+        self.svd = svd
+        digest = hashlib.sha256(np.ascontiguousarray(svd.components_, dtype=np.float32).tobytes())
+        self.name = f"lsa-{digest.hexdigest()[:16]}"
+
+    @classmethod
+    def fit(cls, texts, n_components=LSA_COMPONENTS, seed=0):
+        """Fit TF-IDF + TruncatedSVD on `texts`; raises ValueError on an empty vocabulary."""
+        from sklearn.decomposition import TruncatedSVD
+
+        from .tokens import TermTfidfVectorizer
+
+        texts = list(texts)
+        with stage("lsa_fit", n_documents=len(texts)) as record:
+            vectorizer = TermTfidfVectorizer(sublinear_tf=True)
+            matrix = vectorizer.fit_transform(texts)
+            n_components = max(1, min(n_components, matrix.shape[0] - 1, matrix.shape[1] - 1))
+            svd = TruncatedSVD(n_components=n_components, random_state=seed).fit(matrix)
+            record["vocabulary_size"] = matrix.shape[1]
+        return cls(vectorizer, svd)
+
+    @property
+    def dim(self):
+        return self.svd.components_.shape[0]
+
+    def encode(self, texts):
+        return _unit_rows(self.svd.transform(self.vectorizer.transform(texts)))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+# --- Embedding cache ---
+class EmbeddingCache:
+    """`model:sha256(text)` -> float32 vector; in-memory LRU over an optional SQLite file."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_memory_entries=DEFAULT_MAX_MEMORY_ENTRIES):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self):
+        # Connections must not be shared across forked worker processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """Cached vectors for `keys` (None where missing)."""
+        found = [None] * len(keys)
+        with self._lock:
+            missing = []
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(i)
+                else:
+                    self._memory.move_to_end(key)
+                    found[i] = vector
+            if missing and self.path is not None:
+                conn = self._connection()
+                for i in missing:
+                    row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (keys[i],)).fetchone()
+                    if row is not None:
+                        found[i] = np.frombuffer(row[0], dtype=np.float32)
+                        self._remember(keys[i], found[i])
+            hits = sum(vector is not None for vector in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, keys, vectors):
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            if self.path is not None:
+                conn = self._connection()
+                conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                                 [(key, np.asarray(v, dtype=np.float32).tobytes()) for key, v in zip(keys, vectors)])
+                conn.commit()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+
+# --- Embedder ---
+class Embedder:
+    """Cached, chunked, batched, threaded embeddings for one encoder.
+
+    Also quacks like a fitted vectorizer (`transform` / `fit_transform` return
+    CSR rows), so a `ProfileIndex` can hold one and keep its profile matrix.
+    """
+
+    def __init__(self, encoder, cache=None, threads=DEFAULT_THREADS, batch_size=DEFAULT_BATCH_SIZE):
+        self.encoder = encoder
+        self.cache = cache if cache is not None else EmbeddingCache(path=None)
+        self.threads = threads
+        self.batch_size = batch_size
+        self._executor = None
+
+    @property
+    def name(self):
+        return self.encoder.name
+
+    def _encode_missing(self, texts):
+        chunks, owners = [], []
+        for owner, text in enumerate(texts):
+            for chunk in chunk_words(text, self.encoder.max_words):
+                chunks.append(chunk)
+                owners.append(owner)
+        # Similar lengths per batch: padded encoders waste less, and batches take similar time
+        order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        encode = lambda batch: self.encoder.encode([chunks[i] for i in batch])  # noqa: E731
+        if self.threads > 1 and len(batches) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix="embed")
+            encoded = list(self._executor.map(encode, batches))
+        else:
+            encoded = [encode(batch) for batch in batches]
+
+        chunk_vectors = np.empty((len(chunks), encoded[0].shape[1]), dtype=np.float32)
+        for batch, vectors in zip(batches, encoded):
+            chunk_vectors[batch] = vectors
+        # Mean-pool each text's windows, weighted by their word counts
+        weights = np.array([len(chunk.split()) or 1 for chunk in chunks], dtype=np.float32)
+        pooled = np.zeros((len(texts), chunk_vectors.shape[1]), dtype=np.float32)
+        np.add.at(pooled, np.array(owners), chunk_vectors * weights[:, None])
+        return _unit_rows(pooled), len(chunks)
+
+    def embed(self, texts):
+        """(n, dim) float32 unit vectors, one per text, in input order."""
+        texts = list(texts)
+        keys = [f"{self.name}:{hashlib.sha256(t.encode('utf-8')).hexdigest()}" for t in texts]
+        with stage("embed", n_documents=len(texts)) as record:
+            vectors = self.cache.get_many(keys)
+            missing = [i for i, v in enumerate(vectors) if v is None]
+            record["cache_hits"] = len(texts) - len(missing)
+            if missing:
+                # Duplicate texts are encoded once
+                unique = list(dict.fromkeys(keys[i] for i in missing))
+                text_of = {keys[i]: texts[i] for i in missing}
+                encoded, record["n_chunks"] = self._encode_missing([text_of[k] for k in unique])
+                self.cache.put_many(unique, encoded)
+                by_key = dict(zip(unique, encoded))
+                for i in missing:
+                    vectors[i] = by_key[keys[i]]
+        if not texts:
+            return np.zeros((0, self.encoder.dim), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def transform(self, texts):
+        import scipy.sparse as sp
+
+        return sp.csr_matrix(self.embed(texts))
+
+    def fit_transform(self, texts):
+        return self.transform(texts)  # the encoder is already fitted
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_executor"] = None
+        state["cache"] = "default" if self.cache is _default_cache else None  # caches are per process
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache = get_default_cache() if self.cache == "default" else EmbeddingCache(path=None)
+
+
+_default_cache = None
+_default_embedder = None
+_lock = threading.Lock()
+
+
+def get_default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = EmbeddingCache()
+    return _default_cache
+
+
+def load_encoder(model_dir=DEFAULT_MODEL_DIR, lsa_path=DEFAULT_LSA_PATH):
+    """The local sentence-transformers model, else the saved LSA model, else None."""
+    if os.path.isdir(model_dir):
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            pass  # model files but no runtime: fall back to LSA
+        else:
+            return SentenceTransformerEncoder(model_dir)
+    if os.path.exists(lsa_path):
+        return LSAEncoder.load(lsa_path)
+    return None
+
+
+def get_embedder(corpus=None, min_documents=None):
+    """Process-wide `Embedder`; with no saved model, an LSA model is fitted on `corpus`.
+
+    The fitted model only serves this call (memory-only cache) and is never
+    saved: persistent models come from `python -m screener.embeddings fit`.
+    A corpus of fewer than `min_documents` (default MIN_FIT_DOCUMENTS)
+    non-empty texts raises EmbeddingUnavailable instead.
+    """
+    min_documents = MIN_FIT_DOCUMENTS if min_documents is None else min_documents
+    global _default_embedder
+    with _lock:
+        if _default_embedder is None:
+            encoder = load_encoder()
+            if encoder is not None:
+                _default_embedder = Embedder(encoder, get_default_cache())
+        if _default_embedder is not None:
+            return _default_embedder
+        corpus = [text for text in (corpus or []) if text.strip()]
+        if not corpus or len(corpus) < min_documents:
+            raise EmbeddingUnavailable(
+                f"No embedding model is available and {len(corpus)} documents are too few to fit one "
+                f"(at least {max(min_documents, 1)} are needed; save a model with `python -m screener.embeddings fit`).")
+        return Embedder(LSAEncoder.fit(corpus))
+
+
+def rank_documents_embedded(query_text, documents):
+    """Cosine similarity of each document's embedding with the query's, clipped at 0."""
+    documents = list(documents)
+    if not documents:
+        return np.zeros(0)
+    embedder = get_embedder([query_text] + documents)
+    query = embedder.embed([query_text])[0]
+    with stage("score_dense", n_documents=len(documents)):
+        return np.clip(embedder.embed(documents) @ query, 0.0, None).astype(np.float64)
+
+
+def score_matrix_embedded(query_texts, documents):
+    """(queries x documents) embedding cosine similarities, clipped at 0; every text is embedded once."""
+    query_texts, documents = list(query_texts), list(documents)
+    if not query_texts or not documents:
+        return np.zeros((len(query_texts), len(documents)))
+    embedder = get_embedder(query_texts + documents)
+    queries = embedder.embed(query_texts)
+    with stage("score_dense", n_documents=len(documents), n_queries=len(query_texts)):
+        return np.clip(queries @ embedder.embed(documents).T, 0.0, None).astype(np.float64)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fit the local LSA embedding model on a directory of .txt resumes.")
+    parser.add_argument("command", choices=["fit"])
+    parser.add_argument("corpus", help="Directory of .txt files")
+    parser.add_argument("--output", default=DEFAULT_LSA_PATH)
+    parser.add_argument("--components", type=int, default=LSA_COMPONENTS)
+    args = parser.parse_args(argv)
+
+    texts = []
+    for file_name in sorted(os.listdir(args.corpus)):
+        if file_name.lower().endswith(".txt"):
+            with open(os.path.join(args.corpus, file_name), encoding="utf-8") as f:
+                texts.append(f.read())
+    encoder = LSAEncoder.fit(texts, args.components)
+    encoder.save(args.output)
+    print(f"Fitted {encoder.name} ({encoder.dim} dims) on {len(texts)} documents -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
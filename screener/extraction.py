@@ -0,0 +1,335 @@
+# Parallel PDF text extraction for bulk uploads.
+#
+# PyPDF2 is pure Python and CPU-bound, so parsing a few hundred resumes on the
+# Streamlit script thread pins a single core for minutes. This module fans the
+# raw file bytes out to a small pool of worker processes and streams results
+# back as they finish. Each worker handles one file at a time; a worker that
+# crashes or exceeds the per-file timeout is killed and replaced, so a corrupt
+# or hanging PDF only ever costs its own slot and never stalls the batch.
+# `WorkerPool` keeps such workers alive between calls for long-running callers
+# (the scoring service) that parse one file per request.
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from multiprocessing.connection import wait
+
+from .text_cache import content_key, read_file_bytes
+
+# All knobs can be overridden per deployment without touching the apps
+DEFAULT_WORKERS = int(os.environ.get("RESUME_EXTRACT_WORKERS", "0")) or None  # None -> cpu count
+DEFAULT_TIMEOUT = float(os.environ.get("RESUME_EXTRACT_TIMEOUT", "60"))  # seconds per file
+# Extraction budget: huge uploads (scanned portfolios, 40-page CVs) are cut off
+# after this many pages / characters. 0 means unlimited.
+DEFAULT_MAX_PAGES = int(os.environ.get("RESUME_EXTRACT_MAX_PAGES", "0")) or None
+DEFAULT_MAX_CHARS = int(os.environ.get("RESUME_EXTRACT_MAX_CHARS", "0")) or None
+
+# One extracted upload. `warnings` are per-page messages; `error` is set when the
+# whole file failed (unreadable PDF, worker crash, timeout) and `text` is "".
+# `truncated` means the page/character budget cut the document short.
+ExtractionResult = namedtuple("ExtractionResult", ["index", "name", "text", "warnings", "error", "truncated"],
+                              defaults=[False])
+
+# One page from `iter_pdf_pages`; `error` is the exception message if the page failed
+PageText = namedtuple("PageText", ["page_number", "text", "error"])
+
+
+def _open_pdf(data):
+    from PyPDF2 import PdfReader
+
+    return PdfReader(io.BytesIO(data))
+
+
+def _iter_reader_pages(pdf, max_pages=None):
+    n_pages = len(pdf.pages)
+    if max_pages is not None:
+        n_pages = min(n_pages, max_pages)
+    for page_index in range(n_pages):
+        try:
+            yield PageText(page_index + 1, pdf.pages[page_index].extract_text() or "", None)
+        except Exception as e:
+            yield PageText(page_index + 1, "", str(e))
+
+
+def iter_pdf_pages(data, max_pages=None):
+    """Yield a `PageText` per page of the PDF, parsing each page only when it is reached.
+
+    Pages past `max_pages` are never parsed.
+    """
+    return _iter_reader_pages(_open_pdf(data), max_pages)
+
+
+def parse_pdf_bytes(data, name="", strip=True, max_pages=None, max_chars=None):
+    """Extract text from raw PDF bytes. Returns `(text, page_warnings, truncated)`.
+
+    Page texts are collected and joined once (no repeated string
+    concatenation). Extraction stops as soon as `max_pages` pages or
+    `max_chars` characters have been read; the joined text, separators
+    included, never holds more than `max_chars` characters.
+    """
+    pdf = _open_pdf(data)
+    parts = []
+    warnings = []
+    n_chars = 0
+    truncated = False
+    for page in _iter_reader_pages(pdf, max_pages):
+        if page.error is not None:
+            warnings.append(f"Could not extract text from page {page.page_number} of {name}. Error: {page.error}")
+            continue
+        if not page.text:
+            continue
+        separator = 1 if parts else 0
+        if max_chars is not None and n_chars + separator + len(page.text) > max_chars:
+            remaining = max(0, max_chars - n_chars - separator)
+            if remaining:
+                parts.append(page.text[:remaining])
+            truncated = True
+            break
+        parts.append(page.text)
+        n_chars += separator + len(page.text)
+    else:
+        truncated = max_pages is not None and len(pdf.pages) > max_pages
+
+    text = "\n".join(parts) + "\n" if parts else ""
+    if strip:
+        text = text.strip()
+    elif max_chars is not None:
+        text = text[:max_chars]  # the trailing newline must fit the budget too
+    return text, warnings, truncated
+
+
+def _worker_loop(conn, options):
+    # Runs in a child process: receive (index, name, data), send back a result
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        index, name, data = task
+        try:
+            text, warnings, truncated = parse_pdf_bytes(data, name, **options)
+            conn.send(ExtractionResult(index, name, text, warnings, None, truncated))
+        except Exception as e:
+            conn.send(ExtractionResult(index, name, "", [], f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, ctx, options):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_loop, args=(child_conn, options), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task = None  # (index, name) currently being parsed
+        self.started_at = None
+
+    def submit(self, index, name, data):
+        self.task = (index, name)
+        self.started_at = time.monotonic()
+        self.conn.send((index, name, data))
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(1)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+def _file_name(file_obj, index):
+    if isinstance(file_obj, (str, os.PathLike)):
+        return os.path.basename(file_obj)
+    return getattr(file_obj, "name", None) or f"file_{index + 1}"
+
+
+def cache_version(extractor_version, max_pages=None, max_chars=None):
+    """Cache version tag for texts extracted under the given budget."""
+    if max_pages is None and max_chars is None:
+        return extractor_version
+    # A budgeted extraction is a different text, so it gets its own cache entries
+    return f"{extractor_version}|pages={max_pages}|chars={max_chars}"
+
+
+def iter_extract(files, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, strip=True,
+                 cache=None, extractor_version=None, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text from many uploaded PDFs in parallel.
+
+    Yields an `ExtractionResult` per file *as soon as it is ready* (so not in
+    input order; use `result.index` to place it). Cached texts are yielded
+    first without touching the pool. `max_workers=0` parses in-process, which
+    is handy for debugging but gives up timeout isolation. `max_pages` /
+    `max_chars` cap how much of each document is read.
+    """
+    options = {"strip": strip, "max_pages": max_pages, "max_chars": max_chars}
+    extractor_version = cache_version(extractor_version, max_pages, max_chars)
+
+    # Only the hash is kept for pending files; bytes are re-read when a worker
+    # picks the file up, so a 20k-file directory is never held in memory at once.
+    pending = []
+    for index, file_obj in enumerate(files):
+        name = _file_name(file_obj, index)
+        key = None
+        if cache is not None:
+            key = content_key(read_file_bytes(file_obj), extractor_version)
+            entry = cache.get_entry(key)
+            if entry is not None:
+                yield ExtractionResult(index, name, entry.text, list(entry.warnings), None, entry.truncated)
+                continue
+        pending.append((index, name, file_obj, key))
+
+    def finish(result, key):
+        if cache is not None and result.error is None:
+            cache.put(key, result.text, result.warnings, result.truncated)
+        return result
+
+    if not pending:
+        return
+
+    if max_workers == 0:
+        for index, name, file_obj, key in pending:
+            try:
+                text, warnings, truncated = parse_pdf_bytes(read_file_bytes(file_obj), name, **options)
+                yield finish(ExtractionResult(index, name, text, warnings, None, truncated), key)
+            except Exception as e:
+                yield ExtractionResult(index, name, "", [], f"{type(e).__name__}: {e}")
+        return
+
+    n_workers = min(max_workers or os.cpu_count() or 1, len(pending))
+    ctx = multiprocessing.get_context()
+    keys = {index: key for index, _, _, key in pending}
+    todo = list(reversed(pending))
+    workers = [_Worker(ctx, options) for _ in range(n_workers)]
+    try:
+        while todo or any(w.task is not None for w in workers):
+            for worker in workers:
+                if worker.task is None and todo:
+                    index, name, file_obj, _ = todo.pop()
+                    worker.submit(index, name, read_file_bytes(file_obj))
+
+            busy = [w for w in workers if w.task is not None]
+            now = time.monotonic()
+            wait_for = min(max(timeout - (now - w.started_at), 0) for w in busy) if timeout else None
+            ready = wait([w.conn for w in busy], wait_for)
+
+            for i, worker in enumerate(workers):
+                if worker.task is None:
+                    continue
+                index, name = worker.task
+                if worker.conn in ready:
+                    try:
+                        result = worker.conn.recv()
+                    except (EOFError, OSError):
+                        # The child died mid-parse (e.g. a crash inside the PDF library)
+                        worker.kill()
+                        workers[i] = _Worker(ctx, options)
+                        yield ExtractionResult(index, name, "", [], "worker process crashed")
+                        continue
+                    worker.task = None
+                    yield finish(result, keys[index])
+                elif timeout and time.monotonic() - worker.started_at >= timeout:
+                    worker.kill()
+                    workers[i] = _Worker(ctx, options)
+                    yield ExtractionResult(index, name, "", [], f"timed out after {timeout:g}s")
+    finally:
+        for worker in workers:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
+
+
+class WorkerPool:
+    """Long-lived killable extraction workers, one file per `extract` call.
+
+    `extract` waits for an idle worker, so at most `n_workers` files are
+    parsed at once and further callers queue. A worker that crashes or
+    exceeds `timeout` is killed and replaced, as in `iter_extract`.
+    Thread-safe: call it from a thread pool about `n_workers` wide.
+    """
+
+    def __init__(self, n_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, strip=True,
+                 max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.options = {"strip": strip, "max_pages": max_pages, "max_chars": max_chars}
+        self.replaced = 0
+        self._ctx = multiprocessing.get_context()
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        for _ in range(self.n_workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        worker = _Worker(self._ctx, self.options)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _replace(self, worker):
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+            self.replaced += 1
+        return self._spawn()
+
+    def extract(self, name, data, index=0):
+        """`ExtractionResult` for one PDF's bytes; `error` is set if it crashed or timed out."""
+        worker = self._idle.get()
+        try:
+            try:
+                worker.submit(index, name, data)
+            except (BrokenPipeError, OSError):  # died while idle
+                worker = self._replace(worker)
+                worker.submit(index, name, data)
+            if worker.conn.poll(self.timeout or None):  # 0 means no timeout, as in iter_extract
+                try:
+                    result = worker.conn.recv()
+                    worker.task = None
+                    return result
+                except (EOFError, OSError):
+                    error = "worker process crashed"
+            else:
+                error = f"timed out after {self.timeout:g}s"
+            worker = self._replace(worker)
+            return ExtractionResult(index, name, "", [], error)
+        finally:
+            self._idle.put(worker)
+
+    def stats(self):
+        return {"workers": self.n_workers, "idle": self._idle.qsize(), "replaced": self.replaced}
+
+    def close(self):
+        with self._lock:
+            workers, self._workers = self._workers, set()
+        for worker in workers:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
+
+
+def extract_all(files, progress=None, **kwargs):
+    """Run `iter_extract` to completion and return results in input order.
+
+    `progress(done, total)` is called after every finished file.
+    """
+    files = list(files)
+    results = [None] * len(files)
+    for done, result in enumerate(iter_extract(files, **kwargs), 1):
+        results[result.index] = result
+        if progress is not None:
+            progress(done, len(files))
+    return results
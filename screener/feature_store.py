@@ -0,0 +1,397 @@
+# Append-only, memory-mapped store of hashed term counts for a resume pool.
+#
+# Layout of a store directory:
+#   meta.json        format version, n_features, committed row/nnz counts
+#   data.f32         CSR data (raw term counts), float32
+#   indices.i32      CSR column indices, int32
+#   indptr.i64       CSR row pointers (n_rows + 1 entries), int64
+#   df-<gen>.i64     document frequency per hashed column
+#   ids.jsonl        one candidate id per row
+#   digests.b16      16-byte content digest per row (`dedup.content_digest`;
+#                    zeros when unknown: rows added by `append_counts`, or
+#                    by a version that did not write digests)
+#
+# Appends only ever write past the committed end of each file. meta.json is
+# replaced last and is the commit point: a crash mid-append leaves bytes past
+# the committed lengths, which are ignored on open and overwritten by the next
+# append. Readers map the files read-only (zero-copy via np.frombuffer).
+# Scoring walks the pool in row chunks and tells the kernel it can drop pages
+# already scored, so RSS stays near one chunk rather than the corpus size.
+#
+# IDF is not stored. It is rebuilt from the document frequencies for every
+# query, over the pool plus the query, which gives the same weighting as
+# `TfidfVectorizer(stop_words='english')` on `[job_description] + pool` up to
+# hash collisions.
+#
+# `build_ann` writes an approximate nearest-neighbour index (screener/ann.py)
+# to <store>/ann/, weighted with the IDF at build time. `search` then answers
+# top-K queries from an ANN shortlist plus the rows appended since the build,
+# all re-scored exactly with the current IDF. Rebuild the index once the
+# unindexed tail grows (ANN_STALE_FRACTION).
+import json
+import mmap
+import os
+
+import numpy as np
+
+from .hashing import N_FEATURES, cosine_rows, hashed_counts, query_weights, smoothed_idf
+from .instrumentation import stage
+
+STORE_FORMAT_VERSION = 1
+DEFAULT_CHUNK_ROWS = 4096  # rows scored per step; bounds the scoring temporaries
+DEFAULT_APPEND_ROWS = 20000  # rows vectorized per commit
+ANN_STALE_FRACTION = 0.1  # rebuild the ANN index once this share of rows is unindexed
+
+_DATA, _INDICES, _INDPTR, _IDS, _META = "data.f32", "indices.i32", "indptr.i64", "ids.jsonl", "meta.json"
+_DIGESTS = "digests.b16"
+DIGEST_BYTES = 16
+_ANN = "ann"
+
+
+def _map_array(path, dtype, count):
+    """Zero-copy read-only view of the first `count` items of a file (and its mmap)."""
+    if count == 0:
+        return np.zeros(0, dtype=dtype), None
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return np.frombuffer(mm, dtype=dtype, count=count), mm
+
+
+def _release(mm, n_bytes):
+    """Let the kernel drop already-scanned pages of a read-only mapping from RSS."""
+    if mm is None or not hasattr(mm, "madvise") or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    length = (n_bytes // mmap.PAGESIZE) * mmap.PAGESIZE
+    if length:
+        mm.madvise(mmap.MADV_DONTNEED, 0, length)
+
+
+def _write_at(path, offset, array):
+    mode = "r+b" if os.path.exists(path) else "wb"
+    with open(path, mode) as f:
+        f.seek(offset)
+        f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate()
+
+
+class FeatureStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, _META), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store format in {path}")
+        self.n_features = self.meta["n_features"]
+        self._ids = None
+        self._id_set = None
+        self._content_rows = None
+        self._maps = None
+        self._ann = None
+        self._df = None
+
+    @classmethod
+    def create(cls, path, n_features=N_FEATURES):
+        """Empty store at `path` (the directory may exist but must not hold a store)."""
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, _META)):
+            raise FileExistsError(f"A feature store already exists at {path}")
+        np.zeros(n_features, dtype=np.int64).tofile(os.path.join(path, "df-0.i64"))
+        np.zeros(1, dtype=np.int64).tofile(os.path.join(path, _INDPTR))
+        open(os.path.join(path, _IDS), "wb").close()
+        open(os.path.join(path, _DIGESTS), "wb").close()
+        cls._write_meta(path, {"format": STORE_FORMAT_VERSION, "n_features": n_features,
+                               "n_rows": 0, "nnz": 0, "ids_bytes": 0, "df_generation": 0})
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path, n_features=N_FEATURES):
+        if os.path.exists(os.path.join(path, _META)):
+            return cls(path)
+        return cls.create(path, n_features)
+
+    @staticmethod
+    def _write_meta(path, meta):
+        tmp_path = os.path.join(path, _META + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(path, _META))
+
+    def __len__(self):
+        return self.meta["n_rows"]
+
+    @property
+    def nnz(self):
+        return self.meta["nnz"]
+
+    # --- Candidate ids ---
+    @property
+    def ids(self):
+        """Candidate id per row, in row order."""
+        if self._ids is None:
+            with open(os.path.join(self.path, _IDS), "rb") as f:
+                raw = f.read(self.meta["ids_bytes"])
+            self._ids = [json.loads(line) for line in raw.splitlines()]
+        return self._ids
+
+    def __contains__(self, candidate_id):
+        if self._id_set is None:
+            self._id_set = set(self.ids)
+        return candidate_id in self._id_set
+
+    def _content_index(self):
+        """{content digest: first row holding it}, for the rows with a known digest."""
+        if self._content_rows is None:
+            path, n_bytes = os.path.join(self.path, _DIGESTS), len(self) * DIGEST_BYTES
+            raw = b""
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    raw = f.read(n_bytes)
+            self._content_rows = {}
+            unknown = bytes(DIGEST_BYTES)
+            for row in range(len(raw) // DIGEST_BYTES):
+                digest = raw[row * DIGEST_BYTES:(row + 1) * DIGEST_BYTES]
+                if digest != unknown:
+                    self._content_rows.setdefault(digest, row)
+        return self._content_rows
+
+    def find_content(self, digest):
+        """Id of the stored resume with this `dedup.content_digest`, or None."""
+        row = self._content_index().get(digest)
+        return None if row is None else self.ids[row]
+
+    # --- Reading ---
+    def _arrays(self):
+        if self._maps is None:
+            join = lambda name: os.path.join(self.path, name)  # noqa: E731
+            n_rows, nnz = self.meta["n_rows"], self.meta["nnz"]
+            self._maps = {
+                "data": _map_array(join(_DATA), np.float32, nnz),
+                "indices": _map_array(join(_INDICES), np.int32, nnz),
+                "indptr": _map_array(join(_INDPTR), np.int64, n_rows + 1),
+            }
+        return {name: array for name, (array, _) in self._maps.items()}
+
+    def document_frequencies(self):
+        path = os.path.join(self.path, f"df-{self.meta['df_generation']}.i64")
+        return np.fromfile(path, dtype=np.int64, count=self.n_features)
+
+    def close(self):
+        """Drop the mappings (reopened lazily); needed before appending on some platforms."""
+        maps, self._maps = self._maps, None
+        for _, mm in (maps or {}).values():
+            if mm is not None:
+                try:
+                    mm.close()
+                except BufferError:
+                    pass  # a caller still holds a view; the mapping goes when it does
+
+    def matrix(self, start=0, stop=None):
+        """Rows `start:stop` as a scipy CSR matrix of raw counts (copies only those rows)."""
+        import scipy.sparse as sp
+
+        arrays = self._arrays()
+        stop = len(self) if stop is None else min(stop, len(self))
+        indptr = arrays["indptr"][start:stop + 1]
+        begin, end = int(indptr[0]), int(indptr[-1])
+        return sp.csr_matrix(
+            (arrays["data"][begin:end], arrays["indices"][begin:end], indptr - begin),
+            shape=(stop - start, self.n_features),
+        )
+
+    def rows(self, row_ids):
+        """`(data, indices, indptr)` of the given rows (in that order), copied out of the mappings."""
+        arrays = self._arrays()
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        starts, ends = arrays["indptr"][row_ids], arrays["indptr"][row_ids + 1]
+        lengths = ends - starts
+        indptr = np.zeros(row_ids.shape[0] + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return arrays["data"][positions], arrays["indices"][positions], indptr
+
+    # --- Appending ---
+    def append_counts(self, candidate_ids, counts, digests=None):
+        """Append rows of raw hashed term counts (a CSR matrix with `n_features` columns).
+
+        `digests`: the rows' content digests, if known (see `find_content`).
+        """
+        candidate_ids = [str(c) for c in candidate_ids]
+        digests = [bytes(DIGEST_BYTES)] * len(candidate_ids) if digests is None else list(digests)
+        if len(digests) != len(candidate_ids) or any(len(d) != DIGEST_BYTES for d in digests):
+            raise ValueError(f"Expected one {DIGEST_BYTES}-byte digest per row")
+        counts = counts.tocsr()
+        if counts.shape != (len(candidate_ids), self.n_features):
+            raise ValueError(f"Expected a {len(candidate_ids)} x {self.n_features} matrix, got {counts.shape}")
+        if not candidate_ids:
+            return 0
+        self.close()
+        meta = dict(self.meta)
+        n_rows, nnz = meta["n_rows"], meta["nnz"]
+        counts.sum_duplicates()
+        join = lambda name: os.path.join(self.path, name)  # noqa: E731
+
+        _write_at(join(_DATA), nnz * 4, counts.data.astype(np.float32, copy=False))
+        _write_at(join(_INDICES), nnz * 4, counts.indices.astype(np.int32, copy=False))
+        _write_at(join(_INDPTR), (n_rows + 1) * 8, (counts.indptr[1:] + nnz).astype(np.int64))
+        id_lines = "".join(json.dumps(c) + "\n" for c in candidate_ids).encode("utf-8")
+        with open(join(_IDS), "r+b") as f:
+            f.seek(meta["ids_bytes"])
+            f.write(id_lines)
+            f.truncate()
+        # A store written before digests existed gets zeros (unknown) for its old rows
+        _write_at(join(_DIGESTS), n_rows * DIGEST_BYTES, np.frombuffer(b"".join(digests), dtype=np.uint8))
+
+        df = self.document_frequencies()
+        df += np.bincount(counts.indices, minlength=self.n_features)
+        generation = meta["df_generation"] + 1
+        df.tofile(join(f"df-{generation}.i64"))
+
+        meta.update(n_rows=n_rows + counts.shape[0], nnz=nnz + int(counts.nnz),
+                    ids_bytes=meta["ids_bytes"] + len(id_lines), df_generation=generation)
+        for name in (_DATA, _INDICES, _INDPTR, _IDS, _DIGESTS):
+            with open(join(name), "rb+") as f:
+                os.fsync(f.fileno())
+        self._write_meta(self.path, meta)
+        # Keep the previous generation for readers still on the old meta.json
+        if generation >= 2:
+            os.remove(join(f"df-{generation - 2}.i64"))
+
+        self.meta = meta
+        if self._ids is not None:
+            self._ids.extend(candidate_ids)
+        if self._id_set is not None:
+            self._id_set.update(candidate_ids)
+        if self._content_rows is not None:
+            for row, digest in enumerate(digests, n_rows):
+                if any(digest):
+                    self._content_rows.setdefault(digest, row)
+        return counts.shape[0]
+
+    def append(self, candidate_ids, texts, chunk_rows=DEFAULT_APPEND_ROWS):
+        """Vectorize and append resumes, with their content digests; one commit per `chunk_rows` documents."""
+        from .dedup import content_digest
+
+        candidate_ids, texts = list(candidate_ids), list(texts)
+        added = 0
+        for start in range(0, len(texts), chunk_rows):
+            chunk = texts[start:start + chunk_rows]
+            with stage("store_append", n_documents=len(chunk)):
+                counts = hashed_counts(chunk, self.n_features, cache=False)
+                digests = [content_digest(text) for text in chunk]
+                added += self.append_counts(candidate_ids[start:start + chunk_rows], counts, digests)
+        return added
+
+    # --- Scoring ---
+    def query_weights(self, query_text):
+        """Dense L2-normalized TF-IDF weights of the query and the IDF used for the pool."""
+        query_counts = hashed_counts([query_text], self.n_features)
+        df = self.document_frequencies()
+        df[query_counts.indices] += 1
+        idf = smoothed_idf(df, len(self) + 1)  # the pool plus the query, as in a refit
+        return query_weights(query_counts, idf, self.n_features), idf
+
+    def score(self, query_text, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Cosine similarity of every stored resume against the query, in row order (float32)."""
+        scores = np.zeros(len(self), dtype=np.float32)
+        if not len(self):
+            return scores
+        with stage("store_query_weights", n_documents=len(self), nnz=self.nnz):
+            weights, idf = self.query_weights(query_text)
+        arrays = self._arrays()
+        data, indices, indptr = arrays["data"], arrays["indices"], arrays["indptr"]
+        with stage("store_score", n_documents=len(self), nnz=self.nnz):
+            for start in range(0, len(self), chunk_rows):
+                stop = min(start + chunk_rows, len(self))
+                end = int(indptr[stop])
+                scores[start:stop] = cosine_rows(data, indices, indptr[start:stop + 1], idf, weights)
+                _release(self._maps["data"][1], end * 4)
+                _release(self._maps["indices"][1], end * 4)
+        return scores
+
+    # --- Approximate search ---
+    def build_ann(self, chunk_rows=DEFAULT_CHUNK_ROWS, **options):
+        """Build and save the ANN index over every stored row (options go to `ANNIndex.build`)."""
+        import scipy.sparse as sp
+
+        from .ann import ANNIndex
+
+        if not len(self):
+            raise ValueError("Cannot build an ANN index for an empty feature store")
+        idf = sp.diags(smoothed_idf(self.document_frequencies(), len(self)).astype(np.float32))
+        chunks = (self.matrix(start, start + chunk_rows) @ idf for start in range(0, len(self), chunk_rows))
+        ann = ANNIndex.build(chunks, self.n_features, **options)
+        ann.save(os.path.join(self.path, _ANN))
+        self._ann = ann
+        return ann
+
+    def ann(self):
+        """The saved ANN index, or None if `build_ann` was never run."""
+        if self._ann is None:
+            from .ann import ANNIndex
+
+            path = os.path.join(self.path, _ANN)
+            if ANNIndex.exists(path):
+                self._ann = ANNIndex.load(path)
+        return self._ann
+
+    def ann_is_stale(self):
+        ann = self.ann()
+        return ann is None or len(self) - ann.n_rows > ANN_STALE_FRACTION * len(self)
+
+    def _df_view(self):
+        """Read-only mapped document frequencies of the committed generation (no copy)."""
+        generation = self.meta["df_generation"]
+        if self._df is None or self._df[0] != generation:
+            path = os.path.join(self.path, f"df-{generation}.i64")
+            self._df = (generation, _map_array(path, np.int64, self.n_features)[0])
+        return self._df[1]
+
+    def search(self, query_text, k=10, n_probe=None, shortlist=None):
+        """Approximate top-`k` `(row_ids, scores)` for the query, best first.
+
+        Candidates are the ANN shortlist plus every row appended after the
+        index was built; they are scored exactly, as `score` would. The IDF is
+        only evaluated on the columns those rows and the query use, so nothing
+        of size `n_features` is touched per query. Without an ANN index this
+        is an exact scan of the pool.
+        """
+        import scipy.sparse as sp
+
+        from .scoring import top_k_indices
+
+        ann = self.ann()
+        if ann is None:
+            scores = self.score(query_text)
+            rows = top_k_indices(scores, k)
+            return rows, scores[rows].astype(np.float64)
+        df, n_documents = self._df_view(), len(self) + 1  # the pool plus the query, as in `score`
+        query_counts = hashed_counts([query_text], self.n_features)
+        query_counts.sort_indices()
+        query_columns = query_counts.indices.astype(np.int64)
+        query_weights = query_counts.data * smoothed_idf(df[query_columns] + 1, n_documents)
+        norm = np.linalg.norm(query_weights)
+        if norm:
+            query_weights /= norm
+        query_row = sp.csr_matrix((query_weights, query_columns, [0, query_columns.shape[0]]),
+                                  shape=(1, self.n_features))
+
+        def exact(row_ids):
+            data, indices, indptr = self.rows(row_ids)
+            columns, local = np.unique(indices, return_inverse=True)
+            in_query = np.isin(columns, query_columns)
+            weights = np.zeros(columns.shape[0])
+            weights[in_query] = query_weights[np.searchsorted(query_columns, columns[in_query])]
+            idf = smoothed_idf(df[columns] + in_query, n_documents)
+            return cosine_rows(data, local, indptr, idf, weights)
+
+        rows, scores = ann.search(query_row, k, exact, n_probe, shortlist)
+        if ann.n_rows < len(self):
+            with stage("store_score_tail", n_documents=len(self) - ann.n_rows):
+                tail = np.arange(ann.n_rows, len(self))
+                rows = np.concatenate([rows, tail])
+                scores = np.concatenate([scores, exact(tail)])
+            order = np.lexsort((rows, -scores))[:k]
+            rows, scores = rows[order], scores[order]
+        return rows, scores
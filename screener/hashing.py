@@ -0,0 +1,190 @@
+# Vocabulary-free TF-IDF on hashed term counts.
+#
+# A HashingVectorizer maps every term to one of N_FEATURES columns with a
+# fixed hash, so documents vectorized months apart (or by different processes)
+# land in the same column space without a fitted vocabulary. Counts are built
+# from the shared token ids (`tokens.hashed_counts`), with the same columns and
+# tokenization as sklearn's HashingVectorizer(stop_words='english'), so stores
+# written before and after agree. Unrelated terms can share a
+# column (a hash collision), which at 2**20 columns barely moves the rankings
+# (see benchmarks/compare_engines.py).
+#
+# Document frequencies are accumulated chunk by chunk, so nothing needs the
+# whole corpus in memory. `rank_documents_hashed` accepts any iterable of
+# texts. A one-shot generator is spilled chunk by chunk to a temporary
+# on-disk feature store, because the IDF is only final once the last resume
+# has been seen.
+#
+# The price of the fixed column space: every call allocates dense n_features
+# arrays for the document frequencies, IDF and query weights (8 bytes per
+# column each). On a 200-resume batch that is ~25 MB peak and about 3x the
+# latency of the exact TF-IDF engine, so hashing only pays off on pools too
+# large or too long-lived for a fitted vocabulary.
+import collections.abc
+import tempfile
+from itertools import islice
+
+import numpy as np
+
+from .instrumentation import stage
+from .tokens import hashed_counts, tfidf_rows
+
+N_FEATURES = 2 ** 20
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def smoothed_idf(df, n_documents):
+    """sklearn's smoothed IDF: ln((1 + n) / (1 + df)) + 1."""
+    return np.log((1.0 + n_documents) / (1.0 + df)) + 1.0
+
+
+def iter_chunks(texts, chunk_size=DEFAULT_CHUNK_SIZE):
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def query_weights(query_counts, idf, n_features):
+    """Dense, L2-normalized TF-IDF weights of a single hashed query row."""
+    weights = np.zeros(n_features)
+    weights[query_counts.indices] = query_counts.data * idf[query_counts.indices]
+    norm = np.linalg.norm(weights)
+    if norm:
+        weights /= norm
+    return weights
+
+
+def cosine_rows(data, indices, indptr, idf, weights):
+    """Cosine of each CSR row of raw counts (after IDF weighting) with dense unit `weights`.
+
+    Works directly on the three CSR arrays (which may be memory-mapped); only
+    temporaries of the size of these rows are allocated.
+    """
+    n_rows = indptr.shape[0] - 1
+    offset = int(indptr[0])
+    columns = indices[offset:int(indptr[-1])]
+    weighted = data[offset:int(indptr[-1])] * idf[columns]
+    rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weighted * weighted, minlength=n_rows))
+    dots = np.bincount(rows, weighted * weights[columns], minlength=n_rows)
+    np.divide(dots, norms, out=dots, where=norms > 0)
+    return dots
+
+
+class HashedTfidfVectorizer:
+    """TfidfVectorizer(stop_words='english') lookalike on hashed columns.
+
+    `partial_fit` accumulates document frequencies one chunk at a time, so
+    fitting never holds more than a chunk. Columns no fitted document used get
+    zero weight in `transform`, like terms outside a fitted vocabulary.
+    """
+
+    def __init__(self, n_features=N_FEATURES):
+        self.n_features = n_features
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+        self._idf = None
+
+    def counts(self, texts):
+        """Raw hashed term counts (float32 CSR), one row per text."""
+        return hashed_counts(texts, self.n_features)
+
+    def partial_fit(self, texts):
+        counts = self.counts(texts)
+        self.df += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+        self._idf = None
+        return self
+
+    def fit(self, texts, chunk_size=DEFAULT_CHUNK_SIZE):
+        for chunk in iter_chunks(texts, chunk_size):
+            self.partial_fit(chunk)
+        if not self.n_documents or not self.df.any():
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+        return self
+
+    @property
+    def idf(self):
+        if self._idf is None:
+            idf = smoothed_idf(self.df, self.n_documents)
+            idf[self.df == 0] = 0.0
+            self._idf = idf
+        return self._idf
+
+    def transform(self, texts):
+        """L2-normalized TF-IDF rows (scipy CSR)."""
+        import scipy.sparse as sp
+
+        weighted = self.counts(texts).astype(np.float64) @ sp.diags(self.idf)
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return (sp.diags(1.0 / norms) @ weighted).tocsr()
+
+    def fit_transform(self, texts):
+        texts = list(texts)
+        return self.fit(texts).transform(texts)
+
+
+def rank_documents_hashed(query_text, documents, chunk_size=DEFAULT_CHUNK_SIZE, n_features=N_FEATURES):
+    """`rank_documents` on hashed features, streaming `documents` in chunks.
+
+    The IDF covers the query plus every document, as in the exact engine, so
+    scores differ from it only by hash collisions. A list/tuple is hashed once
+    and kept as compact count chunks. Any other iterable (e.g. a generator
+    over a huge pool) is spilled to a temporary feature store, so memory is
+    bounded by the spill buffer however many resumes stream through.
+    """
+    if not isinstance(documents, collections.abc.Sequence):
+        import scipy.sparse as sp
+
+        from .feature_store import DEFAULT_APPEND_ROWS, FeatureStore
+
+        with tempfile.TemporaryDirectory(prefix="screener-hashed-") as spill_dir:
+            store = FeatureStore.create(spill_dir, n_features)
+            pending = []
+
+            def spill():
+                counts = sp.vstack(pending).tocsr()
+                store.append_counts(range(len(store), len(store) + counts.shape[0]), counts)
+                pending.clear()
+
+            for chunk in iter_chunks(documents, chunk_size):
+                with stage("hash_chunk", n_documents=len(chunk)):
+                    pending.append(hashed_counts(chunk, n_features, cache=False))
+                if sum(c.shape[0] for c in pending) >= DEFAULT_APPEND_ROWS:
+                    spill()
+            if pending:
+                spill()
+            scores = store.score(query_text).astype(np.float64)
+            store.close()
+            return scores
+
+    query_counts = hashed_counts([query_text], n_features)
+    df = np.zeros(n_features, dtype=np.int64)
+    df[query_counts.indices] += 1
+    chunks = []
+    for chunk in iter_chunks(documents, chunk_size):
+        with stage("hash_chunk", n_documents=len(chunk)):
+            counts = hashed_counts(chunk, n_features)
+            df += np.bincount(counts.indices, minlength=n_features)
+            chunks.append(counts)
+
+    idf = smoothed_idf(df, len(documents) + 1)
+    weights = query_weights(query_counts, idf, n_features)
+    with stage("score_hashed", n_documents=len(documents)):
+        parts = [cosine_rows(c.data, c.indices, c.indptr, idf, weights) for c in chunks]
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def score_matrix_hashed(query_texts, documents, n_features=N_FEATURES):
+    """`scoring.score_matrix` on hashed features: (queries x documents) from one shared IDF."""
+    query_texts, documents = list(query_texts), list(documents)
+    with stage("hash_chunk", n_documents=len(documents), n_queries=len(query_texts)):
+        counts = hashed_counts(query_texts + documents, n_features)
+    idf = smoothed_idf(np.bincount(counts.indices, minlength=n_features), counts.shape[0])
+    with stage("score_hashed", n_documents=len(documents), n_queries=len(query_texts)):
+        weighted = tfidf_rows(counts, idf)
+        return (weighted[:len(query_texts)] @ weighted.T).toarray()[:, len(query_texts):]
@@ -0,0 +1,141 @@
+# Incremental TF-IDF corpus for one requisition (one job description).
+#
+# Refitting TfidfVectorizer on `[job_description] + resumes` re-tokenizes every
+# document each time a single late resume arrives. CandidateCorpus counts a
+# document's shared token ids once (columns are ids of the token vocabulary,
+# so nothing is re-split), keeps its raw term counts and maintains the
+# document frequencies as resumes come and go. When the shared vocabulary is
+# replaced, the cached counts are moved onto the new one without re-reading
+# any text. Scoring rebuilds the IDF weights from
+# the cached counts and gives the same scores as a full refit with
+# `TfidfVectorizer(stop_words='english')` (smooth_idf, sublinear_tf off, L2).
+import numpy as np
+import scipy.sparse as sp
+
+from .instrumentation import stage
+from .tokens import current_vocabulary, term_ids
+
+
+class CandidateCorpus:
+    def __init__(self, job_description):
+        self._df = np.zeros(0, dtype=np.int64)  # document frequency per vocabulary id
+        self._doc_counts = {}  # doc_id -> (column ids, counts), in insertion order
+        self._counts_matrix = None  # cached CSR of raw counts, rebuilt when documents change
+        self.job_description = job_description
+        self._vocabulary = current_vocabulary()
+        self._jd_counts = self._count(job_description)
+        self._update_df(self._jd_counts[0], 1)
+
+    def _count(self, text):
+        ids, counts = np.unique(term_ids(text, vocabulary=self._vocabulary), return_counts=True)
+        return ids.astype(np.int64), counts.astype(np.float64)
+
+    def _rebase(self):
+        """Re-key the cached counts onto the current vocabulary if theirs has been retired."""
+        vocabulary = current_vocabulary()
+        if vocabulary is self._vocabulary:
+            return
+        used = np.flatnonzero(self._df)  # every id a held document (or the JD) uses
+        mapping = np.zeros(self._df.shape[0], dtype=np.int64)
+        mapping[used] = vocabulary.ids([self._vocabulary.words[i] for i in used])
+
+        def rebased(counts):
+            ids, values = counts
+            ids = mapping[ids]
+            order = np.argsort(ids)
+            return ids[order], values[order]
+
+        self._vocabulary = vocabulary
+        self._df = np.zeros(0, dtype=np.int64)
+        self._jd_counts = rebased(self._jd_counts)
+        self._update_df(self._jd_counts[0], 1)
+        for doc_id, counts in self._doc_counts.items():
+            self._doc_counts[doc_id] = rebased(counts)
+            self._update_df(self._doc_counts[doc_id][0], 1)
+        self._counts_matrix = None
+
+    def _update_df(self, column_ids, delta):
+        n_columns = int(column_ids.max()) + 1 if column_ids.shape[0] else 0
+        if n_columns > self._df.shape[0]:
+            self._df = np.concatenate([self._df, np.zeros(n_columns - self._df.shape[0], dtype=np.int64)])
+        self._df[column_ids] += delta
+
+    # --- Corpus maintenance ---
+    def add(self, doc_id, text):
+        """Add (or replace) a resume. Only this document is tokenized."""
+        if doc_id in self._doc_counts:
+            self.remove(doc_id)
+        self._rebase()
+        counts = self._count(text)
+        self._doc_counts[doc_id] = counts
+        self._update_df(counts[0], 1)
+        self._counts_matrix = None
+
+    def remove(self, doc_id):
+        column_ids, _ = self._doc_counts.pop(doc_id)
+        self._update_df(column_ids, -1)
+        self._counts_matrix = None
+
+    def sync(self, documents):
+        """Make the corpus hold exactly `documents` ({doc_id: text}).
+
+        Resumes already present are not re-tokenized; returns the number of
+        documents that had to be added.
+        """
+        with stage("tokenize_new", n_documents=len(documents)) as record:
+            for doc_id in [d for d in self._doc_counts if d not in documents]:
+                self.remove(doc_id)
+            added = 0
+            for doc_id, text in documents.items():
+                if doc_id not in self._doc_counts:
+                    self.add(doc_id, text)
+                    added += 1
+            record["added"] = added
+        return added
+
+    def __len__(self):
+        return len(self._doc_counts)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_counts
+
+    @property
+    def doc_ids(self):
+        return list(self._doc_counts)
+
+    # --- Scoring ---
+    def _idf(self):
+        n_documents = len(self._doc_counts) + 1  # resumes + the job description
+        # Same smoothing as sklearn: idf = ln((1 + n) / (1 + df)) + 1
+        return np.log((1 + n_documents) / (1 + self._df)) + 1.0
+
+    def _row_matrix(self, rows):
+        n_columns = self._df.shape[0]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([ids.shape[0] for ids, _ in rows])
+        indices = np.concatenate([ids for ids, _ in rows]) if rows else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([counts for _, counts in rows]) if rows else np.zeros(0)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(rows), n_columns))
+
+    @staticmethod
+    def _l2_normalize(matrix):
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.diags(1.0 / norms) @ matrix
+
+    def scores(self):
+        """`(doc_ids, scores)`: cosine similarity of every resume against the JD."""
+        if not self._doc_counts:
+            return [], np.zeros(0)
+        self._rebase()
+        with stage("tfidf_weight", n_documents=len(self._doc_counts),
+                   vocabulary_size=int(np.count_nonzero(self._df))) as record:
+            if self._counts_matrix is None or self._counts_matrix.shape[1] != self._df.shape[0]:
+                self._counts_matrix = self._row_matrix(list(self._doc_counts.values()))
+            record["nnz"] = int(self._counts_matrix.nnz)
+
+            idf = sp.diags(self._idf())
+            resume_matrix = self._l2_normalize(self._counts_matrix @ idf)
+            jd_vector = self._l2_normalize(self._row_matrix([self._jd_counts]) @ idf)
+        with stage("score_sparse"):
+            return list(self._doc_counts), (resume_matrix @ jd_vector.T).toarray().ravel()
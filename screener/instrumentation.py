@@ -0,0 +1,234 @@
+# Per-stage timing for the ranking and matching hot paths.
+#
+#   with instrumentation.trace("rank", profile=True) as t:
+#       ranking = screen_resumes(jd, extracted)
+#   t.stages   # [{"stage": "tfidf_fit_transform", "seconds": ..., "rss_delta_bytes": ..., "nnz": ...}, ...]
+#
+# Library code marks its stages with `stage("name")`. That is a no-op
+# (one ContextVar lookup) unless a trace is active in the current context, so
+# uninstrumented callers pay nothing. A finished trace is handed to every
+# registered sink: log lines, a JSON-lines file, or Prometheus-style counters
+# that the scoring service serves at /metrics. With `profile=True` the trace
+# also runs cProfile and tracemalloc and keeps their top entries.
+#
+# Sinks can be set up from the environment:
+#   RESUME_TRACE_LOG=1              log one line per finished trace
+#   RESUME_TRACE_JSON=/path.jsonl   append one JSON object per finished trace
+import contextvars
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("screener.perf")
+
+PROFILE_TOP_N = 25
+
+_current = contextvars.ContextVar("screener_trace", default=None)
+_sinks = []
+_sinks_lock = threading.Lock()
+
+
+def current_rss_bytes():
+    """Resident set size of this process (falls back to the peak where /proc is missing)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+class Trace:
+    def __init__(self, name, profile=False, **labels):
+        self.name = name
+        self.labels = labels
+        self.profile = profile
+        self.stages = []
+        self.seconds = None
+        self.profile_text = None
+        self.memory_top = None
+        self._profiler = None
+        self._started_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name, **counts):
+        """Time a block; the yielded dict can be filled with counts (docs, nnz, ...)."""
+        record = {"stage": name}
+        record.update(counts)
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - started
+            record["rss_delta_bytes"] = current_rss_bytes() - rss_before
+            self.stages.append(record)
+
+    def _start(self):
+        self._started_at = time.perf_counter()
+        if self.profile:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def _finish(self):
+        self.seconds = time.perf_counter() - self._started_at
+        if self._profiler is not None:
+            import io
+            import pstats
+
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+            self.profile_text = out.getvalue()
+            self._profiler = None
+            snapshot = tracemalloc.take_snapshot()
+            self.memory_top = [
+                {"location": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:PROFILE_TOP_N]
+            ]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+    def as_dict(self):
+        return {"trace": self.name, "labels": self.labels, "seconds": self.seconds, "stages": self.stages}
+
+
+@contextmanager
+def trace(name, profile=False, emit=True, **labels):
+    """Collect the stages run inside the block into a `Trace` and emit it to the sinks."""
+    t = Trace(name, profile=profile, **labels)
+    token = _current.set(t)
+    t._start()
+    try:
+        yield t
+    finally:
+        t._finish()
+        _current.reset(token)
+        if emit:
+            emit_trace(t)
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextmanager
+def stage(name, **counts):
+    """Record a stage on the active trace; without one, just run the block."""
+    t = _current.get()
+    if t is None:
+        yield {}
+        return
+    with t.stage(name, **counts) as record:
+        yield record
+
+
+# --- Sinks ---
+class LogSink:
+    """One INFO line per trace: total time and each stage's time."""
+
+    def __init__(self, log=logger):
+        self.log = log
+
+    def __call__(self, t):
+        parts = " ".join(f"{s['stage']}={s['seconds'] * 1000:.1f}ms" for s in t.stages)
+        self.log.info("%s total=%.1fms %s", t.name, (t.seconds or 0) * 1000, parts)
+
+
+class JsonLinesSink:
+    """Appends each trace as one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, t):
+        line = json.dumps(t.as_dict(), default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class PrometheusSink:
+    """Aggregates stage timings into counters rendered in the Prometheus text format."""
+
+    def __init__(self, prefix="screener"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._traces = {}  # trace name -> [count, seconds]
+        self._stages = {}  # (trace name, stage) -> [count, seconds]
+
+    def __call__(self, t):
+        with self._lock:
+            totals = self._traces.setdefault(t.name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += t.seconds or 0.0
+            for s in t.stages:
+                totals = self._stages.setdefault((t.name, s["stage"]), [0, 0.0])
+                totals[0] += 1
+                totals[1] += s["seconds"]
+
+    def render(self):
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_trace_seconds_total Wall time spent in traced operations.",
+            f"# TYPE {p}_trace_seconds_total counter",
+        ]
+        with self._lock:
+            traces = sorted(self._traces.items())
+            stages = sorted(self._stages.items())
+        for name, (_, seconds) in traces:
+            lines.append(f'{p}_trace_seconds_total{{trace="{name}"}} {seconds:.6f}')
+        lines += [f"# HELP {p}_trace_count_total Number of traced operations.", f"# TYPE {p}_trace_count_total counter"]
+        for name, (count, _) in traces:
+            lines.append(f'{p}_trace_count_total{{trace="{name}"}} {count}')
+        lines += [f"# HELP {p}_stage_seconds_total Wall time per pipeline stage.", f"# TYPE {p}_stage_seconds_total counter"]
+        for (name, stage_name), (_, seconds) in stages:
+            lines.append(f'{p}_stage_seconds_total{{trace="{name}",stage="{stage_name}"}} {seconds:.6f}')
+        lines += [f"# HELP {p}_stage_count_total Number of runs per pipeline stage.", f"# TYPE {p}_stage_count_total counter"]
+        for (name, stage_name), (count, _) in stages:
+            lines.append(f'{p}_stage_count_total{{trace="{name}",stage="{stage_name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def add_sink(sink):
+    """Register a callable that receives every finished `Trace`."""
+    with _sinks_lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def emit_trace(t):
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink(t)
+        except Exception:
+            logger.exception("trace sink %r failed", sink)
+
+
+def _configure_from_env():
+    if os.environ.get("RESUME_TRACE_LOG"):
+        add_sink(LogSink())
+    if os.environ.get("RESUME_TRACE_JSON"):
+        add_sink(JsonLinesSink(os.environ["RESUME_TRACE_JSON"]))
+
+
+_configure_from_env()
@@ -0,0 +1,122 @@
+# Predefined job profiles used by the profile matcher (app2.py/app3.py) and the
+# scoring service. Kept in the headless package so non-Streamlit processes can
+# build the same profile index.
+
+PREDEFINED_JOB_PROFILES = {
+    "Software Engineer (Backend)": """
+        We are looking for a skilled Backend Software Engineer proficient in Python, Django, and REST APIs.
+        Experience with database technologies like PostgreSQL or MySQL, and cloud platforms like AWS or Azure is essential.
+        Responsibilities include designing and developing server-side logic, defining and maintaining databases,
+        and ensuring high performance and responsiveness to requests from the front-end.
+        Familiarity with version control (Git) and agile methodologies is a plus.
+        Strong problem-solving skills and ability to work in a team.
+    """,
+    "Data Scientist": """
+        Seeking a Data Scientist with a strong background in statistical analysis, machine learning, and data visualization.
+        Proficiency in Python (Pandas, NumPy, Scikit-learn, TensorFlow/PyTorch) and SQL is required.
+        The ideal candidate will be able to develop predictive models, perform data mining,
+        and communicate insights effectively to stakeholders. Experience with big data technologies (e.g., Spark) is a plus.
+        Master's or PhD in a quantitative field preferred.
+    """,
+    "Frontend Developer (React)": """
+        Join our team as a Frontend Developer specializing in React.js.
+        You will be responsible for developing and implementing user interface components using React.js concepts and workflows such as Redux, Flux, and Webpack.
+        Strong proficiency in JavaScript, HTML, CSS, and experience with RESTful APIs are crucial.
+        Experience with UI/UX design principles and modern frontend build pipelines and tools.
+        Ability to translate designs and wireframes into high-quality code.
+    """,
+    "DevOps Engineer": """
+        We need a DevOps Engineer to help us build and maintain our CI/CD pipelines and cloud infrastructure.
+        Skills in scripting (Bash, Python), containerization (Docker, Kubernetes), infrastructure as code (Terraform, Ansible),
+        and cloud platforms (AWS, GCP, Azure) are required.
+        Experience with monitoring tools (Prometheus, Grafana) and version control (Git).
+        Focus on automation, scalability, and reliability.
+    """,
+    "UX/UI Designer": """
+        Creative UX/UI Designer needed to craft intuitive and engaging user experiences for web and mobile applications.
+        Proficiency in design tools like Figma, Sketch, or Adobe XD.
+        Strong portfolio showcasing user-centered design solutions, wireframes, prototypes, and visual designs.
+        Understanding of usability principles, interaction design, and responsive design.
+        Ability to conduct user research and translate findings into design improvements.
+    """,
+    "Human Resources (HR) Manager": """
+        Experienced HR Manager to oversee all aspects of human resources practices and processes.
+        Responsibilities include developing and implementing HR strategies and initiatives aligned with the overall business strategy,
+        managing recruitment and selection process, bridging management and employee relations, and managing compensation and benefits.
+        Strong knowledge of labor law and HR best practices. Degree in Human Resources or related field.
+    """,
+    "Recruitment Specialist (Talent Acquisition)": """
+        Dynamic Recruitment Specialist to lead our talent acquisition efforts.
+        This role involves sourcing candidates through various channels, planning interview and selection procedures,
+        hosting or participating in career events, and developing long-term recruiting strategies.
+        Proven experience as a Recruitment Specialist, Technical Recruiter or similar role.
+        Excellent communication and interpersonal skills. Familiarity with Applicant Tracking Systems (ATS) and resume databases.
+    """,
+    "Project Manager (IT)": """
+        Seeking an IT Project Manager to be responsible for planning, executing, and finalizing IT projects according to strict deadlines and within budget.
+        This includes acquiring resources and coordinating the efforts of team members and third-party contractors or consultants.
+        Proven working experience in project management in the information technology sector.
+        Solid technical background, with understanding or hands-on experience in software development and web technologies. PMP certification is a plus.
+    """,
+    "Marketing Manager": """
+        Innovative Marketing Manager to develop and implement marketing strategies to strengthen the company’s market presence and help it find a “voice” that will make a difference.
+        Responsibilities include planning and executing campaigns, tracking and analyzing performance, managing budgets, and overseeing marketing material.
+        Proven experience as Marketing Manager or similar role. Demonstrable experience leading and managing SEO/SEM, marketing database, email, social media and/or display advertising campaigns.
+    """,
+    "Operations Manager": """
+        Detail-oriented Operations Manager to direct and coordinate the internal operational activities of the organization in accordance with policies, goals, and objectives established by the CEO and the Board of Directors.
+        Key responsibilities include formulating policies, managing daily operations, personnel, and material resources to achieve specific goals.
+        Proven experience as Operations Manager or relevant role. Understanding of business functions such as HR, Finance, marketing etc. Demonstrable competency in strategic planning and business development.
+    """
+}
+
+# Skills and job titles named in each profile above, as lowercase phrases.
+# They seed the structural matcher (screener/structure.py); keep them in sync
+# when a description changes. Plural/singular forms need not be listed twice.
+PROFILE_KEYWORDS = {
+    "Software Engineer (Backend)": {
+        "skills": ["python", "django", "rest api", "postgresql", "mysql", "aws", "azure", "git", "agile"],
+        "titles": ["backend engineer", "backend developer", "software engineer"],
+    },
+    "Data Scientist": {
+        "skills": ["statistical analysis", "machine learning", "data visualization", "python", "pandas", "numpy",
+                   "scikit-learn", "tensorflow", "pytorch", "sql", "predictive modeling", "data mining", "spark"],
+        "titles": ["data scientist"],
+    },
+    "Frontend Developer (React)": {
+        "skills": ["react.js", "redux", "flux", "webpack", "javascript", "html", "css", "rest api", "ui/ux",
+                   "wireframe"],
+        "titles": ["frontend developer", "frontend engineer", "front-end developer"],
+    },
+    "DevOps Engineer": {
+        "skills": ["ci/cd", "bash", "python", "docker", "kubernetes", "terraform", "ansible", "aws", "gcp", "azure",
+                   "prometheus", "grafana", "git", "infrastructure as code"],
+        "titles": ["devops engineer", "site reliability engineer"],
+    },
+    "UX/UI Designer": {
+        "skills": ["figma", "sketch", "adobe xd", "wireframe", "prototype", "usability", "interaction design",
+                   "responsive design", "user research"],
+        "titles": ["ux designer", "ui designer", "ux/ui designer", "product designer"],
+    },
+    "Human Resources (HR) Manager": {
+        "skills": ["recruitment", "employee relations", "compensation and benefits", "labor law", "hr strategy"],
+        "titles": ["hr manager", "human resources manager"],
+    },
+    "Recruitment Specialist (Talent Acquisition)": {
+        "skills": ["sourcing", "talent acquisition", "interviewing", "applicant tracking system", "recruiting"],
+        "titles": ["recruitment specialist", "technical recruiter", "recruiter"],
+    },
+    "Project Manager (IT)": {
+        "skills": ["project management", "budgeting", "pmp", "software development", "web technologies"],
+        "titles": ["project manager", "it project manager"],
+    },
+    "Marketing Manager": {
+        "skills": ["marketing strategy", "campaign", "seo", "sem", "email marketing", "social media",
+                   "display advertising"],
+        "titles": ["marketing manager"],
+    },
+    "Operations Manager": {
+        "skills": ["operations management", "strategic planning", "business development", "finance"],
+        "titles": ["operations manager"],
+    },
+}
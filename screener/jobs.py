@@ -0,0 +1,484 @@
+# Background screening jobs: extraction and ranking outside the Streamlit session.
+#
+# Ranking a 1,000-PDF upload inside the script run ties up the session for
+# minutes, and a browser refresh throws the work away. A job is a row in a
+# SQLite file (RESUME_JOBS_DB, default .cache/jobs.sqlite) instead, run by
+# worker processes (`python -m screener.jobs worker`, started on demand by
+# `ensure_workers`):
+#   - `JobQueue.submit` copies the uploads under <db dir>/jobs/<job id>/ and
+#     queues the job
+#   - a worker claims it and extracts the PDFs with the parallel extractor.
+#     Every CHUNK_FILES files it commits their texts in one transaction with
+#     the progress counter and, when due, a provisional top-K ranking of the
+#     resumes extracted so far
+#   - once every file is in, the whole batch is screened (dedup, ranking) and
+#     the pickled `RankingResult` / `MatrixRankingResult` is stored with the
+#     worker's trace
+# Workers heartbeat while they run, from a background thread while they hold a
+# job, so a long extraction stall or final ranking does not look like a dead
+# worker. A job whose worker is gone (its pid no
+# longer exists on this host, or its heartbeat is older than STALE_SECONDS)
+# is claimed again and resumes after its last committed chunk; files already
+# committed are not parsed again.
+import contextlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import namedtuple
+
+from .text_cache import read_file_bytes
+
+logger = logging.getLogger("screener.jobs")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.environ.get("RESUME_JOBS_DB", os.path.join(_ROOT, ".cache", "jobs.sqlite"))
+DEFAULT_WORKERS = int(os.environ.get("RESUME_JOB_WORKERS", "1"))  # each worker already extracts on every core
+CHUNK_FILES = int(os.environ.get("RESUME_JOB_CHUNK_FILES", "50"))  # files per committed chunk
+STALE_SECONDS = float(os.environ.get("RESUME_JOB_STALE_SECONDS", "180"))
+IDLE_EXIT_SECONDS = float(os.environ.get("RESUME_JOB_IDLE_EXIT", "300"))  # idle workers exit after this
+KEEP_SECONDS = float(os.environ.get("RESUME_JOB_KEEP_SECONDS", str(7 * 24 * 3600)))  # finished jobs are purged after
+MAX_ATTEMPTS = 3  # a job that took down this many workers is failed instead of resumed again
+HEARTBEAT_SECONDS = 10.0
+POLL_SECONDS = 1.0
+PARTIAL_MIN_SECONDS = 2.0  # provisional rankings at most this often...
+PARTIAL_MAX_SHARE = 0.2  # ...and taking at most this share of the job's time
+PARTIAL_TOP_K = 10
+
+ACTIVE_STATES = ("queued", "running")
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+# `partial` is the provisional top-K as (name, score, role) rows, best first;
+# `role` is the best-scoring role for multi-JD jobs and None otherwise
+JobStatus = namedtuple("JobStatus", ["job_id", "status", "files_done", "n_files", "partial", "error",
+                                     "created", "updated"])
+
+
+def _worker_id(pid=None):
+    return f"{socket.gethostname()}:{os.getpid() if pid is None else pid}"
+
+
+def _is_gone(worker, heartbeat, now):
+    """True when the process behind `worker` ("host:pid") cannot still be working."""
+    if heartbeat is None or now - heartbeat > STALE_SECONDS:
+        return True
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname():
+        return False  # another machine; only the heartbeat tells
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except (PermissionError, ValueError):
+        return False
+    try:
+        # A killed worker the app has not reaped yet is a zombie, not a live process
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return f.read().rpartition(b")")[2].split()[0] == b"Z"
+    except (OSError, IndexError):
+        return False
+
+
+def _encode_result(result):
+    """Extraction result -> `files` row values (text zlib-compressed)."""
+    return (zlib.compress(result.text.encode("utf-8")), json.dumps(list(result.warnings)), result.error,
+            int(bool(result.truncated)))
+
+
+def _screen(params, extraction_results):
+    """The job's ranking over `extraction_results`, as in the apps' synchronous path."""
+    from functools import partial
+
+    from .core import (rank_resumes, rank_resumes_hybrid, rank_resumes_matrix, rank_resumes_matrix_hybrid,
+                       screen_resumes, screen_resumes_matrix)
+
+    engine, structure, dedup = params.get("engine"), params.get("structure", False), params.get("dedup")
+    if params.get("job_descriptions") is not None:
+        rank = partial(rank_resumes_matrix_hybrid if structure else rank_resumes_matrix, engine=engine)
+        return screen_resumes_matrix(params["job_descriptions"], extraction_results, rank=rank, dedup=dedup)
+    rank = partial(rank_resumes_hybrid if structure else rank_resumes, engine=engine)
+    return screen_resumes(params["job_description"], extraction_results, rank=rank, dedup=dedup)
+
+
+def _top_rows(ranking, k):
+    """(name, score, role) rows of the best `k` candidates of a ranking."""
+    import numpy as np
+
+    from .scoring import top_k_indices
+
+    if ranking.scores is None:
+        return []
+    roles = getattr(ranking, "roles", None)
+    if roles is None:
+        scores, best_roles = np.asarray(ranking.scores), None
+    else:
+        best_roles = ranking.scores.argmax(axis=1)
+        scores = ranking.scores[np.arange(len(ranking.names)), best_roles]
+    return [(ranking.names[i], float(scores[i]), None if best_roles is None else roles[best_roles[i]])
+            for i in top_k_indices(scores, k).tolist()]
+
+
+class JobQueue:
+    """Jobs, their committed files and results in one SQLite file."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.files_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "jobs")
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self):
+        # Connections must not be shared across forked worker processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Autocommit; writes that must be atomic go through `_transaction`
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")  # the app polls while a worker writes
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL,"
+                " n_files INTEGER NOT NULL, files_done INTEGER NOT NULL DEFAULT 0,"
+                " partial TEXT, result BLOB, trace BLOB, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+                " worker TEXT, heartbeat REAL, created REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " job_id TEXT NOT NULL, idx INTEGER NOT NULL, name TEXT NOT NULL, text BLOB NOT NULL,"
+                " warnings TEXT NOT NULL, error TEXT, truncated INTEGER NOT NULL,"
+                " PRIMARY KEY (job_id, idx))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _job_dir(self, job_id):
+        return os.path.join(self.files_dir, job_id)
+
+    # --- Submitting and reading jobs (any process) ---
+    def submit(self, files, job_description=None, job_descriptions=None, structure=False, engine=None, dedup=None,
+               top_k=PARTIAL_TOP_K):
+        """Queue a screening job over `files` (uploads, paths or bytes) and return its id.
+
+        Pass `job_description` for one JD or `job_descriptions` ({role: text})
+        for a multi-JD matrix. The file bytes are copied now, so the caller's
+        uploads can go away.
+        """
+        if (job_description is None) == (job_descriptions is None):
+            raise ValueError("Pass exactly one of job_description and job_descriptions")
+        self.purge()
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+        names = []
+        for index, file_obj in enumerate(files):
+            with open(os.path.join(job_dir, f"{index:06d}.pdf"), "wb") as f:
+                f.write(read_file_bytes(file_obj))
+            names.append(os.path.basename(file_obj) if isinstance(file_obj, (str, os.PathLike))
+                         else getattr(file_obj, "name", None) or f"file_{index + 1}")
+        params = {"job_description": job_description, "job_descriptions": job_descriptions,
+                  "structure": bool(structure), "engine": engine, "dedup": dedup, "top_k": top_k, "names": names}
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO jobs (id, status, params, n_files, created, updated) VALUES (?, 'queued', ?, ?, ?, ?)",
+            (job_id, json.dumps(params), len(names), now, now),
+        )
+        return job_id
+
+    def status(self, job_id):
+        """`JobStatus` of a job, or None for an unknown (or purged) id."""
+        row = self._connection().execute(
+            "SELECT id, status, files_done, n_files, partial, error, created, updated FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        partial = [tuple(r) for r in json.loads(row[4])] if row[4] else []
+        return JobStatus(row[0], row[1], row[2], row[3], partial, row[5], row[6], row[7])
+
+    def params(self, job_id):
+        row = self._connection().execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def result(self, job_id):
+        """`(ranking, trace)` of a finished job, or None while it is not done."""
+        row = self._connection().execute(
+            "SELECT result, trace FROM jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0]), pickle.loads(row[1]) if row[1] is not None else None
+
+    def jobs(self, limit=50):
+        """Most recent jobs first, as `JobStatus`es."""
+        ids = self._connection().execute("SELECT id FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [self.status(job_id) for (job_id,) in ids]
+
+    def cancel(self, job_id):
+        """Stop a queued or running job; its worker notices at its next chunk."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row[0] not in ACTIVE_STATES:
+                return
+            conn.execute("UPDATE jobs SET status = 'cancelled', updated = ? WHERE id = ?", (time.time(), job_id))
+        if row[0] == "queued":
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)  # a running job's worker removes them
+
+    def purge(self, keep_seconds=KEEP_SECONDS):
+        """Delete finished jobs last updated more than `keep_seconds` ago."""
+        cutoff = time.time() - keep_seconds
+        with self._transaction() as conn:
+            ids = [job_id for (job_id,) in conn.execute(
+                f"SELECT id FROM jobs WHERE status IN {FINISHED_STATES} AND updated < ?", (cutoff,))]
+            conn.executemany("DELETE FROM files WHERE job_id = ?", [(job_id,) for job_id in ids])
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in ids])
+        for job_id in ids:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+    def live_workers(self):
+        """Number of registered workers that are still alive."""
+        now = time.time()
+        rows = self._connection().execute("SELECT id, heartbeat FROM workers").fetchall()
+        return sum(not _is_gone(worker, heartbeat, now) for worker, heartbeat in rows)
+
+    # --- Worker side ---
+    def _beat(self, worker, job_id=None):
+        now = time.time()
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO workers (id, heartbeat) VALUES (?, ?)", (worker, now))
+        if job_id is not None:
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ?", (now, job_id, worker))
+
+    @contextlib.contextmanager
+    def _heartbeat(self, worker, job_id):
+        """Beat for `job_id` every HEARTBEAT_SECONDS from a background thread while the block runs.
+
+        The thread uses its own connection, so its beats never land inside the
+        worker's transactions.
+        """
+        stop = threading.Event()
+
+        def beat():
+            queue = JobQueue(self.path)
+            try:
+                while not stop.wait(HEARTBEAT_SECONDS):
+                    try:
+                        queue._beat(worker, job_id)
+                    except sqlite3.Error:
+                        logger.warning("job %s: heartbeat failed", job_id, exc_info=True)
+            finally:
+                if queue._conn is not None:
+                    queue._conn.close()
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job_id[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def _claim(self, worker):
+        """Id of the oldest queued (or abandoned running) job, now owned by `worker`; None if there is none."""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT id, status, worker, heartbeat, attempts FROM jobs WHERE status IN {ACTIVE_STATES}"
+                " ORDER BY created"
+            ).fetchall()
+            for job_id, status, owner, heartbeat, attempts in rows:
+                if status == "running" and not _is_gone(owner, heartbeat, now):
+                    continue
+                if status == "running" and attempts >= MAX_ATTEMPTS:
+                    logger.error("job %s: worker %s is gone after %d attempts; failing it", job_id, owner, attempts)
+                    conn.execute("UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                                 (f"worker process died {attempts} times", now, job_id))
+                    continue
+                if status == "running":
+                    logger.warning("job %s: worker %s is gone; resuming", job_id, owner)
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, updated = ?,"
+                    " attempts = attempts + 1 WHERE id = ?",
+                    (worker, now, now, job_id),
+                )
+                return job_id
+        return None
+
+    def _committed(self, job_id):
+        """Extraction results already committed for a job, by file index."""
+        from .extraction import ExtractionResult
+
+        rows = self._connection().execute(
+            "SELECT idx, name, text, warnings, error, truncated FROM files WHERE job_id = ?", (job_id,))
+        return {idx: ExtractionResult(idx, name, zlib.decompress(text).decode("utf-8"), json.loads(warnings), error,
+                                      bool(truncated))
+                for idx, name, text, warnings, error, truncated in rows}
+
+    def _commit_chunk(self, worker, job_id, results, partial=None):
+        """Store a chunk of extraction results; False when the job is no longer this worker's (cancelled, reclaimed)."""
+        now = time.time()
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE id = ? AND status = 'running' AND worker = ?",
+                            (job_id, worker)).fetchone() is None:
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (job_id, idx, name, text, warnings, error, truncated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, r.index, r.name, *_encode_result(r)) for r in results],
+            )
+            done = conn.execute("SELECT COUNT(*) FROM files WHERE job_id = ?", (job_id,)).fetchone()[0]
+            conn.execute("UPDATE jobs SET files_done = ?, heartbeat = ?, updated = ? WHERE id = ?",
+                         (done, now, now, job_id))
+            if partial is not None:
+                conn.execute("UPDATE jobs SET partial = ? WHERE id = ?", (json.dumps(partial), job_id))
+        return True
+
+    def _finish(self, worker, job_id, status, result=None, trace=None, partial=None, error=None):
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, trace = ?, partial = COALESCE(?, partial), error = ?,"
+                " updated = ? WHERE id = ? AND status = 'running' AND worker = ?",
+                (status, None if result is None else pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+                 None if trace is None else pickle.dumps(trace, protocol=pickle.HIGHEST_PROTOCOL),
+                 None if partial is None else json.dumps(partial), error, time.time(), job_id, worker),
+            ).rowcount
+        if updated:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)  # the texts are in the database now
+
+    def run_job(self, worker, job_id, chunk_files=CHUNK_FILES, **extract_options):
+        """Extract the job's remaining files chunk by chunk, then screen the batch and store the result."""
+        from . import instrumentation
+        from .core import EXTRACTOR_VERSION
+        from .extraction import iter_extract
+        from .instrumentation import stage
+        from .text_cache import get_default_cache
+
+        params = self.params(job_id)
+        names, top_k = params["names"], params.get("top_k") or PARTIAL_TOP_K
+        extracted = self._committed(job_id)
+        pending = [i for i in range(len(names)) if i not in extracted]
+        logger.info("job %s: %d/%d files committed, %d to extract", job_id, len(extracted), len(names), len(pending))
+
+        job_started = time.monotonic()
+        partial_seconds, next_partial = 0.0, job_started
+        with instrumentation.trace("job", job_id=job_id) as job_trace, self._heartbeat(worker, job_id):
+            chunk = []
+            results = iter_extract([os.path.join(self._job_dir(job_id), f"{i:06d}.pdf") for i in pending],
+                                   cache=get_default_cache(), extractor_version=EXTRACTOR_VERSION, **extract_options)
+            with stage("job_extract", n_documents=len(pending)), contextlib.closing(results):
+                for done, result in enumerate(results, 1):
+                    index = pending[result.index]
+                    chunk.append(result._replace(index=index, name=names[index]))
+                    if len(chunk) < chunk_files and done < len(pending):
+                        continue
+                    now = time.monotonic()
+                    extracted.update((r.index, r) for r in chunk)
+                    partial = None
+                    if now >= next_partial and done < len(pending):
+                        with stage("job_partial_rank", n_documents=len(extracted)):
+                            partial = _top_rows(_screen(params, [extracted[i] for i in sorted(extracted)]), top_k)
+                        partial_seconds = time.monotonic() - now
+                        # Later rankings are over more resumes; keep them to a share of the job's time
+                        next_partial = time.monotonic() + max(PARTIAL_MIN_SECONDS, partial_seconds / PARTIAL_MAX_SHARE)
+                    if not self._commit_chunk(worker, job_id, chunk, partial):
+                        status = self.status(job_id)
+                        logger.info("job %s: now %s; stopping", job_id, status and status.status)
+                        if status is not None and status.status == "cancelled":
+                            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+                        return
+                    chunk = []
+
+            ranking = _screen(params, [extracted[i] for i in range(len(names))])
+        self._finish(worker, job_id, "done", ranking, job_trace, _top_rows(ranking, top_k))
+        logger.info("job %s: done in %.1fs", job_id, time.monotonic() - job_started)
+
+    def work(self, idle_exit=IDLE_EXIT_SECONDS, poll_interval=POLL_SECONDS, **extract_options):
+        """Worker loop: claim and run jobs until none has arrived for `idle_exit` seconds (0: forever)."""
+        worker = _worker_id()
+        idle_since = time.monotonic()
+        try:
+            while True:
+                self._beat(worker)
+                job_id = self._claim(worker)
+                if job_id is None:
+                    if idle_exit and time.monotonic() - idle_since > idle_exit:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+                try:
+                    self.run_job(worker, job_id, **extract_options)
+                except Exception as e:
+                    logger.exception("job %s failed", job_id)
+                    self._finish(worker, job_id, "failed", error=f"{type(e).__name__}: {e}")
+                idle_since = time.monotonic()
+        finally:
+            self._connection().execute("DELETE FROM workers WHERE id = ?", (worker,))
+
+
+def ensure_workers(path=DEFAULT_DB_PATH, n_workers=DEFAULT_WORKERS):
+    """Start worker processes until `n_workers` are alive for the job database at `path`.
+
+    Workers run in their own session, so they outlive the Streamlit script run
+    (and the server) until they have been idle for IDLE_EXIT_SECONDS.
+    """
+    queue = JobQueue(path)
+    missing = n_workers - queue.live_workers()
+    os.makedirs(queue.files_dir, exist_ok=True)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_ROOT, os.environ.get("PYTHONPATH")])))
+    for _ in range(max(missing, 0)):
+        with open(os.path.join(queue.files_dir, "worker.log"), "ab") as log:
+            process = subprocess.Popen([sys.executable, "-m", "screener.jobs", "worker", "--db", path],
+                                       cwd=_ROOT, env=env, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                                       start_new_session=True)
+        # Registered right away, so the next call does not start another one while it boots
+        queue._beat(_worker_id(process.pid))
+    return max(missing, 0)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run or inspect background screening jobs.")
+    parser.add_argument("command", choices=["worker", "list", "cancel"])
+    parser.add_argument("job_id", nargs="?", help="Job to cancel")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--idle-exit", type=float, default=IDLE_EXIT_SECONDS,
+                        help="Seconds without jobs before a worker exits (0: never)")
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.db)
+    if args.command == "worker":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+        queue.work(idle_exit=args.idle_exit)
+    elif args.command == "cancel":
+        if not args.job_id:
+            parser.error("cancel needs a job id")
+        queue.cancel(args.job_id)
+    else:
+        for job in queue.jobs():
+            print(f"{job.job_id}  {job.status:<9}  {job.files_done}/{job.n_files}  "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(job.created))}  {job.error or ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
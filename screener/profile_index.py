@@ -0,0 +1,197 @@
+# Precomputed TF-IDF index over the predefined job profiles.
+#
+# The profile side of `match_resume_to_profiles` never changes between
+# requests, so the vocabulary/IDF and the L2-normalized profile matrix are
+# fitted once and reused. Matching a resume is then a single `transform` plus
+# one sparse matrix x vector product. Note the IDF weights come from the
+# profiles alone (the old code refit on resume + profiles), and resume terms
+# outside the profile vocabulary carry no weight.
+#
+# With engine="hashing" the vectorizer is a `hashing.HashedTfidfVectorizer`:
+# no vocabulary is kept, and hashed columns no profile uses get no weight. The
+# result is the same up to hash collisions.
+#
+# With engine="embedding" the "vectorizer" is an `embeddings.Embedder` and
+# the profile matrix holds one dense embedding per profile, computed once.
+#
+# `get_profile_index` keys its cache on `profiles_fingerprint`, which hashes
+# a profiles dict once and afterwards only checks that its entries are the
+# same objects, so a match call does not re-hash the whole taxonomy.
+#
+# Large taxonomies (ANN_MIN_PROFILES and up) also get an approximate
+# nearest-neighbour index (screener/ann.py). `match` with a `top_k` then
+# scores only a shortlist of profiles exactly instead of every profile.
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+from .instrumentation import stage
+from .tokens import TermTfidfVectorizer
+
+INDEX_FORMAT_VERSION = 4
+ENGINES = ("tfidf", "hashing", "embedding")
+ANN_MIN_PROFILES = int(os.environ.get("RESUME_ANN_MIN_PROFILES", "5000"))
+
+
+# id(profiles dict) -> (the dict, its items when hashed, fingerprint); the dict
+# is kept alive so its id cannot be reused by another one
+_fingerprints = {}
+FINGERPRINT_CACHE_ENTRIES = 16
+
+
+def profiles_fingerprint(job_profiles_dict):
+    """Stable hash of the profile names and descriptions (detects edits).
+
+    A dict is hashed once. Later calls compare its items with the ones hashed,
+    which for unchanged entries is an identity check per name and description,
+    and reuse the digest; an edit in place is still caught.
+    """
+    items = list(job_profiles_dict.items())
+    cached = _fingerprints.get(id(job_profiles_dict))
+    if cached is not None and cached[0] is job_profiles_dict and cached[1] == items:
+        return cached[2]
+    digest = hashlib.sha256()
+    for name, description in items:
+        digest.update(name.encode("utf-8") + b"\0" + description.encode("utf-8") + b"\0")
+    fingerprint = digest.hexdigest()
+    _fingerprints.pop(id(job_profiles_dict), None)
+    while len(_fingerprints) >= FINGERPRINT_CACHE_ENTRIES:
+        del _fingerprints[next(iter(_fingerprints))]
+    _fingerprints[id(job_profiles_dict)] = (job_profiles_dict, items, fingerprint)
+    return fingerprint
+
+
+class ProfileIndex:
+    def __init__(self, vectorizer, profile_names, profile_matrix, fingerprint, engine="tfidf"):
+        self.vectorizer = vectorizer
+        self.profile_names = list(profile_names)
+        self.profile_matrix = profile_matrix.tocsr()  # n_profiles x vocab, rows L2-normalized
+        self.fingerprint = fingerprint
+        self.engine = engine
+        self.ann = None
+
+    @classmethod
+    def build(cls, job_profiles_dict, engine="tfidf"):
+        """Fit the vectorizer on the profile descriptions.
+
+        Raises ValueError when the profiles leave no vocabulary.
+        """
+        if engine == "hashing":
+            from .hashing import HashedTfidfVectorizer
+
+            vectorizer = HashedTfidfVectorizer()
+        elif engine == "embedding":
+            from .embeddings import get_embedder
+
+            vectorizer = get_embedder(list(job_profiles_dict.values()))
+        elif engine == "tfidf":
+            vectorizer = TermTfidfVectorizer()
+        else:
+            raise ValueError(f"Unknown scoring engine {engine!r}; expected one of {ENGINES}")
+        profile_matrix = vectorizer.fit_transform(list(job_profiles_dict.values()))
+        index = cls(vectorizer, job_profiles_dict.keys(), profile_matrix,
+                    profiles_fingerprint(job_profiles_dict), engine)
+        if len(index.profile_names) >= ANN_MIN_PROFILES:
+            index.build_ann()
+        return index
+
+    def build_ann(self, **options):
+        """Attach an ANN index over the profile matrix (options go to `ANNIndex.build`)."""
+        from .ann import ANNIndex
+
+        self.ann = ANNIndex.build([self.profile_matrix], self.profile_matrix.shape[1], **options)
+        return self.ann
+
+    def _ann_match(self, resume_vector, top_k):
+        def exact(rows):
+            return (self.profile_matrix[rows] @ resume_vector.T).toarray().ravel()
+
+        rows, similarities = self.ann.search(resume_vector, top_k, exact)
+        return {self.profile_names[i]: similarities[pos] for pos, i in enumerate(rows)}
+
+    def scores(self, resume_text):
+        """Cosine similarity of the resume against every profile, in profile order."""
+        with stage("profile_transform", vocabulary_size=self.profile_matrix.shape[1]) as record:
+            resume_vector = self.vectorizer.transform([resume_text])  # 1 x vocab, L2-normalized
+            record["nnz"] = int(resume_vector.nnz)
+        with stage("profile_score", n_profiles=len(self.profile_names)):
+            return (self.profile_matrix @ resume_vector.T).toarray().ravel()
+
+    def match(self, resume_text, top_k=None):
+        """Profile name -> score, sorted by score in descending order.
+
+        With an ANN index and a `top_k`, only the ANN shortlist is scored.
+        """
+        if self.ann is not None and top_k is not None:
+            resume_vector = self.vectorizer.transform([resume_text])
+            return self._ann_match(resume_vector, top_k)
+        similarities = self.scores(resume_text)
+        with stage("profile_sort"):
+            order = np.argsort(-similarities, kind="stable")
+            if top_k is not None:
+                order = order[:top_k]
+            return {self.profile_names[i]: similarities[i] for i in order}
+
+    def match_many(self, resume_texts, top_k=None):
+        """`match` for a batch of resumes: one transform and one sparse matrix product."""
+        resume_texts = list(resume_texts)
+        with stage("profile_transform", n_documents=len(resume_texts)) as record:
+            resume_matrix = self.vectorizer.transform(resume_texts)  # n_resumes x vocab
+            record["nnz"] = int(resume_matrix.nnz)
+        if self.ann is not None and top_k is not None:
+            return [self._ann_match(resume_matrix[i], top_k) for i in range(resume_matrix.shape[0])]
+        with stage("profile_score", n_profiles=len(self.profile_names)):
+            similarities = (resume_matrix @ self.profile_matrix.T).toarray()  # n_resumes x n_profiles
+        matches = []
+        for row in similarities:
+            order = np.argsort(-row, kind="stable")
+            if top_k is not None:
+                order = order[:top_k]
+            matches.append({self.profile_names[i]: row[i] for i in order})
+        return matches
+
+    # --- Persistence ---
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"format": INDEX_FORMAT_VERSION, "index": self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)  # atomic, so concurrent workers never read a half-written file
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("format") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported profile index format in {path}")
+        return payload["index"]
+
+    @classmethod
+    def load_or_build(cls, path, job_profiles_dict, engine="tfidf"):
+        """Load the index from `path` if it matches the profiles and engine, else rebuild and save it."""
+        fingerprint = profiles_fingerprint(job_profiles_dict)
+        if os.path.exists(path):
+            try:
+                index = cls.load(path)
+                if index.fingerprint == fingerprint and index.engine == engine:
+                    return index
+            except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+                pass  # stale or corrupt file: rebuild below
+        index = cls.build(job_profiles_dict, engine)
+        index.save(path)
+        return index
+
+
+_indexes = {}
+
+
+def get_profile_index(job_profiles_dict, engine="tfidf"):
+    """Process-wide index for a profile set, rebuilt only when the profiles change."""
+    key = (profiles_fingerprint(job_profiles_dict), engine)
+    index = _indexes.get(key)
+    if index is None:
+        index = ProfileIndex.build(job_profiles_dict, engine)
+        _indexes[key] = index
+    return index
@@ -0,0 +1,229 @@
+# Result-presentation helpers shared by the Streamlit apps.
+#
+# Rendering is the expensive part of a large batch: formatting every score and
+# serializing every row into HTML costs more than the scoring itself. These
+# helpers format only the rows that are actually shown and hand the full
+# ranking out as a downloadable file instead.
+#
+# `RankedResults` keeps a whole ranking on the server (names plus a float32
+# score array). The apps ask it for one page at a time, optionally narrowed
+# to a score band, a minimum score and the top K, and re-sorted, so each
+# rerun formats and sends a page of rows whatever the batch size. Pages in
+# score order come from partial selection (`scoring.top_k_indices`) up to the
+# visible window; the full sort is only made for an export or a name order. Exports are written in chunks
+# of EXPORT_CHUNK_ROWS to a spooled temporary file (CSV, or Parquet row groups
+# when pyarrow is installed) instead of one string built in memory.
+# `matrix_export` does the same for a multi-JD (candidates x roles) matrix.
+import csv
+import io
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+
+from .instrumentation import stage
+from .scoring import top_k_indices
+
+# (label, lower bound inclusive, upper bound exclusive); None means unbounded
+SCORE_BANDS = (
+    ("All scores", None, None),
+    ("> 80%", 0.8, None),
+    ("60% - 80%", 0.6, 0.8),
+    ("40% - 60%", 0.4, 0.6),
+    ("< 40%", None, 0.4),
+)
+SORT_ORDERS = ("Best first", "Worst first", "Name (A-Z)")
+EXPORT_CHUNK_ROWS = 5000
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # exports larger than this spill to disk
+
+# One page of a selection: candidate indices, 1-based ranks, names and formatted scores of its rows
+ResultsPage = namedtuple("ResultsPage", ["rows", "ranks", "names", "scores", "n_selected", "page", "n_pages"])
+
+
+def format_percent(score):
+    return f"{score * 100:.2f}%"
+
+
+class RankedResults:
+    """A full ranking kept server-side and served a page or an export at a time."""
+
+    def __init__(self, names, scores):
+        self.names = names if isinstance(names, list) else list(names)
+        self.scores = np.asarray(scores, dtype=np.float32)  # no copy for a float32 ranking
+        self._order, self._ranks, self._name_order = None, None, None
+        self._selection_key, self._selection = None, None
+
+    def __len__(self):
+        return self.scores.shape[0]
+
+    @property
+    def order(self):
+        """Rank order (best first, ties in input order); a full sort, made only when needed."""
+        if self._order is None:
+            self._order = np.argsort(-self.scores, kind="stable").astype(np.int32)
+        return self._order
+
+    @property
+    def ranks(self):
+        """Each candidate's 1-based rank."""
+        if self._ranks is None:
+            self._ranks = np.empty(self.order.shape[0], dtype=np.int32)
+            self._ranks[self.order] = np.arange(1, self.order.shape[0] + 1, dtype=np.int32)
+        return self._ranks
+
+    @staticmethod
+    def _band_bounds(band, min_score=None):
+        _, lower, upper = next(b for b in SCORE_BANDS if b[0] == band)
+        if min_score is not None:
+            lower = min_score if lower is None else max(lower, min_score)
+        return lower, upper
+
+    @classmethod
+    def _band_mask(cls, scores, band, min_score=None):
+        lower, upper = cls._band_bounds(band, min_score)
+        mask = np.ones(scores.shape[0], dtype=bool)
+        if lower is not None:
+            mask &= scores >= lower
+        if upper is not None:
+            mask &= scores < upper
+        return mask
+
+    def band_counts(self, min_score=None):
+        """{band label: number of candidates in it (scoring at least `min_score`)}."""
+        return {band: int(np.count_nonzero(self._band_mask(self.scores, band, min_score)))
+                for band, _, _ in SCORE_BANDS}
+
+    def selection(self, band="All scores", sort="Best first"):
+        """Every candidate index in the band, in display order (cached for exports)."""
+        if self._selection_key != (band, sort):
+            if sort == "Name (A-Z)":
+                order = self._names_sorted()
+            elif sort == "Worst first":
+                order = self.order[::-1]
+            elif sort == "Best first":
+                order = self.order
+            else:
+                raise ValueError(f"Unknown sort order {sort!r}; expected one of {SORT_ORDERS}")
+            self._selection = order[self._band_mask(self.scores[order], band)]
+            self._selection_key = (band, sort)
+        return self._selection
+
+    def _names_sorted(self):
+        if self._name_order is None:
+            self._name_order = np.argsort(np.array(self.names, dtype=object), kind="stable")
+        return self._name_order
+
+    def _best_first_window(self, candidates, lo, hi):
+        """`candidates` at best-first positions [lo, hi), by partial selection from the nearer end."""
+        n = candidates.shape[0]
+        if hi <= lo:
+            return candidates[:0]
+        if hi <= n - lo:
+            return candidates[top_k_indices(self.scores[candidates], hi)[lo:]]
+        # Worst (n - lo) first, from the reversed candidates so ties come out in reverse input order
+        reverse = candidates[::-1]
+        worst = reverse[top_k_indices(-self.scores[reverse], n - lo)]
+        return worst[::-1][:hi - lo]
+
+    def page(self, page=1, page_size=50, band="All scores", sort="Best first", top_k=None, min_score=None):
+        """`ResultsPage` for 1-based `page` of the selection (clamped to the last page).
+
+        The selection is the band, narrowed to scores of at least `min_score`
+        and to the best `top_k` of those. For the score orders only the rows up
+        to the visible window are picked (`top_k_indices`), so paging through
+        the top of a large batch never sorts all of it.
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort order {sort!r}; expected one of {SORT_ORDERS}")
+        with stage("results_page", n_documents=len(self)) as record:
+            candidates = np.flatnonzero(self._band_mask(self.scores, band, min_score))
+            n_selected = candidates.shape[0] if top_k is None else min(candidates.shape[0], max(0, top_k))
+            n_pages = max(1, -(-n_selected // page_size))
+            page = min(max(1, page), n_pages)
+            start, end = (page - 1) * page_size, min(page * page_size, n_selected)
+            if sort == "Best first":
+                rows = self._best_first_window(candidates, start, end)
+            elif sort == "Worst first":
+                rows = self._best_first_window(candidates, n_selected - end, n_selected - start)[::-1]
+            else:
+                if n_selected < candidates.shape[0]:
+                    candidates = candidates[top_k_indices(self.scores[candidates], n_selected)]
+                selected = np.zeros(len(self), dtype=bool)
+                selected[candidates] = True
+                name_order = self._names_sorted()
+                rows = name_order[selected[name_order]][start:end]
+            if sort == "Name (A-Z)" or self._ranks is not None:
+                ranks = self.ranks[rows].tolist()
+            else:
+                # Everything above the band ranks ahead of it, and the window is in rank order
+                upper = self._band_bounds(band)[1]
+                above = int(np.count_nonzero(self.scores >= upper)) if upper is not None else 0
+                first = above + (start if sort == "Best first" else n_selected - end)
+                ranks = list(range(first + 1, first + rows.shape[0] + 1))
+                if sort == "Worst first":
+                    ranks.reverse()
+            record.update(n_selected=n_selected, n_rows=rows.shape[0])
+            return ResultsPage(rows, ranks, [self.names[i] for i in rows],
+                               [format_percent(self.scores[i]) for i in rows.tolist()],
+                               n_selected, page, n_pages)
+
+    def _chunks(self, band, sort, chunk_rows):
+        selected = self.selection(band, sort)
+        for start in range(0, selected.shape[0], chunk_rows):
+            yield selected[start:start + chunk_rows]
+
+    def iter_csv(self, band="All scores", sort="Best first", name_header="Resume File Name",
+                 score_header="Match Score (%)", chunk_rows=EXPORT_CHUNK_ROWS):
+        """The selection as CSV text, `chunk_rows` rows per yielded string."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["Rank", name_header, score_header])
+        for rows in self._chunks(band, sort, chunk_rows):
+            writer.writerows(zip(self.ranks[rows].tolist(), [self.names[i] for i in rows],
+                                 [f"{score * 100:.2f}" for score in self.scores[rows].tolist()]))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def export(self, file_format="csv", band="All scores", sort="Best first", name_header="Resume File Name",
+               score_header="Match Score (%)", chunk_rows=EXPORT_CHUNK_ROWS):
+        """The selection written chunk by chunk to a rewound temporary file ("csv" or "parquet")."""
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        with stage("results_export", n_documents=len(self), file_format=file_format):
+            if file_format == "csv":
+                for text in self.iter_csv(band, sort, name_header, score_header, chunk_rows):
+                    output.write(text.encode("utf-8"))
+            elif file_format == "parquet":
+                import pyarrow as pa  # optional; only needed for Parquet export
+                import pyarrow.parquet as pq
+
+                schema = pa.schema([("Rank", pa.int64()), (name_header, pa.string()), (score_header, pa.float32())])
+                with pq.ParquetWriter(output, schema) as writer:
+                    for rows in self._chunks(band, sort, chunk_rows):
+                        writer.write_table(pa.table([self.ranks[rows], [self.names[i] for i in rows],
+                                                     self.scores[rows] * np.float32(100)], schema=schema))
+            else:
+                raise ValueError(f"Unknown export format {file_format!r}; expected 'csv' or 'parquet'")
+        output.seek(0)
+        return output
+
+
+def matrix_export(names, roles, scores, chunk_rows=EXPORT_CHUNK_ROWS, name_header="Resume File Name"):
+    """A (candidates x roles) score matrix as CSV (percent, one column per role) in a rewound temporary file."""
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with stage("results_export", n_documents=len(names), n_roles=len(roles), file_format="csv"):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name_header, *roles])
+        for start in range(0, len(names), chunk_rows):
+            block = np.round(scores[start:start + chunk_rows] * np.float32(100), 2).tolist()
+            writer.writerows([name, *row] for name, row in zip(names[start:start + chunk_rows], block))
+            output.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            output.write(buffer.getvalue().encode("utf-8"))
+    output.seek(0)
+    return output
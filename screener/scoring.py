@@ -0,0 +1,149 @@
+# Sparse TF-IDF scoring engine shared by the Streamlit apps.
+#
+# TfidfVectorizer already L2-normalizes every row, so the cosine similarity
+# between the query (row 0) and each resume is just a dot product. Keeping the
+# matrix in CSR form means one sparse matrix x vector product instead of a
+# dense (n_docs x vocab) float64 array, which is what lets a single batch hold
+# 10k+ resumes without blowing up the worker's memory.
+#
+# Documents are tokenized through `tokens`, so a resume already seen by another
+# scorer (another JD, the profile matcher, the structural scan) is not split
+# again. `TermTfidfVectorizer` gives the same matrix as
+# `TfidfVectorizer(stop_words='english')`.
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sp
+
+from .instrumentation import stage
+from .tokens import TermTfidfVectorizer, compact_columns, count_matrix, tfidf_rows
+
+
+def _sparse_scores(query_text, documents_text_list):
+    documents = [query_text] + list(documents_text_list)
+    with stage("tfidf_fit_transform", n_documents=len(documents) - 1) as record:
+        matrix = TermTfidfVectorizer().fit_transform(documents)
+        record.update(vocabulary_size=matrix.shape[1], nnz=int(matrix.nnz))
+
+    with stage("score_sparse"):
+        query_vector = matrix[0]  # 1 x vocab, already L2-normalized
+        # Every row against the query, then drop the query's own score:
+        # slicing off row 0 first would copy the whole document matrix
+        scores = (matrix @ query_vector.T).toarray().ravel()[1:]
+    return scores, matrix
+
+
+def rank_documents(query_text, documents_text_list):
+    """Cosine similarity of every document against the query, computed sparsely.
+
+    Returns a 1-D numpy array with one score per document, in input order.
+    The values match `cosine_similarity` on the dense TF-IDF vectors.
+    """
+    scores, _ = _sparse_scores(query_text, documents_text_list)
+    return scores
+
+
+def rank_documents_with_stats(query_text, documents_text_list):
+    """Same as `rank_documents` but also reports what the batch cost.
+
+    Returns `(scores, stats)` where stats holds the document count, vocabulary
+    size, number of stored non-zeros and the peak Python heap usage (bytes)
+    observed while vectorizing and scoring the batch.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        scores, matrix = _sparse_scores(query_text, documents_text_list)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    stats = {
+        "n_documents": matrix.shape[0] - 1,
+        "vocabulary_size": matrix.shape[1],
+        "nnz": int(matrix.nnz),
+        "peak_memory_bytes": peak_bytes,
+    }
+    return scores, stats
+
+
+def score_matrix(query_texts, documents_text_list):
+    """Full queries x documents cosine score matrix from a single fit.
+
+    All queries and documents share one vocabulary/IDF, so scoring N job
+    descriptions against M resumes is one sparse (N x vocab) @ (vocab x M)
+    product instead of N separate refits. Returns a dense (N, M) array.
+    Because the IDF is computed over every query at once, scores differ
+    slightly from calling `rank_documents` once per query.
+    """
+    query_texts = list(query_texts)
+    documents = query_texts + list(documents_text_list)
+    with stage("tfidf_fit_transform", n_documents=len(documents) - len(query_texts),
+               n_queries=len(query_texts)) as record:
+        matrix = TermTfidfVectorizer().fit_transform(documents)
+        record.update(vocabulary_size=matrix.shape[1], nnz=int(matrix.nnz))
+
+    with stage("score_sparse"):
+        query_matrix = matrix[:len(query_texts)]
+        return (query_matrix @ matrix.T).toarray()[:, len(query_texts):]
+
+
+def top_k_indices(scores, k, min_score=None):
+    """Indices of the `k` best scores, best first, using partial selection.
+
+    `np.partition` finds the k-th best score in O(n) and only the k picked are
+    sorted, so showing the best 50 of 10k candidates never sorts the whole
+    batch. Scores below `min_score` are dropped. Ties keep input order, also
+    across the cut: of several candidates tied at the k-th score, the first
+    ones make it in.
+    """
+    with stage("select_top_k", n_documents=len(scores), k=k):
+        return _top_k_indices(np.asarray(scores), k, min_score)
+
+
+def _top_k_indices(scores, k, min_score):
+    candidates = np.arange(scores.shape[0])
+    if min_score is not None:
+        candidates = candidates[scores >= min_score]
+    if k is not None and k < candidates.shape[0]:
+        if k <= 0:
+            return candidates[:0]
+        values = -scores[candidates]
+        kth = np.partition(values, k - 1)[k - 1]
+        # Everything better than the k-th score, then its ties in input order
+        better = np.flatnonzero(values < kth)
+        tied = np.flatnonzero(values == kth)[:k - better.shape[0]]
+        candidates = candidates[np.sort(np.concatenate([better, tied]))]
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order]
+
+
+def rank_batches(query_text, batches):
+    """Score several independent resume batches against the same query in one pass.
+
+    Every document is tokenized once (the query only once for all batches), then
+    each batch gets its own IDF weights, exactly as if `rank_documents(query_text,
+    batch)` had been called for it. Returns one score array per batch.
+    """
+    batches = [list(batch) for batch in batches]
+    documents = [query_text] + [text for batch in batches for text in batch]
+    with stage("tokenize", n_documents=len(documents) - 1, n_batches=len(batches)) as record:
+        counts, _ = compact_columns(count_matrix(documents))
+        record.update(vocabulary_size=counts.shape[1], nnz=int(counts.nnz))
+    query_counts = counts[0]
+
+    results = []
+    offset = 1
+    with stage("score_batches"):
+        for batch in batches:
+            block = sp.vstack([query_counts, counts[offset:offset + len(batch)]]).tocsr()
+            offset += len(batch)
+            # Same smoothed IDF TfidfVectorizer would fit on [query] + batch
+            df = np.bincount(block.indices, minlength=block.shape[1])
+            idf = np.log((1 + block.shape[0]) / (1 + df)) + 1.0
+            weighted = tfidf_rows(block, idf, copy=False)
+            results.append((weighted[1:] @ weighted[0].T).toarray().ravel())
+    return results
@@ -0,0 +1,336 @@
+# Structural matching: skills, job titles, degree level and years of experience.
+#
+# The dictionary (PROFILE_KEYWORDS, the profile names, DEGREE_LEVELS and
+# ALIASES) is compiled once into a word-level Aho-Corasick automaton. A resume
+# is read as its shared token ids (`tokens.token_ids`, cached, so a resume the
+# text scorer has already seen is not split again). A lookup array maps them
+# to dictionary word ids, and a single pass over the hits emits every dictionary
+# phrase found, so the cost is linear in the resume length whatever the
+# dictionary size. Words outside the dictionary just reset the automaton.
+# "N years" mentions are picked up in the same pass. Dotted degree
+# abbreviations ("B.E.", "Ph.D") are the exception: tokenized they are plain
+# letters ("plan b e"), so one regex finds them in the raw text instead. A bare
+# "master" only counts as a degree in a degree phrasing ("master of",
+# "master's"), never in a job title like "Scrum Master".
+#
+# Per-resume output is kept as compact arrays (`StructuralFeatures`): CSR
+# term ids plus a degree level and years of experience per resume. The job
+# description goes through the same scan and gives the `Requirements`. Each
+# available component (skill coverage, title hit, degree, experience) is a
+# 0-1 score per resume, and `blend` mixes them with the text similarity using
+# configurable weights (RESUME_HYBRID_WEIGHTS="text=0.6,skills=0.25,...").
+# Components the JD does not ask for are left out, and the remaining weights
+# are renormalized.
+import os
+import re
+from collections import deque, namedtuple
+
+import numpy as np
+
+from .instrumentation import stage
+from .tokens import current_vocabulary, token_ids
+
+Term = namedtuple("Term", ["kind", "name", "level"])  # kind: "skill" | "title" | "degree"
+
+# Compact per-resume features: terms of resume i are term_ids[indptr[i]:indptr[i + 1]]
+StructuralFeatures = namedtuple("StructuralFeatures", ["indptr", "term_ids", "degree_level", "years"])
+
+# What a job description asks for; degree_level/years are 0 when not stated
+Requirements = namedtuple("Requirements", ["skills", "titles", "degree_level", "years"])
+
+# Blended scores, the 0-1 component scores they came from, and the resume features
+HybridScores = namedtuple("HybridScores", ["scores", "components", "features"])
+
+DEGREE_LEVELS = {
+    "phd": 4, "ph.d": 4, "doctorate": 4, "doctoral degree": 4,
+    "master": 3, "msc": 3, "m.sc": 3, "mba": 3, "m.tech": 3, "mtech": 3,
+    "bachelor": 2, "bsc": 2, "b.sc": 2, "btech": 2, "b.tech": 2, "b.e": 2, "b.s": 2,
+    "associate degree": 1, "diploma": 1,
+}
+
+# Degrees whose bare word is also an ordinary word ("Scrum Master") are only
+# recognised in these phrasings. Plurals match too ("masters degree").
+DEGREE_PHRASES = {
+    "master": ["master of", "master's", "master degree", "master's degree"],
+}
+
+# Other spellings of dictionary phrases (canonical -> aliases)
+ALIASES = {
+    "rest api": ["restful api"],
+    "react.js": ["react", "reactjs"],
+    "postgresql": ["postgres"],
+    "kubernetes": ["k8s"],
+    "ci/cd": ["continuous integration", "continuous delivery"],
+    "applicant tracking system": ["ats"],
+    "scikit-learn": ["sklearn"],
+    "machine learning": ["ml"],
+    "gcp": ["google cloud"],
+    "aws": ["amazon web services"],
+    "javascript": ["js"],
+    "seo": ["search engine optimization"],
+    "predictive modeling": ["predictive model", "predictive modelling"],
+    "wireframe": ["wireframing"],
+    "prototype": ["prototyping"],
+    "ui/ux": ["ux/ui"],
+    "frontend developer": ["front end developer"],
+    "interviewing": ["interview"],
+    "budgeting": ["budget"],
+}
+
+COMPONENTS = ("text", "skills", "title", "degree", "experience")
+_DEFAULT_WEIGHTS_SPEC = "text=0.6,skills=0.25,title=0.05,degree=0.05,experience=0.05"
+MAX_YEARS = 50  # larger numbers before "years" are dates or noise
+
+_YEAR_WORDS = ("year", "years", "yr", "yrs")
+
+
+def parse_weights(spec):
+    """{"text": 0.6, ...} from "text=0.6,skills=0.25,..."; unknown or negative weights raise ValueError."""
+    weights = dict.fromkeys(COMPONENTS, 0.0)
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"Unknown hybrid weight {name!r}; expected one of {COMPONENTS}")
+        weights[name] = float(value)
+        if weights[name] < 0:
+            raise ValueError(f"Hybrid weight {name!r} must not be negative")
+    return weights
+
+
+DEFAULT_WEIGHTS = parse_weights(os.environ.get("RESUME_HYBRID_WEIGHTS", _DEFAULT_WEIGHTS_SPEC))
+
+
+def words(text):
+    """The shared tokenizer's words of `text` ("CI/CD" -> ci, cd; "B.Sc" -> b, sc)."""
+    vocabulary = current_vocabulary()
+    return [vocabulary.words[i] for i in token_ids(text, vocabulary=vocabulary)]
+
+
+def _leading_number(word):
+    return int(word) if word.isdecimal() else None
+
+
+def _abbreviation_pattern(abbreviation):
+    """Regex for a dotted abbreviation in raw text: "b.e" matches "B.E." and "B. E", not "be" or "b e"."""
+    parts = [re.escape(part) for part in abbreviation.split(".")]
+    return r"(?<![\w.])" + r"\.\s?".join(parts) + r"(?!\w)"
+
+
+class StructureMatcher:
+    def __init__(self, phrases, abbreviations=()):
+        """`phrases`: iterable of (phrase, Term). Phrases sharing a Term are aliases.
+
+        `abbreviations`: (dotted abbreviation, Term) pairs such as ("b.e", ...),
+        matched on the raw text, since without their dots they are ordinary
+        letters ("plan b e").
+        """
+        phrases = [(words(phrase), term) for phrase, term in phrases]
+        abbreviations = list(abbreviations)
+        self.terms = []
+        term_ids = {}
+        # Surface word -> word id (from 1, so ids are truthy); dictionary words
+        # first, so a plural never takes a real word's id
+        self._word_ids = {}
+        for phrase_words, _ in phrases:
+            for word in phrase_words:
+                self._word_ids.setdefault(word, len(self._word_ids) + 1)
+        for word, word_id in list(self._word_ids.items()):
+            for plural in (word + "s", word + "es"):
+                self._word_ids.setdefault(plural, word_id)
+
+        goto, out = [{}], [()]
+        for phrase_words, term in phrases:
+            term_id = term_ids.setdefault(term, len(term_ids))
+            if term_id == len(self.terms):
+                self.terms.append(term)
+            node = 0
+            for word in phrase_words:
+                word_id = self._word_ids[word]
+                child = goto[node].get(word_id)
+                if child is None:
+                    goto.append({})
+                    out.append(())
+                    child = goto[node][word_id] = len(goto) - 1
+                node = child
+            if term_id not in out[node]:
+                out[node] += (term_id,)
+        self._year_word_ids = {self._word_ids.setdefault(w, len(self._word_ids) + 1) for w in _YEAR_WORDS}
+
+        # Failure links (breadth first), with each node's output merged with its fallback's
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word_id, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and word_id not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(word_id, 0) if node else 0
+                out[child] += tuple(t for t in out[fail[child]] if t not in out[child])
+        self._goto, self._fail, self._out = goto, fail, out
+
+        self._abbreviation_ids = {}
+        for abbreviation, term in abbreviations:
+            term_id = term_ids.setdefault(term, len(term_ids))
+            if term_id == len(self.terms):
+                self.terms.append(term)
+            self._abbreviation_ids[abbreviation.lower()] = term_id
+        self._abbreviation_re = re.compile(
+            "|".join(f"(?P<a{i}>{_abbreviation_pattern(a)})" for i, a in enumerate(self._abbreviation_ids)),
+            re.IGNORECASE) if abbreviations else None
+        self._abbreviation_groups = {f"a{i}": t for i, t in enumerate(self._abbreviation_ids.values())}
+
+        self._levels = np.array([term.level for term in self.terms], dtype=np.int8)
+        self._kinds = np.array([term.kind for term in self.terms])
+        # (vocabulary, vocabulary id -> dictionary word id (0: none))
+        self._lookup = (None, np.zeros(0, dtype=np.int32))
+
+    def _dictionary_ids(self, ids, vocabulary):
+        lookup_vocabulary, lookup = self._lookup
+        if lookup_vocabulary is not vocabulary:
+            lookup = np.zeros(0, dtype=np.int32)
+        if lookup.shape[0] < len(vocabulary):
+            new_words = vocabulary.words[lookup.shape[0]:len(vocabulary)]
+            lookup = np.concatenate([lookup, np.fromiter(
+                (self._word_ids.get(w, 0) for w in new_words), dtype=np.int32, count=len(new_words))])
+            self._lookup = (vocabulary, lookup)
+        return lookup[ids]
+
+    @classmethod
+    def from_profiles(cls, job_profiles_dict=None, keywords=None):
+        """Dictionary seeded from the profile keywords and names, plus degrees and aliases."""
+        from .job_profiles import PREDEFINED_JOB_PROFILES, PROFILE_KEYWORDS
+
+        job_profiles_dict = PREDEFINED_JOB_PROFILES if job_profiles_dict is None else job_profiles_dict
+        keywords = PROFILE_KEYWORDS if keywords is None else keywords
+        phrases = []
+        for profile_name in job_profiles_dict:
+            entry = keywords.get(profile_name, {})
+            # "Software Engineer (Backend)" -> "software engineer"
+            titles = [" ".join(re.sub(r"\(.*?\)", " ", profile_name).lower().split())] + entry.get("titles", [])
+            phrases += [(title, Term("title", title, 0)) for title in titles]
+            phrases += [(skill, Term("skill", skill, 0)) for skill in entry.get("skills", [])]
+        abbreviations = []
+        for name, level in DEGREE_LEVELS.items():
+            term = Term("degree", name, level)
+            if "." in name:
+                abbreviations.append((name, term))
+            else:
+                phrases += [(phrase, term) for phrase in DEGREE_PHRASES.get(name, [name])]
+        for phrase, term in list(phrases):
+            phrases += [(alias, term) for alias in ALIASES.get(phrase, [])]
+        return cls(phrases, abbreviations)
+
+    def scan(self, text):
+        """`(term_ids, years)` found in one text; years are the "N years" numbers mentioned."""
+        goto, fail, out = self._goto, self._fail, self._out
+        vocabulary = current_vocabulary()
+        ids = token_ids(text, vocabulary=vocabulary)
+        word_ids = self._dictionary_ids(ids, vocabulary)
+        found, years = set(), []
+        state, last = 0, -2
+        # Only dictionary words are visited; a gap between them resets the automaton
+        for i in np.flatnonzero(word_ids).tolist():
+            word_id = int(word_ids[i])
+            if i != last + 1:
+                state = 0
+            last = i
+            if word_id in self._year_word_ids and i:
+                number = _leading_number(vocabulary.words[ids[i - 1]])
+                if number is not None and number <= MAX_YEARS:
+                    years.append(number)
+            while state and word_id not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word_id, 0)
+            if out[state]:
+                found.update(out[state])
+        if self._abbreviation_re is not None and "." in text:
+            found.update(self._abbreviation_groups[m.lastgroup] for m in self._abbreviation_re.finditer(text))
+        return sorted(found), years
+
+    def extract_many(self, texts):
+        """`StructuralFeatures` for each text: its terms, highest degree level and most years mentioned."""
+        texts = list(texts)
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        term_ids, degree_level, years = [], np.zeros(len(texts), dtype=np.int8), np.zeros(len(texts), dtype=np.float32)
+        with stage("structure_scan", n_documents=len(texts)) as record:
+            for i, text in enumerate(texts):
+                found, mentioned = self.scan(text)
+                term_ids.extend(found)
+                indptr[i + 1] = len(term_ids)
+                if found:
+                    degree_level[i] = self._levels[found].max()
+                if mentioned:
+                    years[i] = max(mentioned)
+            record["nnz"] = len(term_ids)
+        return StructuralFeatures(indptr, np.array(term_ids, dtype=np.int32), degree_level, years)
+
+    def requirements(self, job_description):
+        """Skills and titles the JD names, its lowest stated degree level and years."""
+        found, mentioned = self.scan(job_description)
+        found = np.array(found, dtype=np.int32)
+        kinds = self._kinds[found] if found.size else np.array([])
+        levels = self._levels[found[kinds == "degree"]] if found.size else np.zeros(0)
+        return Requirements(
+            skills=found[kinds == "skill"],
+            titles=found[kinds == "title"],
+            degree_level=int(levels.min()) if levels.size else 0,
+            years=float(min(mentioned)) if mentioned else 0.0,
+        )
+
+    def term_names(self, features, i):
+        """Dictionary names of the terms found in resume `i` (for display)."""
+        return [self.terms[t].name for t in features.term_ids[features.indptr[i]:features.indptr[i + 1]]]
+
+
+def component_scores(requirements, features):
+    """0-1 score arrays for every component the requirements ask for."""
+    n_docs = features.indptr.shape[0] - 1
+    rows = np.repeat(np.arange(n_docs), np.diff(features.indptr))
+    components = {}
+    if requirements.skills.size:
+        hits = np.bincount(rows[np.isin(features.term_ids, requirements.skills)], minlength=n_docs)
+        components["skills"] = hits / requirements.skills.size
+    if requirements.titles.size:
+        hits = np.bincount(rows[np.isin(features.term_ids, requirements.titles)], minlength=n_docs)
+        components["title"] = (hits > 0).astype(np.float64)
+    if requirements.degree_level:
+        components["degree"] = np.minimum(features.degree_level / requirements.degree_level, 1.0)
+    if requirements.years:
+        components["experience"] = np.minimum(features.years / requirements.years, 1.0)
+    return components
+
+
+def blend(text_scores, components, weights=None):
+    """Weighted mean of the text scores and the available components (weights renormalized)."""
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    total = weights.get("text", 0.0) * np.asarray(text_scores, dtype=np.float64)
+    weight_sum = weights.get("text", 0.0)
+    for name, scores in components.items():
+        total = total + weights.get(name, 0.0) * scores
+        weight_sum += weights.get(name, 0.0)
+    return total / weight_sum if weight_sum else total
+
+
+_default_matcher = None
+
+
+def get_matcher():
+    """Process-wide matcher compiled from the predefined profiles."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = StructureMatcher.from_profiles()
+    return _default_matcher
+
+
+def hybrid_scores(job_description, texts, text_scores, weights=None, matcher=None):
+    """Blend `text_scores` (aligned with `texts`) with the structural match, as `HybridScores`."""
+    matcher = matcher or get_matcher()
+    features = matcher.extract_many(texts)
+    with stage("structure_blend", n_documents=len(text_scores)):
+        components = component_scores(matcher.requirements(job_description), features)
+        return HybridScores(blend(text_scores, components, weights), components, features)
@@ -0,0 +1,209 @@
+# Content-addressed cache for extracted resume text.
+#
+# PDF parsing is by far the slowest step of a ranking run, and the same
+# candidate PDFs get uploaded against many job descriptions. Entries are keyed
+# by the SHA-256 of the raw file bytes plus an extractor version string, so a
+# change to the extraction logic never serves stale text. Lookups go through an
+# in-memory LRU first and fall back to a SQLite file holding zlib-compressed
+# text, with the page warnings and truncation flag the extraction reported
+# (so a cut-off document still says so when it is served from the cache);
+# the on-disk store is trimmed (least recently used first) once it grows
+# past `max_disk_bytes`. The store's size is tracked as entries are written
+# and only summed from disk when the cache connects, looks over budget, or
+# has not looked for SIZE_RESYNC_SECONDS (other processes write to the same
+# file).
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "RESUME_TEXT_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "text_cache.sqlite"),
+)
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024  # compressed text, ~500 MB
+DEFAULT_MAX_MEMORY_ENTRIES = 1024
+EVICT_TO_SHARE = 0.9  # eviction trims to this share of the budget, so it does not run on every write
+EVICT_BATCH_ROWS = 256
+SIZE_RESYNC_SECONDS = 60.0
+
+# A cached extraction: the text plus its per-page warnings and truncation flag
+CachedText = namedtuple("CachedText", ["text", "warnings", "truncated"])
+
+
+def content_key(data, extractor_version):
+    """Cache key for a file's raw bytes under a given extractor version."""
+    return digest_key(hashlib.sha256(data).hexdigest(), extractor_version)
+
+
+def digest_key(digest, extractor_version):
+    """`content_key` from an already computed SHA-256 hex digest of the bytes."""
+    return f"{extractor_version}:{digest}"
+
+
+def read_file_bytes(file_obj):
+    """Raw bytes of an uploaded file (Streamlit UploadedFile, open file, path, or bytes)."""
+    if isinstance(file_obj, (bytes, bytearray)):
+        return bytes(file_obj)
+    if isinstance(file_obj, (str, os.PathLike)):
+        with open(file_obj, "rb") as f:
+            return f.read()
+    if hasattr(file_obj, "getvalue"):
+        return file_obj.getvalue()
+    position = file_obj.tell()
+    data = file_obj.read()
+    file_obj.seek(position)
+    return data
+
+
+class TextCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_disk_bytes=DEFAULT_MAX_DISK_BYTES,
+                 max_memory_entries=DEFAULT_MAX_MEMORY_ENTRIES):
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_entries = max_memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._disk_bytes = 0  # compressed bytes on disk, as last seen by this process
+        self._synced_at = 0.0
+
+    # --- SQLite backing store ---
+    def _connection(self):
+        # Connections must not be shared across forked worker processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, text BLOB NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " warnings TEXT NOT NULL DEFAULT '[]', truncated INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+            if "truncated" not in columns:  # a store written before warnings were kept
+                self._conn.execute("ALTER TABLE entries ADD COLUMN warnings TEXT NOT NULL DEFAULT '[]'")
+                self._conn.execute("ALTER TABLE entries ADD COLUMN truncated INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+            self._sync_size(self._conn)
+        return self._conn
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _sync_size(self, conn):
+        self._disk_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._synced_at = time.monotonic()
+
+    def _evict_disk(self, conn):
+        """Delete least recently used entries, a batch at a time, once the store is over budget."""
+        if time.monotonic() - self._synced_at > SIZE_RESYNC_SECONDS:
+            self._sync_size(conn)
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        self._sync_size(conn)  # other processes may have written or evicted
+        target = int(self.max_disk_bytes * EVICT_TO_SHARE)
+        while self._disk_bytes > target:
+            rows = conn.execute("SELECT key, size FROM entries ORDER BY last_access LIMIT ?",
+                                (EVICT_BATCH_ROWS,)).fetchall()
+            if not rows:
+                break
+            doomed = []
+            for key, size in rows:
+                if self._disk_bytes <= target:
+                    break
+                doomed.append((key,))
+                self._disk_bytes -= size
+            conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    # --- Public API ---
+    def get_entry(self, key):
+        """`CachedText` for `key`, or None. Updates the hit/miss counters."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            conn = self._connection()
+            row = conn.execute("SELECT text, warnings, truncated FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            entry = CachedText(zlib.decompress(row[0]).decode("utf-8"), tuple(json.loads(row[1])), bool(row[2]))
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self._remember(key, entry)
+            self.hits += 1
+            return entry
+
+    def get(self, key):
+        """Cached text for `key`, or None."""
+        entry = self.get_entry(key)
+        return None if entry is None else entry.text
+
+    def put(self, key, text, warnings=(), truncated=False):
+        """Store `text` with the page `warnings` and `truncated` flag its extraction reported."""
+        entry = CachedText(text, tuple(warnings), bool(truncated))
+        blob = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            conn = self._connection()
+            replaced = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, text, size, last_access, warnings, truncated)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, len(blob), time.time(), json.dumps(entry.warnings), int(entry.truncated)),
+            )
+            self._disk_bytes += len(blob) - (replaced[0] if replaced else 0)
+            self._evict_disk(conn)
+            conn.commit()
+            self._remember(key, entry)
+
+    def stats(self):
+        with self._lock:
+            conn = self._connection()
+            entries, disk_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": entries,
+                "disk_bytes": disk_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+            self._disk_bytes = 0
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Process-wide cache shared by every app script (survives Streamlit reruns)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TextCache()
+    return _default_cache
@@ -0,0 +1,317 @@
+# Shared tokenization: every document is tokenized once into interned ids.
+#
+# `token_ids(text)` lowercases the text, splits it into words with one regex
+# (`\w+`, the words sklearn's default pattern sees) and maps every word to a
+# process-wide integer id. New words are interned on first sight. The int32
+# array is cached per text digest (LRU, RESUME_TOKEN_CACHE_ENTRIES), so a
+# resume ranked against several JDs, matched against the profiles and scanned
+# for skills is split only once, and the cache never holds the texts.
+#
+# Consumers read the ids through per-vocabulary lookup arrays instead of
+# re-tokenizing:
+#   - `term_ids` keeps what TfidfVectorizer(stop_words='english') would count
+#     (two or more characters, not an English stop word). Every TF-IDF scorer
+#     builds its count matrix from these with `count_matrix`, and the results
+#     match sklearn exactly.
+#   - `hashed_counts` maps ids to the columns HashingVectorizer would use (same
+#     murmurhash), so on-disk feature stores stay compatible.
+#   - the structural matcher looks up dictionary words by id.
+# Ids are only meaningful inside one process and one vocabulary. Anything
+# persisted (profile indexes, LSA models) stores the term strings and
+# re-interns them on load.
+#
+# The vocabulary is bounded: once it holds RESUME_VOCABULARY_MAX_WORDS words,
+# `current_vocabulary` starts an empty one and clears the cache. Every
+# function here takes the vocabulary once per call, so work that is already
+# running keeps consistent ids, and the old table is freed with its last user.
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+_WORD_RE = re.compile(r"(?u)\b\w+\b")
+DEFAULT_CACHE_ENTRIES = int(os.environ.get("RESUME_TOKEN_CACHE_ENTRIES", "10000"))
+MAX_VOCABULARY_WORDS = int(os.environ.get("RESUME_VOCABULARY_MAX_WORDS", "500000"))
+COUNT_BLOCK_TOKENS = 1 << 18  # term tokens counted per block before their duplicates are summed
+
+
+class Vocabulary:
+    """Append-only word <-> id table with lazily grown per-id lookup arrays."""
+
+    def __init__(self):
+        self._ids = {}
+        self.words = []
+        self._lock = threading.Lock()
+        self._term_mask = np.zeros(0, dtype=bool)
+        self._hashed = {}  # n_features -> column per id
+
+    def __len__(self):
+        return len(self.words)
+
+    def ids(self, words):
+        """int32 id per word, interning words not seen before."""
+        ids = list(map(self._ids.get, words))
+        if None in ids:
+            with self._lock:
+                for i, word in enumerate(words):
+                    if ids[i] is None:
+                        ids[i] = self._ids.get(word)
+                        if ids[i] is None:
+                            ids[i] = self._ids[word] = len(self.words)
+                            self.words.append(word)
+        return np.array(ids, dtype=np.int32)
+
+    def _grown(self, array, compute):
+        """`array` extended with `compute(words)` for ids added since it was built."""
+        n_words = len(self.words)
+        if array.shape[0] < n_words:
+            array = np.concatenate([array, compute(self.words[array.shape[0]:n_words])])
+        return array
+
+    def term_mask(self):
+        """True for ids TfidfVectorizer(stop_words='english') counts."""
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+        self._term_mask = self._grown(self._term_mask, lambda words: np.array(
+            [len(w) > 1 and w not in ENGLISH_STOP_WORDS for w in words], dtype=bool))
+        return self._term_mask
+
+    def hashed_columns(self, n_features):
+        """HashingVectorizer's column for every id (murmurhash3 of the word, seed 0)."""
+        from sklearn.utils import murmurhash3_32
+
+        def columns(words):
+            hashes = np.array([murmurhash3_32(w, seed=0) for w in words], dtype=np.int64)
+            # As in sklearn's _hashing_fast: abs(h) % n, with INT_MIN special-cased
+            result = np.abs(hashes) % n_features
+            result[hashes == -2 ** 31] = (2 ** 31 - 1 - (n_features - 1)) % n_features
+            return result.astype(np.int32)
+
+        self._hashed[n_features] = self._grown(self._hashed.get(n_features, np.zeros(0, dtype=np.int32)), columns)
+        return self._hashed[n_features]
+
+
+_vocabulary = Vocabulary()
+_cache = OrderedDict()  # text digest -> (vocabulary, ids)
+_cache_lock = threading.Lock()
+
+
+def current_vocabulary():
+    """The vocabulary new work interns into; replaced by an empty one once it is full."""
+    global _vocabulary
+    if len(_vocabulary) >= MAX_VOCABULARY_WORDS:
+        with _cache_lock:
+            if len(_vocabulary) >= MAX_VOCABULARY_WORDS:
+                _vocabulary = Vocabulary()
+                _cache.clear()
+    return _vocabulary
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def token_ids(text, cache=True, vocabulary=None):
+    """Interned ids of every lowercased word of `text`, in order.
+
+    Ids come from `vocabulary` (default: `current_vocabulary()`). Cached
+    unless `cache` is False (one-shot streams such as pool appends would
+    only push out texts that are scored again).
+    """
+    vocabulary = current_vocabulary() if vocabulary is None else vocabulary
+    key = _digest(text)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] is vocabulary:
+            _cache.move_to_end(key)
+            return entry[1]
+    ids = vocabulary.ids(_WORD_RE.findall(text.lower()))
+    ids.setflags(write=False)  # shared between callers
+    if not cache:
+        return ids
+    with _cache_lock:
+        if vocabulary is _vocabulary:  # ids of a retired vocabulary are not worth keeping
+            _cache[key] = (vocabulary, ids)
+            while len(_cache) > DEFAULT_CACHE_ENTRIES:
+                _cache.popitem(last=False)
+    return ids
+
+
+def clear_cache():
+    """Forget every cached text; the vocabulary is kept."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def term_ids(text, cache=True, vocabulary=None):
+    """The ids of `text` that TfidfVectorizer(stop_words='english') would count."""
+    vocabulary = current_vocabulary() if vocabulary is None else vocabulary
+    ids = token_ids(text, cache, vocabulary)
+    return ids[vocabulary.term_mask()[ids]]
+
+
+def count_matrix(texts, n_columns=None, vocabulary=None):
+    """CSR of raw term counts, one row per text, columns = ids in `vocabulary` (default: the current one).
+
+    Texts are counted in blocks of about COUNT_BLOCK_TOKENS term tokens, so
+    the one-entry-per-token temporaries stay small whatever the batch size.
+    """
+    import scipy.sparse as sp
+
+    vocabulary = current_vocabulary() if vocabulary is None else vocabulary
+    data, indices, row_nnz = [], [], []
+    block, block_tokens = [], 0
+
+    def flush():
+        indptr = np.zeros(len(block) + 1, dtype=np.int64)
+        np.cumsum([r.shape[0] for r in block], out=indptr[1:])
+        ids = np.concatenate(block) if block else np.zeros(0, dtype=np.int32)
+        part = sp.csr_matrix((np.ones(ids.shape[0]), ids, indptr), shape=(len(block), len(vocabulary)))
+        part.sum_duplicates()
+        data.append(part.data)
+        indices.append(part.indices)
+        row_nnz.append(np.diff(part.indptr))
+
+    for text in texts:
+        block.append(term_ids(text, vocabulary=vocabulary))
+        block_tokens += block[-1].shape[0]
+        if block_tokens >= COUNT_BLOCK_TOKENS:
+            flush()
+            block, block_tokens = [], 0
+    if block or not row_nnz:
+        flush()
+
+    row_nnz = np.concatenate(row_nnz)
+    indptr = np.zeros(row_nnz.shape[0] + 1, dtype=np.int64)
+    np.cumsum(row_nnz, out=indptr[1:])
+    n_columns = len(vocabulary) if n_columns is None else n_columns
+    matrix = sp.csr_matrix((np.concatenate(data), np.concatenate(indices).astype(np.int32, copy=False), indptr),
+                           shape=(row_nnz.shape[0], n_columns), copy=False)
+    matrix.has_canonical_format = True  # every block was summed
+    return matrix
+
+
+def compact_columns(matrix):
+    """`(matrix, column_ids)`: the matrix restricted to its used columns (in id order).
+
+    The result shares `data` and `indptr` with `matrix`, which callers drop.
+    """
+    import scipy.sparse as sp
+
+    used = np.zeros(matrix.shape[1], dtype=bool)
+    used[matrix.indices] = True
+    column_ids = np.flatnonzero(used)
+    local = np.cumsum(used, dtype=np.int32)
+    local -= 1
+    compact = sp.csr_matrix((matrix.data, local[matrix.indices], matrix.indptr),
+                            shape=(matrix.shape[0], column_ids.shape[0]), copy=False)
+    compact.has_canonical_format = matrix.has_canonical_format  # the mapping keeps column order
+    return compact, column_ids
+
+
+def hashed_counts(texts, n_features, cache=True):
+    """What `HashingVectorizer(stop_words='english', alternate_sign=False, norm=None)` returns (float32)."""
+    import scipy.sparse as sp
+
+    vocabulary = current_vocabulary()
+    rows = [term_ids(text, cache, vocabulary) for text in texts]
+    columns = vocabulary.hashed_columns(n_features)
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([r.shape[0] for r in rows], out=indptr[1:])
+    indices = columns[np.concatenate(rows)] if rows else np.zeros(0, dtype=np.int32)
+    matrix = sp.csr_matrix((np.ones(indices.shape[0], dtype=np.float32), indices, indptr),
+                           shape=(len(rows), n_features))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def tfidf_rows(counts, idf, sublinear_tf=False, copy=True):
+    """L2-normalized TF-IDF rows from raw counts and per-column IDF (sklearn's weighting).
+
+    With `copy=False` a float64 CSR `counts` is weighted in place, so the only
+    temporaries are a few arrays of one value per non-zero.
+    """
+    weighted = counts.tocsr().astype(np.float64, copy=copy)
+    data, row_lengths = weighted.data, np.diff(weighted.indptr)
+    if sublinear_tf:
+        np.log(data, out=data)
+        data += 1.0
+    data *= idf[weighted.indices]
+    norms = np.zeros(weighted.shape[0])
+    nonempty = row_lengths > 0
+    if data.shape[0]:
+        norms[nonempty] = np.add.reduceat(data * data, weighted.indptr[:-1][nonempty])
+    np.sqrt(norms, out=norms)
+    norms[norms == 0] = 1.0
+    data /= np.repeat(norms, row_lengths)
+    return weighted
+
+
+class TermTfidfVectorizer:
+    """TfidfVectorizer(stop_words='english') on cached token ids.
+
+    Fitted terms are kept as strings, so a pickled vectorizer works in any
+    process; the id -> column lookup is rebuilt on first use.
+    """
+
+    def __init__(self, sublinear_tf=False):
+        self.sublinear_tf = sublinear_tf
+        self.terms = []
+        self.idf = np.zeros(0)
+        self._lookup = None
+
+    def fit_transform(self, texts):
+        vocabulary = current_vocabulary()
+        counts, column_ids = compact_columns(count_matrix(list(texts), vocabulary=vocabulary))
+        if not column_ids.shape[0]:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+        # Columns in term order, as sklearn's, so the layout does not depend on interning order
+        terms = [vocabulary.words[i] for i in column_ids]
+        order = sorted(range(len(terms)), key=terms.__getitem__)
+        column_of = np.empty(len(order), dtype=np.int32)
+        column_of[order] = np.arange(len(order), dtype=np.int32)
+        counts.indices = column_of[counts.indices]
+        counts.has_sorted_indices = False
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        self.idf = np.log((1.0 + counts.shape[0]) / (1.0 + df)) + 1.0
+        self.terms = [terms[i] for i in order]
+        self._lookup = None
+        return tfidf_rows(counts, self.idf, self.sublinear_tf, copy=False)
+
+    def fit(self, texts):
+        self.fit_transform(texts)
+        return self
+
+    def _column_lookup(self, vocabulary):
+        """`vocabulary` id -> fitted column (-1 for unfitted words), grown with the vocabulary."""
+        lookup_vocabulary, lookup = self._lookup or (None, None)
+        if lookup_vocabulary is not vocabulary:
+            fitted_ids = vocabulary.ids(self.terms)
+            lookup = np.full(len(vocabulary), -1, dtype=np.int64)
+            lookup[fitted_ids] = np.arange(len(self.terms))
+        elif lookup.shape[0] < len(vocabulary):
+            # Words interned since are not fitted terms
+            lookup = np.concatenate([lookup, np.full(len(vocabulary) - lookup.shape[0], -1, dtype=np.int64)])
+        self._lookup = (vocabulary, lookup)
+        return lookup
+
+    def transform(self, texts):
+        import scipy.sparse as sp
+
+        vocabulary = current_vocabulary()
+        counts = count_matrix(list(texts), vocabulary=vocabulary)
+        columns = self._column_lookup(vocabulary)[counts.indices]
+        keep = columns >= 0
+        row_of = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))[keep]
+        fitted = sp.csr_matrix((counts.data[keep], (row_of, columns[keep])), shape=(counts.shape[0], len(self.terms)))
+        return tfidf_rows(fitted, self.idf, self.sublinear_tf, copy=False)
+
+    def __getstate__(self):
+        return {"sublinear_tf": self.sublinear_tf, "terms": self.terms, "idf": self.idf}
+
+    def __setstate__(self, state):
+        self.__init__(state["sublinear_tf"])
+        self.terms, self.idf = state["terms"], state["idf"]
@@ -0,0 +1,403 @@
+# Async HTTP scoring service (plain ASGI, no web framework required).
+#
+#   uvicorn service:create_app --factory --port 8000   # or: python service.py --port 8000
+#
+# Endpoints (JSON in, JSON out):
+#   POST /v1/rank   {"job_description": str,
+#                    "resumes": [{"name": str, "text": str} | {"name": str, "pdf_base64": str}],
+#                    "top_k": int?, "min_score": float?}
+#   POST /v1/match  {"resume_text": str} | {"pdf_base64": str}, "top_k": int?
+#   GET  /v1/stats  batching / backpressure / cache counters
+#   GET  /metrics   per-stage timings in the Prometheus text format
+#
+# Add "trace": true to a POST body to get that request's stage timings back
+# under "timings".
+#   GET  /healthz
+#
+# CPU-bound work never runs on the event loop: PDF parsing goes to killable
+# worker processes (`extraction.WorkerPool`: a PDF that hangs or crashes its
+# worker costs only that worker, which is replaced), tokenization and scoring
+# to a thread pool. Concurrent requests for the
+# same JD, or for the profile index, are micro-batched. All their documents
+# are tokenized in one pass and scored with one matrix product, and each
+# request still gets exactly the scores it would get on its own. Backpressure:
+# requests beyond RESUME_SERVICE_MAX_INFLIGHT get 503 + Retry-After, and
+# bodies over RESUME_SERVICE_MAX_BODY_MB get 413.
+#
+# Work handed to a thread carries the caller's context (`_run_in_executor`),
+# so its stages land on the request's trace. A micro-batch runs in the context
+# of the request that opened it. Unexpected errors are logged and answered
+# with a generic 500. Importing this module builds nothing: `create_app` is
+# the factory uvicorn calls.
+import argparse
+import asyncio
+import base64
+import binascii
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from screener import EXTRACTOR_VERSION, instrumentation
+from screener.extraction import DEFAULT_MAX_CHARS, DEFAULT_MAX_PAGES, DEFAULT_TIMEOUT, WorkerPool, cache_version
+from screener.job_profiles import PREDEFINED_JOB_PROFILES
+from screener.text_cache import content_key, get_default_cache
+
+MAX_INFLIGHT = int(os.environ.get("RESUME_SERVICE_MAX_INFLIGHT", "64"))
+MAX_BODY_BYTES = int(float(os.environ.get("RESUME_SERVICE_MAX_BODY_MB", "50")) * 1024 * 1024)
+BATCH_WINDOW_SECONDS = float(os.environ.get("RESUME_SERVICE_BATCH_WINDOW_MS", "5")) / 1000
+MAX_BATCH_SIZE = int(os.environ.get("RESUME_SERVICE_MAX_BATCH", "64"))
+PROFILE_INDEX_PATH = os.environ.get("RESUME_PROFILE_INDEX_PATH")  # optional prebuilt index on disk
+
+logger = logging.getLogger("screener.service")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+async def _run_in_executor(executor, func, *args, context=None):
+    """`loop.run_in_executor` that runs `func` in a copy of the caller's context (or in `context`)."""
+    context = context if context is not None else contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(executor, context.run, func, *args)
+
+
+class MicroBatcher:
+    """Collects concurrent submissions per key and runs them as one batch.
+
+    A batch is flushed when it reaches `max_batch` items or `window` seconds
+    after its first item arrived. `process(key, items)` runs in `executor`, in
+    the context of the submission that opened the batch, and must return one
+    result per item.
+    """
+
+    def __init__(self, process, executor, window=BATCH_WINDOW_SECONDS, max_batch=MAX_BATCH_SIZE):
+        self.process = process
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}  # key -> list of (item, future)
+        self._contexts = {}  # key -> context of the submission that opened the pending batch
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, key, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+        if len(pending) == 1:
+            self._contexts[key] = contextvars.copy_context()
+            loop.call_later(self.window, self._flush, key)
+        elif len(pending) >= self.max_batch:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key):
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return  # already flushed because it filled up
+        self.batches += 1
+        self.items += len(batch)
+        asyncio.ensure_future(self._run(key, batch, self._contexts.pop(key)))
+
+    async def _run(self, key, batch, context):
+        try:
+            results = await _run_in_executor(self.executor, self.process, key, [item for item, _ in batch],
+                                             context=context)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0}
+
+
+def _top_k(payload):
+    top_k = payload.get("top_k")
+    if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1):
+        raise HTTPError(400, "'top_k' must be a positive integer")
+    return top_k
+
+
+def _min_score(payload):
+    min_score = payload.get("min_score")
+    if min_score is not None and (isinstance(min_score, bool) or not isinstance(min_score, (int, float))
+                                  or not 0 <= min_score <= 1):  # also rejects NaN
+        raise HTTPError(400, "'min_score' must be a number between 0 and 1")
+    return min_score
+
+
+def _rank_batch(job_description, batches):
+    from screener.scoring import rank_batches
+
+    return rank_batches(job_description, batches)
+
+
+class ScoringService:
+    def __init__(self, job_profiles=PREDEFINED_JOB_PROFILES, max_inflight=MAX_INFLIGHT,
+                 pdf_workers=None, pdf_timeout=DEFAULT_TIMEOUT):
+        self.job_profiles = job_profiles
+        self.max_inflight = max_inflight
+        self.pdf_timeout = pdf_timeout
+        self.pdf_workers = pdf_workers
+        self.inflight = 0
+        self.rejected = 0
+        self.profile_index = None
+        self.thread_pool = None
+        self.pdf_pool = None
+        self.pdf_threads = None  # one per PDF worker, each waiting on its worker's answer
+        self.rank_batcher = None
+        self.match_batcher = None
+
+    # --- lifecycle ---
+    def start(self):
+        from screener.profile_index import ProfileIndex
+
+        self.thread_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="scoring")
+        self.pdf_pool = WorkerPool(self.pdf_workers, self.pdf_timeout)
+        self.pdf_threads = ThreadPoolExecutor(max_workers=self.pdf_pool.n_workers, thread_name_prefix="pdf")
+        if PROFILE_INDEX_PATH:
+            self.profile_index = ProfileIndex.load_or_build(PROFILE_INDEX_PATH, self.job_profiles)
+        else:
+            self.profile_index = ProfileIndex.build(self.job_profiles)
+        self.rank_batcher = MicroBatcher(lambda key, batches: _rank_batch(key[1], batches), self.thread_pool)
+        self.match_batcher = MicroBatcher(lambda _, items: self._match_batch(items), self.thread_pool)
+
+    def stop(self):
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self.pdf_threads is not None:
+            self.pdf_threads.shutdown(wait=False, cancel_futures=True)
+        if self.pdf_pool is not None:
+            self.pdf_pool.close()
+
+    # --- work ---
+    def _match_batch(self, items):
+        # items: list of (resume_text, top_k); one transform + one product for all of them
+        if self.profile_index.ann is not None:
+            # Large taxonomy: per-resume ANN shortlists beat one product over every profile
+            return [self.profile_index.match(text, top_k) for text, top_k in items]
+        matches = self.profile_index.match_many([text for text, _ in items])
+        return [dict(list(m.items())[:top_k]) if top_k else m for m, (_, top_k) in zip(matches, items)]
+
+    async def _extract_pdf(self, name, data):
+        """`(text, warnings)`; the text cache is checked before using the PDF workers."""
+        cache = get_default_cache()
+        key = content_key(data, cache_version(EXTRACTOR_VERSION, DEFAULT_MAX_PAGES, DEFAULT_MAX_CHARS))
+        result = await _run_in_executor(self.thread_pool, cache.get_entry, key)
+        if result is None:
+            result = await _run_in_executor(self.pdf_threads, self.pdf_pool.extract, name, data)
+            if result.error is not None:
+                return "", [{"code": "unreadable_file", "name": name,
+                             "message": f"Could not extract text from '{name}' ({result.error}). Skipping."}]
+            await _run_in_executor(self.thread_pool, cache.put, key, result.text, result.warnings, result.truncated)
+        warnings = [{"code": "page_unreadable", "name": name, "message": m} for m in result.warnings]
+        if result.truncated:
+            warnings.append({"code": "truncated", "name": name,
+                             "message": f"'{name}' exceeds the extraction budget; only its first part was used."})
+        return result.text, warnings
+
+    async def _resume_text(self, entry, position):
+        if not isinstance(entry, dict):
+            raise HTTPError(400, f"resumes[{position}] must be an object")
+        name = str(entry.get("name") or f"resume_{position + 1}")
+        if "text" in entry:
+            return name, str(entry["text"]), []
+        if "pdf_base64" in entry:
+            try:
+                data = base64.b64decode(entry["pdf_base64"], validate=True)
+            except (binascii.Error, ValueError):
+                raise HTTPError(400, f"resumes[{position}].pdf_base64 is not valid base64")
+            text, warnings = await self._extract_pdf(name, data)
+            return name, text, warnings
+        raise HTTPError(400, f"resumes[{position}] needs 'text' or 'pdf_base64'")
+
+    async def rank(self, payload):
+        from screener.scoring import top_k_indices
+
+        job_description = payload.get("job_description")
+        resumes = payload.get("resumes")
+        if not isinstance(job_description, str) or not job_description.strip():
+            raise HTTPError(400, "'job_description' must be a non-empty string")
+        if not isinstance(resumes, list) or not resumes:
+            raise HTTPError(400, "'resumes' must be a non-empty list")
+        top_k, min_score = _top_k(payload), _min_score(payload)
+
+        with instrumentation.stage("extract", n_documents=len(resumes)):
+            extracted = await asyncio.gather(*(self._resume_text(e, i) for i, e in enumerate(resumes)))
+        names, texts, warnings = [], [], []
+        for name, text, entry_warnings in extracted:
+            warnings.extend(entry_warnings)
+            if text.strip():
+                names.append(name)
+                texts.append(text)
+            elif not entry_warnings:
+                warnings.append({"code": "empty_text", "name": name,
+                                 "message": f"Could not extract text from '{name}' or it's empty. Skipping."})
+        if not texts:
+            return {"results": [], "n_scored": 0, "warnings": warnings}
+
+        # Requests for the same JD share a batch; the JD text rides along in the key
+        jd_key = (hashlib.sha256(job_description.encode("utf-8")).hexdigest(), job_description)
+        # Includes the batching window and time queued behind other batches
+        with instrumentation.stage("score_batched", n_documents=len(texts)):
+            scores = await self.rank_batcher.submit(jd_key, texts)
+        selected = top_k_indices(scores, top_k, min_score)
+        results = [{"rank": rank, "name": names[i], "score": float(scores[i])}
+                   for rank, i in enumerate(selected, 1)]
+        return {"results": results, "n_scored": len(texts), "warnings": warnings}
+
+    async def match(self, payload):
+        warnings = []
+        top_k = _top_k(payload)
+        if isinstance(payload.get("resume_text"), str):
+            text = payload["resume_text"]
+        elif "pdf_base64" in payload:
+            _, text, warnings = await self._resume_text(payload, 0)
+        else:
+            raise HTTPError(400, "Provide 'resume_text' or 'pdf_base64'")
+        if not text.strip():
+            return {"matches": [], "warnings": warnings or [{"code": "empty_text", "name": None,
+                                                             "message": "The resume has no extractable text."}]}
+        with instrumentation.stage("match_batched"):
+            matches = await self.match_batcher.submit("profiles", (text, top_k))
+        return {"matches": [{"profile": p, "score": float(s)} for p, s in matches.items()], "warnings": warnings}
+
+    def stats(self):
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "rejected": self.rejected,
+            "rank_batching": self.rank_batcher.stats() if self.rank_batcher else None,
+            "match_batching": self.match_batcher.stats() if self.match_batcher else None,
+            "text_cache": get_default_cache().stats(),
+            "pdf_workers": self.pdf_pool.stats() if self.pdf_pool else None,
+            "profiles": len(self.job_profiles),
+        }
+
+
+# --- ASGI plumbing ---
+async def _send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_json(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, f"request body exceeds {MAX_BODY_BYTES} bytes")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    try:
+        payload = json.loads(b"".join(chunks) or b"{}")
+    except ValueError:
+        raise HTTPError(400, "request body is not valid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPError(400, "request body must be a JSON object")
+    return payload
+
+
+def create_app(service=None):
+    """Build the ASGI application around a `ScoringService`.
+
+    Registers a Prometheus sink for /metrics, removed again at lifespan shutdown.
+    """
+    service = service or ScoringService()
+    routes = {("POST", "/v1/rank"): service.rank, ("POST", "/v1/match"): service.match}
+    metrics = instrumentation.add_sink(instrumentation.PrometheusSink())
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    service.start()
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    service.stop()
+                    instrumentation.remove_sink(metrics)
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"]
+        if (method, path) == ("GET", "/healthz"):
+            return await _send_json(send, 200, {"status": "ok"})
+        if (method, path) == ("GET", "/metrics"):
+            body = metrics.render().encode("utf-8")
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/plain; version=0.0.4")]})
+            return await send({"type": "http.response.body", "body": body})
+        if (method, path) == ("GET", "/v1/stats"):
+            return await _send_json(send, 200, service.stats())
+        handler = routes.get((method, path))
+        if handler is None:
+            return await _send_json(send, 404, {"error": f"no route for {method} {path}"})
+
+        if service.inflight >= service.max_inflight:
+            service.rejected += 1
+            return await _send_json(send, 503, {"error": "server busy, retry later"}, [(b"retry-after", b"1")])
+        service.inflight += 1
+        try:
+            payload = await _read_json(receive)
+            with instrumentation.trace("service" + path.replace("/v1/", "_")) as request_trace:
+                response = await handler(payload)
+            if payload.get("trace"):
+                response["timings"] = {"seconds": request_trace.seconds, "stages": request_trace.stages}
+            await _send_json(send, 200, response)
+        except HTTPError as e:
+            await _send_json(send, e.status, {"error": e.message}, e.headers)
+        except Exception:
+            logger.exception("%s %s failed", method, path)
+            await _send_json(send, 500, {"error": "internal server error"})
+        finally:
+            service.inflight -= 1
+
+    app.service = service
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the resume scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is required to run the service: pip install uvicorn", file=sys.stderr)
+        return 1
+    uvicorn.run("service:create_app", factory=True, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
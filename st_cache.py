@@ -0,0 +1,170 @@
+# Streamlit caching layer for the ranking apps.
+#
+# Streamlit reruns the whole script on every widget interaction, so without
+# this every keystroke in the JD box or tab switch would re-read uploads and
+# throw away the last ranking. What is kept, and where:
+#   - fitted profile indexes: st.cache_resource (shared by all sessions)
+#   - extraction results: per-session LRU keyed by the upload's content hash.
+#     Entries hold the warnings only; the text is read back from the
+#     process-wide text cache, so sessions do not each pin their uploads' texts
+#   - incremental corpora and last results: per-session LRU keyed by input hashes
+# Every session cache is bounded (MAX_SESSION_ENTRIES) and expires after
+# CACHE_TTL_SECONDS, so long-lived sessions cannot grow without limit.
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from screener import EXTRACTOR_VERSION, extract_texts, rank_resumes
+from screener.core import DEFAULT_ENGINE
+from screener.incremental import CandidateCorpus
+from screener.extraction import DEFAULT_MAX_CHARS, DEFAULT_MAX_PAGES, cache_version
+from screener.profile_index import ProfileIndex, profiles_fingerprint
+from screener.text_cache import digest_key, get_default_cache, read_file_bytes
+
+CACHE_TTL_SECONDS = 60 * 60
+MAX_SESSION_ENTRIES = 8
+MAX_SESSION_TEXTS = 2000
+
+
+def _session_lru(name):
+    return st.session_state.setdefault(f"_st_cache_{name}", OrderedDict())
+
+
+def session_get(name, key, ttl=CACHE_TTL_SECONDS):
+    """Value stored under `key` in the named session cache, or None."""
+    entries = _session_lru(name)
+    entry = entries.get(key)
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.monotonic() - stored_at > ttl:
+        del entries[key]
+        return None
+    entries.move_to_end(key)
+    return value
+
+
+def session_put(name, key, value, max_entries=MAX_SESSION_ENTRIES):
+    entries = _session_lru(name)
+    entries[key] = (time.monotonic(), value)
+    entries.move_to_end(key)
+    while len(entries) > max_entries:
+        entries.popitem(last=False)
+
+
+def inputs_key(*parts):
+    """Short hash of arbitrary (str / bytes / nested list) inputs."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            digest.update(inputs_key(*part).encode())
+        else:
+            digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(uploaded_file):
+    """Content hash of an upload, computed once per uploaded file per session."""
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is not None:
+        digest = session_get("digests", file_id)
+        if digest is not None:
+            return digest
+    digest = hashlib.sha256(read_file_bytes(uploaded_file)).hexdigest()
+    if file_id is not None:
+        session_put("digests", file_id, digest, max_entries=MAX_SESSION_TEXTS)
+    return digest
+
+
+@st.cache_resource(show_spinner=False)
+def _profile_index(fingerprint, engine, _job_profiles_dict):
+    return ProfileIndex.build(_job_profiles_dict, engine)
+
+
+def cached_profile_index(job_profiles_dict, engine="tfidf"):
+    """Fitted profile index, shared across sessions and refitted only when profiles change."""
+    return _profile_index(profiles_fingerprint(job_profiles_dict), engine, job_profiles_dict)
+
+
+def extract_uploads(uploaded_files, progress_bar=None):
+    """Extraction results for the uploads, in upload order.
+
+    Files seen earlier in this session are rebuilt from their session entry
+    (warnings) and the text cache; only the rest go to the parallel extractor
+    (which has its own on-disk cache).
+    """
+    cache_name = f"texts_{EXTRACTOR_VERSION}"
+    text_cache = get_default_cache()
+    version = cache_version(EXTRACTOR_VERSION, DEFAULT_MAX_PAGES, DEFAULT_MAX_CHARS)
+    digests = [file_digest(f) for f in uploaded_files]
+    results = []
+    for digest in digests:
+        result = session_get(cache_name, digest)
+        text = text_cache.get(digest_key(digest, version)) if result is not None else None
+        results.append(None if text is None else result._replace(text=text))
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    def on_progress(done, total):
+        if progress_bar is not None:
+            progress_bar.progress(done / total, text=f"Extracted {done}/{total} resumes")
+
+    if missing:
+        fresh = extract_texts([uploaded_files[i] for i in missing], progress=on_progress)
+        for i, result in zip(missing, fresh):
+            result = result._replace(index=i)
+            results[i] = result
+            if result.error is None:
+                session_put(cache_name, digests[i], result._replace(text=None), max_entries=MAX_SESSION_TEXTS)
+    # Cached entries may carry the index/name from an earlier upload of the same bytes
+    return [r._replace(index=i, name=f.name) for i, (r, f) in enumerate(zip(results, uploaded_files))]
+
+
+def rank_incremental(scope, job_description, resumes_text_list, engine=None):
+    """Scores aligned with `resumes_text_list`, reusing this session's corpus for the JD.
+
+    Resumes already tokenized for the same JD are not processed again; the
+    scores are identical to a full TF-IDF refit. Only the "tfidf" engine
+    keeps a corpus: with `engine` (default RESUME_SCORING_ENGINE) "hashing"
+    or "embedding" the call goes to `rank_resumes` with that engine. The
+    embedding cache already skips texts embedded before.
+    """
+    engine = DEFAULT_ENGINE if engine is None else engine
+    if engine != "tfidf":
+        return rank_resumes(job_description, resumes_text_list, engine=engine)
+    jd_key = inputs_key(scope, job_description)
+    corpus = session_get("corpora", jd_key)
+    if corpus is None:
+        corpus = CandidateCorpus(job_description)
+        session_put("corpora", jd_key, corpus)
+
+    # Duplicate texts get distinct ids so document frequencies match a refit
+    doc_ids, seen = [], {}
+    for text in resumes_text_list:
+        text_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        seen[text_hash] = seen.get(text_hash, 0) + 1
+        doc_ids.append(f"{text_hash}:{seen[text_hash]}")
+    corpus.sync(dict(zip(doc_ids, resumes_text_list)))
+
+    ids, scores = corpus.scores()
+    position = {doc_id: i for i, doc_id in enumerate(ids)}
+    return np.array([scores[position[doc_id]] for doc_id in doc_ids])
+
+
+def remember_result(scope, key, value):
+    session_put(f"results_{scope}", key, value)
+
+
+def recall_result(scope, key):
+    return session_get(f"results_{scope}", key)
+
+
+def remember_trace(scope, key, trace):
+    session_put(f"traces_{scope}", key, trace)
+
+
+def recall_trace(scope, key):
+    return session_get(f"traces_{scope}", key)
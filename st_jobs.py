@@ -0,0 +1,106 @@
+# Background screening jobs in the Streamlit apps (see screener/jobs.py).
+#
+# The id of the job a page is following is kept in its query string
+# (?job=...), so a rerun or a browser refresh re-attaches to the job instead of
+# starting over. While the job runs, a fragment polls its row every
+# POLL_SECONDS and shows the progress and the provisional top-K; when it
+# finishes the whole script reruns and the result is shown like a
+# synchronous one.
+import os
+from collections import namedtuple
+
+import pandas as pd
+import streamlit as st
+
+from screener.jobs import ACTIVE_STATES, JobQueue, ensure_workers
+from st_cache import session_get, session_put
+
+# Batches at least this large always run as a background job
+BACKGROUND_MIN_FILES = int(os.environ.get("RESUME_BACKGROUND_MIN_FILES", "200"))
+POLL_SECONDS = 2.0
+
+# A finished job: its `RankingResult` / `MatrixRankingResult` and the worker's trace
+FinishedJob = namedtuple("FinishedJob", ["job_id", "ranking", "trace", "params"])
+
+
+@st.cache_resource(show_spinner=False)
+def job_queue():
+    return JobQueue()
+
+
+def run_in_background(n_files, key):
+    """The "run in the background" checkbox; batches of BACKGROUND_MIN_FILES or more always are."""
+    if n_files >= BACKGROUND_MIN_FILES:
+        st.caption(f"⏳ {n_files} resumes: ranking runs as a background job, so a refresh does not lose it.")
+        return True
+    return st.checkbox("Run as a background job (survives a browser refresh)", value=False, key=key)
+
+
+def submit_job(uploaded_files, query_key="job", **params):
+    """Queue a job over the uploads (see `JobQueue.submit`), make sure a worker runs it, and follow it."""
+    job_id = job_queue().submit(uploaded_files, **params)
+    ensure_workers(job_queue().path)
+    st.query_params[query_key] = job_id
+    return job_id
+
+
+def forget_job(query_key="job"):
+    """Stop following the job in the query string (the job itself keeps running)."""
+    if query_key in st.query_params:
+        del st.query_params[query_key]
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _job_progress(job_id, query_key):
+    queue = job_queue()
+    status = queue.status(job_id)
+    if status is None or status.status not in ACTIVE_STATES:
+        st.rerun()  # the full run shows the result (or the error)
+    if queue.live_workers() == 0:
+        ensure_workers(queue.path)  # the worker died with the job unfinished; another one resumes it
+
+    st.progress(status.files_done / max(status.n_files, 1),
+                text=f"Background job {job_id[:8]} {status.status}: "
+                     f"{status.files_done}/{status.n_files} resumes extracted")
+    if status.partial:
+        multi = any(role is not None for _, _, role in status.partial)
+        columns = {"Resume File Name": [name for name, _, _ in status.partial],
+                   "Match Score (%)": [f"{score * 100:.2f}%" for _, score, _ in status.partial]}
+        if multi:
+            columns["Best role"] = [role for _, _, role in status.partial]
+        st.dataframe(pd.DataFrame(columns), hide_index=True, width="stretch")
+        st.caption(f"Provisional top {len(status.partial)} of the resumes extracted so far; "
+                   "scores change as the rest arrive.")
+    if st.button("✖️ Cancel job", key=f"{query_key}_cancel"):
+        queue.cancel(job_id)
+        st.rerun()
+
+
+def job_panel(query_key="job"):
+    """Progress of the job in the query string; returns a `FinishedJob` once it is done, else None."""
+    job_id = st.query_params.get(query_key)
+    if not job_id:
+        return None
+    queue = job_queue()
+    status = queue.status(job_id)
+    if status is None:  # purged, or a stale link
+        forget_job(query_key)
+        return None
+
+    if status.status in ACTIVE_STATES:
+        _job_progress(job_id, query_key)
+        return None
+    if status.status != "done":
+        st.error(f"🚨 Background job {job_id[:8]} {status.status}" + (f": {status.error}" if status.error else "."))
+        if st.button("Dismiss", key=f"{query_key}_dismiss"):
+            forget_job(query_key)
+            st.rerun()
+        return None
+
+    finished = session_get("jobs", job_id)
+    if finished is None:
+        ranking, trace = queue.result(job_id)
+        finished = FinishedJob(job_id, ranking, trace, queue.params(job_id))
+        session_put("jobs", job_id, finished)
+    st.caption(f"Results of background job {job_id[:8]} ({status.n_files} uploads).")
+    return finished
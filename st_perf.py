@@ -0,0 +1,48 @@
+# Collapsible "Performance" panel for the Streamlit apps.
+#
+# The apps wrap the work behind a button in `instrumentation.trace(...)` and
+# keep the finished trace next to the result (st_cache.remember_trace).
+# Rendering is traced on every rerun. The panel shows where the time went,
+# stage by stage, and the cProfile / tracemalloc top entries when the run was
+# profiled.
+import pandas as pd
+import streamlit as st
+
+from screener import instrumentation
+
+
+def stage_table(traces):
+    rows = []
+    for t in traces:
+        if t is None:
+            continue
+        total = t.seconds or 0.0
+        for s in t.stages:
+            counts = {k: v for k, v in s.items() if k not in ("stage", "seconds", "rss_delta_bytes")}
+            rows.append({
+                "Run": t.name,
+                "Stage": s["stage"],
+                "Time (ms)": round(s["seconds"] * 1000, 2),
+                "Share of run": f"{s['seconds'] / total * 100:.1f}%" if total else "",
+                "RSS Δ (MB)": round(s["rss_delta_bytes"] / (1024 * 1024), 2),
+                "Counts": ", ".join(f"{k}={v}" for k, v in counts.items()),
+            })
+        rows.append({"Run": t.name, "Stage": "(total)", "Time (ms)": round(total * 1000, 2),
+                     "Share of run": "100.0%", "RSS Δ (MB)": None, "Counts": ""})
+    return pd.DataFrame(rows)
+
+
+def performance_panel(*traces):
+    """Stage breakdown of the given traces inside a collapsed expander."""
+    traces = [t for t in traces if t is not None]
+    if not traces:
+        return
+    with st.expander("⏱️ Performance", expanded=False):
+        st.dataframe(stage_table(traces), hide_index=True)
+        for t in traces:
+            if t.profile_text:
+                st.markdown(f"**cProfile — {t.name}** (top {instrumentation.PROFILE_TOP_N} by cumulative time)")
+                st.code(t.profile_text, language="text")
+            if t.memory_top:
+                st.markdown(f"**tracemalloc — {t.name}** (largest live allocations at the end of the run)")
+                st.dataframe(pd.DataFrame(t.memory_top), hide_index=True)
@@ -0,0 +1,131 @@
+# Paginated results view for the Streamlit apps.
+#
+# The full ranking stays on the server as a `screener.results.RankedResults`,
+# kept in the session cache next to the result it came from. Each rerun
+# formats one page of the selection (top K, minimum score, score band) and
+# sends it to st.dataframe (a virtualized grid), so the payload is the same
+# for 50 or 50,000 candidates. Downloads hold the whole band and are
+# generated only when a button is clicked, in chunks. The exports are spooled
+# temporary files, which st.download_button does not take, so `export_bytes`
+# hands it their bytes; Streamlit keeps a download in memory, so it refuses
+# exports over EXPORT_MAX_BYTES and the view offers none over EXPORT_MAX_ROWS.
+import importlib.util
+
+import pandas as pd
+import streamlit as st
+
+from screener.results import SCORE_BANDS, SORT_ORDERS, RankedResults
+from st_cache import session_get, session_put
+
+PAGE_SIZES = (25, 50, 100, 250, 1000)
+# Downloads are held in memory by the Streamlit server; larger sets go through batch_rank.py
+EXPORT_MAX_ROWS = 1_000_000
+EXPORT_MAX_BYTES = 200 * 2 ** 20
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def ranked_results(results_key, names, scores):
+    """`RankedResults` for a ranking, built once per session and reused across reruns."""
+    results = session_get("results_views", results_key)
+    if results is None:
+        results = RankedResults(names, scores)
+        session_put("results_views", results_key, results)
+    return results
+
+
+def export_bytes(make_export, max_bytes=EXPORT_MAX_BYTES):
+    """Download-button `data`: a callable returning the bytes of the export `make_export()` writes.
+
+    Streamlit serves a download from memory, so an export over `max_bytes`
+    raises ValueError after reading at most `max_bytes + 1` bytes of it.
+    """
+    def data():
+        with make_export() as output:
+            payload = output.read(max_bytes + 1)
+        if len(payload) > max_bytes:
+            raise ValueError(f"The export is larger than {max_bytes // 2 ** 20} MB; "
+                             "narrow the selection or rank the batch with batch_rank.py")
+        return payload
+    return data
+
+
+def _reset_page(page_key):
+    st.session_state[page_key] = 1
+
+
+def results_view(results, key, name_header="Resume File Name", score_header="Match Score (%)",
+                 file_stem="ranked_resumes", details=None):
+    """Top-K and minimum-score inputs, band filter, sort order, one page of rows and the export buttons.
+
+    `details(rows)`, when given, returns extra {column: values} for the rows
+    on the page only (`rows` are indices into `results.names`).
+    """
+    page_key = f"{key}_page"
+    col_top_k, col_min_score = st.columns(2)
+    top_k = col_top_k.number_input("Show top K candidates (0 = all)", min_value=0, value=0, step=10,
+                                   key=f"{key}_top_k", on_change=_reset_page, args=(page_key,))
+    min_score_percent = col_min_score.slider("Minimum score to show (%)", min_value=0, max_value=100, value=0,
+                                             key=f"{key}_min_score", on_change=_reset_page, args=(page_key,))
+    top_k = int(top_k) or None
+    min_score = min_score_percent / 100 if min_score_percent else None
+
+    counts = results.band_counts(min_score)
+    col_band, col_sort, col_size = st.columns(3)
+    band = col_band.selectbox("Score band", [b for b, _, _ in SCORE_BANDS], key=f"{key}_band",
+                              format_func=lambda b: f"{b} ({counts[b]})", on_change=_reset_page, args=(page_key,))
+    sort = col_sort.selectbox("Sort by", SORT_ORDERS, key=f"{key}_sort", on_change=_reset_page, args=(page_key,))
+    page_size = col_size.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size",
+                                   on_change=_reset_page, args=(page_key,))
+
+    n_selected = counts[band] if top_k is None else min(counts[band], top_k)
+    n_pages = max(1, -(-n_selected // page_size))
+    if st.session_state.get(page_key, 1) > n_pages:  # a new ranking with fewer rows
+        st.session_state[page_key] = 1
+    page_number = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    page = results.page(int(page_number), page_size, band, sort, top_k, min_score)
+    columns = {"Rank": page.ranks, name_header: page.names, score_header: page.scores}
+    if details is not None:
+        columns.update(details(page.rows))
+    st.dataframe(pd.DataFrame(columns), hide_index=True, width="stretch")
+    first = (page.page - 1) * page_size + 1 if page.n_selected else 0
+    st.caption(f"Showing {first}–{first + len(page.names) - 1 if page.names else 0} of {page.n_selected} "
+               f"selected ({len(results)} ranked).")
+
+    # Downloads hold the whole band, not just the top K shown
+    n_export = results.band_counts()[band]
+    if n_export > EXPORT_MAX_ROWS:
+        st.caption(f"{n_export} rows are too many to download here; rank the batch with batch_rank.py instead.")
+        return
+    export_args = dict(band=band, sort=sort, name_header=name_header, score_header=score_header)
+    col_csv, col_parquet = st.columns(2)
+    col_csv.download_button(
+        f"⬇️ Download {n_export} rows (CSV)",
+        data=export_bytes(lambda: results.export("csv", **export_args)),
+        file_name=f"{file_stem}.csv",
+        mime="text/csv",
+        key=f"{key}_download_csv",
+        on_click="ignore",
+    )
+    if _HAS_PYARROW:
+        col_parquet.download_button(
+            f"⬇️ Download {n_export} rows (Parquet)",
+            data=export_bytes(lambda: results.export("parquet", **export_args)),
+            file_name=f"{file_stem}.parquet",
+            mime="application/vnd.apache.parquet",
+            key=f"{key}_download_parquet",
+            on_click="ignore",
+        )
+
+
+def duplicates_panel(duplicates):
+    """Collapsed expander listing the uploads that were merged into another resume before ranking."""
+    if not duplicates:
+        return
+    with st.expander(f"🧬 {len(duplicates)} duplicate upload(s) collapsed before ranking", expanded=False):
+        st.dataframe(pd.DataFrame({
+            "Upload": [d.name for d in duplicates],
+            "Ranked as": [d.kept for d in duplicates],
+            "Kind": [d.kind for d in duplicates],
+            "Similarity": [f"{d.similarity * 100:.0f}%" for d in duplicates],
+        }), hide_index=True, width="stretch")
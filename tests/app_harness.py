@@ -0,0 +1,40 @@
+# Runs one of the Streamlit apps (APP=app3.py) under AppTest with synthetic
+# PDF uploads. Download buttons are recorded in session_state["downloads"]
+# (key -> data) instead of being drawn, so tests can call their callables.
+import io
+import os
+import runpy
+
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+
+from benchmarks.synthetic import generate_resumes, make_pdf
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Upload(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = self.file_id = name
+        self.size = len(data)
+
+
+UPLOADS = [Upload(make_pdf(r.text), f"{r.doc_id}.pdf") for r in generate_resumes(int(os.environ.get("NFILES", "12")), 60)]
+
+
+def file_uploader(label, *args, accept_multiple_files=False, key=None, **kwargs):
+    if key == "jd_files_ranker":
+        return []
+    return UPLOADS if accept_multiple_files else UPLOADS[0]
+
+
+def download_button(*args, key=None, data=None, **kwargs):
+    st.session_state.setdefault("downloads", {})[key] = data
+    return False
+
+
+st.file_uploader = file_uploader
+st.download_button = download_button
+DeltaGenerator.download_button = lambda self, *args, **kwargs: download_button(*args, **kwargs)
+runpy.run_path(os.path.join(_ROOT, os.environ["APP"]), run_name="__main__")
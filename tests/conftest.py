@@ -0,0 +1,14 @@
+# Shared test setup: every on-disk cache and store points into one temporary
+# directory, set before `screener` is imported (the paths are read at import
+# time), so the tests never touch or depend on the developer's .cache/.
+import os
+import sys
+import tempfile
+
+_CACHE_DIR = tempfile.mkdtemp(prefix="screener-tests-")
+for _name, _file in (("RESUME_TEXT_CACHE", "text_cache.sqlite"), ("RESUME_EMBEDDING_CACHE", "embeddings.sqlite"),
+                     ("RESUME_LSA_MODEL", "lsa_model.pkl"), ("RESUME_JOBS_DB", "jobs.sqlite")):
+    os.environ[_name] = os.path.join(_CACHE_DIR, _file)
+os.environ["RESUME_EMBEDDING_MODEL"] = os.path.join(_CACHE_DIR, "no-model")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes
+from screener import feature_store
+from screener.feature_store import FeatureStore
+from screener.scoring import top_k_indices
+
+N_FEATURES = 2 ** 18
+JDS = [jd.text for jd in generate_job_descriptions(seed=8)]
+
+
+@pytest.fixture(scope="module")
+def pool(tmp_path_factory):
+    texts = [r.text for r in generate_resumes(3000, doc_words=120, seed=7)]
+    store = FeatureStore.create(str(tmp_path_factory.mktemp("pool")), N_FEATURES)
+    store.append([str(i) for i in range(len(texts))], texts)
+    store.build_ann(n_lists=32, n_probe=8, shortlist=100)
+    return store
+
+
+def test_recall_against_exact_scoring(pool):
+    recalls = []
+    for jd in JDS:
+        exact = pool.score(jd)
+        rows, scores = pool.search(jd, 10)
+        recalls.append(len(set(rows.tolist()) & set(top_k_indices(exact, 10).tolist())) / 10)
+        np.testing.assert_allclose(scores, exact[rows], atol=1e-5)  # the shortlist is re-scored exactly
+        assert np.all(np.diff(scores) <= 0)
+    assert np.mean(recalls) >= 0.9
+
+
+def test_stale_index_is_rebuilt(tmp_path, monkeypatch):
+    texts = [r.text for r in generate_resumes(200, doc_words=80, seed=3)]
+    store = FeatureStore.create(str(tmp_path), N_FEATURES)
+    assert store.ann_is_stale()  # never built
+    store.append([f"r{i}" for i in range(180)], texts[:180])
+    store.build_ann(n_lists=4)
+    assert not store.ann_is_stale()
+
+    # A small tail stays searchable without a rebuild
+    store.append(["r180", "jd-copy"], [texts[180], JDS[0]])
+    assert not store.ann_is_stale()
+    rows, _ = store.search(JDS[0], 3)
+    assert store.ids[rows[0]] == "jd-copy"
+
+    store.append([f"r{i}" for i in range(181, 200)], texts[181:])
+    assert store.ann_is_stale()  # more than ANN_STALE_FRACTION unindexed
+    store.build_ann(n_lists=4)
+    reopened = FeatureStore(str(tmp_path))
+    assert not reopened.ann_is_stale() and reopened.ann().n_rows == len(reopened) == 201
+
+    monkeypatch.setattr(feature_store, "ANN_STALE_FRACTION", 0.0)
+    reopened.append(["late"], ["one more resume"])
+    assert reopened.ann_is_stale()
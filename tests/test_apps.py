@@ -0,0 +1,33 @@
+import csv
+import io
+import os
+
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+from streamlit.testing.v1 import AppTest
+
+HARNESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_harness.py")
+
+
+@pytest.fixture
+def app3(monkeypatch):
+    monkeypatch.setenv("APP", "app3.py")
+    return AppTest.from_file(HARNESS, default_timeout=120).run()
+
+
+def _download(at, key):
+    data, _ = convert_data_to_bytes_and_infer_mime(at.session_state["downloads"][key](), TypeError("unsupported"))
+    return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+def test_app3_matrix_ranking_and_download(app3):
+    at = app3
+    at.radio(key="jd_mode_ranker").set_value("Several job descriptions (matrix)").run()
+    at.text_area(key="jds_ranker").input("Backend\npython django sql docker\n---\nDesigner\nfigma wireframes usability").run()
+    at.button(key="rank_resumes_button").click().run()
+    assert not at.exception
+
+    rows = _download(at, "matrix_download_csv")
+    assert rows[0] == ["Resume File Name", "Backend", "Designer"]
+    assert len(rows) == 13
+    assert _download(at, "matrix_role_results_download_csv")[0][:2] == ["Rank", "Resume File Name"]
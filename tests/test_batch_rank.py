@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+import batch_rank
+
+RESUMES = {"a.txt": "python django developer with postgresql", "a_copy.txt": "Python  Django developer with PostgreSQL",
+           "b.txt": "registered nurse in intensive care"}
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    for name, text in RESUMES.items():
+        (resumes / name).write_text(text, encoding="utf-8")
+    jd = tmp_path / "backend.txt"
+    jd.write_text("python django postgresql", encoding="utf-8")
+    return resumes, jd, tmp_path / "scores.csv"
+
+
+def _ranked(inputs, *flags):
+    resumes, jd, output = inputs
+    assert batch_rank.main(["--resumes", str(resumes), "--jd", str(jd), "--output", str(output), "--no-cache",
+                            "--workers", "0", *flags]) == 0
+    with open(output, newline="", encoding="utf-8") as f:
+        return [(row["jd_id"], row["rank"], row["resume"]) for row in csv.DictReader(f)]
+
+
+def test_duplicates_are_collapsed_by_default(inputs):
+    assert _ranked(inputs) == [("backend", "1", "a.txt"), ("backend", "2", "b.txt")]
+
+
+def test_no_dedup_keeps_every_file(inputs):
+    assert [resume for _, _, resume in _ranked(inputs, "--no-dedup")] == ["a.txt", "a_copy.txt", "b.txt"]
+
+
+def _pool_run(inputs, pool, *flags):
+    resumes, jd, output = inputs
+    assert batch_rank.main(["--pool", str(pool), "--resumes", str(resumes), "--jd", str(jd), "--output",
+                            str(output), "--no-cache", "--workers", "0", *flags]) == 0
+    with open(output, newline="", encoding="utf-8") as f:
+        return sorted(row["resume"] for row in csv.DictReader(f))
+
+
+def test_pool_membership_is_by_content(inputs, tmp_path, capsys):
+    resumes, _, _ = inputs
+    pool = tmp_path / "pool"
+    assert _pool_run(inputs, pool) == ["a.txt", "b.txt"]
+    assert _pool_run(inputs, pool) == ["a.txt", "b.txt"]  # nothing new
+
+    (resumes / "a_renamed.txt").write_text("PYTHON django developer, with postgresql", encoding="utf-8")
+    (resumes / "b.txt").write_text("registered nurse and midwife", encoding="utf-8")
+    capsys.readouterr()
+    assert _pool_run(inputs, pool) == ["a.txt", "b.txt"]
+    err = capsys.readouterr().err
+    assert "'a_renamed.txt' is already in the pool as 'a.txt'" in err
+    assert "'b.txt' is already in the pool with different content" in err
+
+
+def test_pool_without_dedup_adds_renamed_copies(inputs, tmp_path):
+    pool = tmp_path / "pool"
+    assert _pool_run(inputs, pool, "--no-dedup") == ["a.txt", "a_copy.txt", "b.txt"]
+    assert _pool_run(inputs, pool, "--no-dedup") == ["a.txt", "a_copy.txt", "b.txt"]
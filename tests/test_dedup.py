@@ -0,0 +1,56 @@
+import numpy as np
+
+from benchmarks.synthetic import generate_resumes
+from screener import deduplicate_resumes, screen_resumes
+from screener.dedup import duplicate_report, find_duplicates
+from screener.extraction import ExtractionResult
+
+TEXTS = [r.text for r in generate_resumes(40, doc_words=300, seed=7)]
+
+
+def _edited(text, n_words):
+    """`text` with its last `n_words` words replaced."""
+    words = text.split()
+    return " ".join(words[:-n_words] + ["edited"] * n_words)
+
+
+def test_exact_copies_ignore_case_and_spacing():
+    texts = [TEXTS[0], TEXTS[1], "  " + TEXTS[0].upper().replace(" ", "\n"), TEXTS[0]]
+    deduplication = find_duplicates(texts)
+    assert deduplication.keep.tolist() == [0, 1]
+    assert deduplication.duplicate_of.tolist() == [-1, -1, 0, 0]
+    assert deduplication.exact.tolist() == [False, False, True, True]
+
+
+def test_near_duplicates_are_collapsed_and_distinct_resumes_kept():
+    texts = TEXTS + [_edited(TEXTS[3], 2), _edited(TEXTS[3], 150)]
+    deduplication = find_duplicates(texts)
+    assert deduplication.keep.tolist() == list(range(len(TEXTS))) + [len(TEXTS) + 1]
+    assert deduplication.duplicate_of[len(TEXTS)] == 3
+    assert not deduplication.exact[len(TEXTS)] and 0.85 <= deduplication.similarity[len(TEXTS)] < 1
+
+
+def test_exact_copy_of_a_near_duplicate_follows_its_group():
+    near = _edited(TEXTS[0], 2)
+    deduplication = find_duplicates([TEXTS[0], near, near])
+    assert deduplication.duplicate_of.tolist() == [-1, 0, 0]
+
+
+def test_texts_without_words_only_match_exactly():
+    deduplication = find_duplicates(["", "python", "!!", "java", TEXTS[0]])
+    assert deduplication.duplicate_of.tolist() == [-1, -1, 0, -1, -1]
+    assert deduplication.exact[2]
+
+
+def test_report_and_screening():
+    names = ["a.pdf", "b.pdf", "a_again.pdf"]
+    texts = [TEXTS[0], TEXTS[1], _edited(TEXTS[0], 1)]
+    report = duplicate_report(names, find_duplicates(texts))
+    assert [(d.name, d.kept, d.kind) for d in report] == [("a_again.pdf", "a.pdf", "near")]
+    assert deduplicate_resumes(names, texts)[:2] == (names[:2], texts[:2])
+
+    results = [ExtractionResult(i, name, text, [], None) for i, (name, text) in enumerate(zip(names, texts))]
+    ranking = screen_resumes("python developer", results, dedup=True)
+    assert ranking.names == names[:2] and ranking.scores.shape == (2,)
+    assert [d.name for d in ranking.duplicates] == ["a_again.pdf"]
+    assert np.all(np.isfinite(ranking.scores))
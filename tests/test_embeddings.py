@@ -0,0 +1,73 @@
+import functools
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_resumes
+from screener import embeddings, match_resume_to_profiles, rank_resumes, rank_resumes_matrix
+from screener import screen_resumes, screen_resumes_matrix
+from screener.extraction import ExtractionResult
+
+JD = "python django postgresql docker"
+
+
+def test_auto_fit_is_not_persisted():
+    texts = [r.text for r in generate_resumes(250, doc_words=60, seed=3)]
+    scores = embeddings.rank_documents_embedded(JD, texts)
+    assert scores.shape == (250,) and np.all(scores >= 0)
+    assert not os.path.exists(embeddings.DEFAULT_LSA_PATH)
+    assert embeddings._default_embedder is None
+
+
+def test_empty_batches():
+    embedder = embeddings.get_embedder([JD, "java spring developer"], min_documents=1)
+    assert embedder.embed([]).shape == (0, embedder.encoder.dim)
+    assert embeddings.rank_documents_embedded(JD, []).shape == (0,)
+    assert embeddings.score_matrix_embedded([JD], []).shape == (1, 0)
+
+
+def test_fit_command_saves_a_reusable_model(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for resume in generate_resumes(20, doc_words=60, seed=4):
+        (corpus / f"{resume.doc_id}.txt").write_text(resume.text, encoding="utf-8")
+    output = str(tmp_path / "lsa.pkl")
+    assert embeddings.main(["fit", str(corpus), "--output", output, "--components", "8"]) == 0
+
+    encoder = embeddings.load_encoder(lsa_path=output)
+    assert isinstance(encoder, embeddings.LSAEncoder) and encoder.dim == 8
+    vectors = embeddings.Embedder(encoder).embed([JD, "python django developer"])
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+
+
+@pytest.mark.parametrize("n", [1, 3])
+def test_small_batches_have_no_model(n):
+    texts = [r.text for r in generate_resumes(n, doc_words=60, seed=5)]
+    with pytest.raises(embeddings.EmbeddingUnavailable):
+        embeddings.rank_documents_embedded(JD, texts)
+    with pytest.raises(embeddings.EmbeddingUnavailable):
+        rank_resumes(JD, texts, engine="embedding")
+
+
+@pytest.mark.parametrize("n", [1, 3])
+def test_small_batches_fall_back_to_tfidf(n):
+    texts = [r.text for r in generate_resumes(n, doc_words=60, seed=5)]
+    results = [ExtractionResult(i, f"r{i}.pdf", text, [], None) for i, text in enumerate(texts)]
+
+    ranking = screen_resumes(JD, results, rank=functools.partial(rank_resumes, engine="embedding"), dedup=False)
+    np.testing.assert_allclose(ranking.scores, rank_resumes(JD, texts, engine="tfidf"), rtol=1e-6)
+    assert [w.code for w in ranking.warnings] == ["embedding_unavailable"]
+
+    jds = {"backend": JD, "nursing": "registered nurse intensive care"}
+    matrix = screen_resumes_matrix(jds, results, rank=functools.partial(rank_resumes_matrix, engine="embedding"),
+                                   dedup=False)
+    np.testing.assert_allclose(matrix.scores, rank_resumes_matrix(list(jds.values()), texts, engine="tfidf"))
+    assert [w.code for w in matrix.warnings] == ["embedding_unavailable"]
+
+
+def test_small_taxonomy_falls_back_to_tfidf():
+    profiles = {"Backend": JD, "Nurse": "registered nurse intensive care"}
+    match = match_resume_to_profiles("python django developer", profiles, engine="embedding")
+    assert match.matches == match_resume_to_profiles("python django developer", profiles, engine="tfidf").matches
+    assert [w.code for w in match.warnings] == ["embedding_unavailable"]
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from benchmarks import evaluate
+
+
+def test_synthetic_smoke(tmp_path):
+    output = tmp_path / "eval.json"
+    assert evaluate.main(["--synthetic", "50", "--k", "5", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+
+    ranking = {r["engine"]: r for r in results["ranking"]}
+    assert list(ranking) == evaluate._str_list(evaluate.DEFAULT_ENGINES)
+    for record in ranking.values():
+        for key in ("precision@5", "recall@5", "f1@5", "ndcg@5", "top_k_overlap",
+                    "median_ms", "max_ms", "total_seconds", "peak_traced_bytes"):
+            assert record[key] is not None, (record["engine"], key)
+        assert record["n_candidates"] == 50
+    assert ranking["tfidf"]["top_k_overlap"] == 1.0 and ranking["tfidf"]["spearman"] == pytest.approx(1.0)
+
+    profiles = {r["engine"]: r for r in results["profiles"]}
+    assert set(profiles) == {"tfidf", "hashing"}
+    assert all("precision@1" in r and "ndcg@3" in r for r in profiles.values())
+
+
+@pytest.mark.parametrize("field", ["resumes", "job_descriptions"])
+def test_duplicate_ids_are_rejected(tmp_path, field):
+    dataset = {
+        "resumes": [{"id": "r1", "text": "python developer"}, {"id": "r2", "text": "nurse"}],
+        "job_descriptions": [{"id": "jd1", "text": "python"}, {"id": "jd2", "text": "nursing"}],
+        "judgments": [{"jd": "jd1", "resume": "r1", "grade": 1}],
+    }
+    dataset[field][1]["id"] = dataset[field][0]["id"]
+    path = tmp_path / "dataset.json"
+    path.write_text(json.dumps(dataset))
+    with pytest.raises(ValueError, match="Duplicate"):
+        evaluate.load_dataset(str(path))
+    with pytest.raises(SystemExit):
+        evaluate.main(["--dataset", str(path)])
@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks.synthetic import make_pdf
+from screener.extraction import extract_all, parse_pdf_bytes
+from screener.text_cache import TextCache
+
+# One line per page: "abcd", "efgh", "ijklmnop"
+PAGES = make_pdf("abcd\nefgh\nijklmnop", lines_per_page=1)
+
+
+@pytest.mark.parametrize("max_chars, text, truncated", [
+    (None, "abcd\nefgh\nijklmnop", False),
+    (0, "", True),
+    (3, "abc", True),
+    (4, "abcd", True),  # the first page fills the budget exactly
+    (5, "abcd", True),  # room for the separator only
+    (9, "abcd\nefgh", True),  # two pages fill it exactly
+    (10, "abcd\nefgh", True),
+    (14, "abcd\nefgh\nijkl", True),
+    (19, "abcd\nefgh\nijklmnop", False),  # exactly the whole document
+])
+def test_max_chars_budget(max_chars, text, truncated):
+    extracted, warnings, was_truncated = parse_pdf_bytes(PAGES, max_chars=max_chars)
+    assert extracted == text
+    assert len(extracted) <= (max_chars if max_chars is not None else len(extracted))
+    assert (warnings, was_truncated) == ([], truncated)
+
+
+@pytest.mark.parametrize("max_chars", [4, 5, 9, 10, 19, 20])
+def test_max_chars_budget_without_strip(max_chars):
+    extracted, _, _ = parse_pdf_bytes(PAGES, strip=False, max_chars=max_chars)
+    assert len(extracted) <= max_chars
+    assert "abcd\nefgh\nijklmnop\n".startswith(extracted)
+
+
+def test_max_pages():
+    assert parse_pdf_bytes(PAGES, max_pages=2) == ("abcd\nefgh", [], True)
+    assert parse_pdf_bytes(PAGES, max_pages=3) == ("abcd\nefgh\nijklmnop", [], False)
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_extract_all_keeps_input_order_and_reports_errors(max_workers):
+    files = [make_pdf(f"resume number {i}") for i in range(5)]
+    files.insert(2, b"not a pdf")
+    progress = []
+    results = extract_all(files, progress=lambda done, total: progress.append((done, total)), max_workers=max_workers)
+    assert [r.index for r in results] == list(range(6))
+    assert [r.text for r in results[:2]] == ["resume number 0", "resume number 1"]
+    assert results[2].error is not None and results[2].text == ""
+    assert results[5].text == "resume number 4" and results[5].error is None
+    assert progress[-1] == (6, 6)
+
+
+def test_cached_texts_skip_parsing(tmp_path):
+    cache = TextCache(str(tmp_path / "texts.sqlite"))
+    files = [make_pdf("first resume"), make_pdf("second resume"), b"not a pdf"]
+    first = extract_all(files, max_workers=0, cache=cache, extractor_version="test")
+    assert cache.stats()["disk_entries"] == 2  # failures are not cached
+
+    again = extract_all(files, max_workers=0, cache=cache, extractor_version="test")
+    assert [r.text for r in again] == [r.text for r in first]
+    assert cache.stats()["hits"] == 2
+    # Another extractor version (or budget) does not reuse them
+    extract_all(files[:1], max_workers=0, cache=cache, extractor_version="test", max_chars=5)
+    assert cache.stats()["disk_entries"] == 3
+
+
+def test_cache_hits_keep_the_truncation_flag(tmp_path):
+    cache = TextCache(str(tmp_path / "texts.sqlite"))
+    options = dict(max_workers=0, cache=cache, extractor_version="test", max_chars=6)
+    first = extract_all([PAGES], **options)[0]
+    again = extract_all([PAGES], **options)[0]
+    assert cache.stats()["hits"] == 1
+    assert (again.text, again.truncated) == (first.text, True) == ("abcd\ne", True)
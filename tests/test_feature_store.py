@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes
+from screener.dedup import content_digest
+from screener.feature_store import FeatureStore
+from screener.scoring import score_matrix
+
+TEXTS = [r.text for r in generate_resumes(50, doc_words=80, seed=11)]
+JDS = [jd.text for jd in generate_job_descriptions(3, seed=12)]
+
+
+def test_scores_match_score_matrix_across_appends_and_reopen(tmp_path):
+    store = FeatureStore.create(str(tmp_path))
+    store.append([f"r{i}" for i in range(30)], TEXTS[:30], chunk_rows=7)
+    store.append([f"r{i}" for i in range(30, 50)], TEXTS[30:])
+    assert len(store) == 50 and store.nnz > 0
+
+    reopened = FeatureStore(str(tmp_path))
+    assert (len(reopened), reopened.nnz) == (50, store.nnz)
+    for jd in JDS:  # the IDF covers the pool plus this one query
+        np.testing.assert_allclose(reopened.score(jd, chunk_rows=8), score_matrix([jd], TEXTS)[0], atol=1e-6)
+    store.close()
+    reopened.close()
+
+
+def test_ids_and_membership_persist(tmp_path):
+    store = FeatureStore.create(str(tmp_path))
+    store.append(["a.pdf", "b.pdf"], TEXTS[:2])
+    assert "a.pdf" in store and "c.pdf" not in store
+    store.append(["c.pdf"], TEXTS[2:3])
+    assert store.ids == ["a.pdf", "b.pdf", "c.pdf"] and "c.pdf" in store
+
+    reopened = FeatureStore.open_or_create(str(tmp_path))
+    assert reopened.ids == ["a.pdf", "b.pdf", "c.pdf"]
+    assert "b.pdf" in reopened and "d.pdf" not in reopened
+    with pytest.raises(FileExistsError):
+        FeatureStore.create(str(tmp_path))
+
+
+def test_uncommitted_bytes_are_ignored(tmp_path):
+    store = FeatureStore.create(str(tmp_path))
+    store.append(["a", "b"], TEXTS[:2])
+    before = store.score(JDS[0])
+    store.close()
+    for name in ("data.f32", "indices.i32", "ids.jsonl"):  # a crash mid-append leaves a tail
+        with open(os.path.join(str(tmp_path), name), "ab") as f:
+            f.write(b"\x07" * 64)
+
+    reopened = FeatureStore(str(tmp_path))
+    assert reopened.ids == ["a", "b"]
+    np.testing.assert_allclose(reopened.score(JDS[0]), before)
+    reopened.append(["c"], TEXTS[2:3])
+    assert FeatureStore(str(tmp_path)).ids == ["a", "b", "c"]
+
+
+def test_content_digests(tmp_path):
+    store = FeatureStore.create(str(tmp_path))
+    store.append(["a"], ["Python developer, Django."])
+    assert store.find_content(content_digest("python   DEVELOPER django")) == "a"
+    assert store.find_content(content_digest("java developer")) is None
+
+    # A store written before digests existed: its rows are unknown, new rows are found
+    os.remove(os.path.join(str(tmp_path), "digests.b16"))
+    legacy = FeatureStore(str(tmp_path))
+    assert legacy.find_content(content_digest("python developer django")) is None
+    legacy.append(["b"], ["Nurse"])
+    reopened = FeatureStore(str(tmp_path))
+    assert reopened.find_content(content_digest("nurse")) == "b"
+    assert reopened.find_content(content_digest("python developer django")) is None
+
+
+def test_append_counts_checks_its_shape(tmp_path):
+    import scipy.sparse as sp
+
+    store = FeatureStore.create(str(tmp_path), n_features=16)
+    with pytest.raises(ValueError):
+        store.append_counts(["a", "b"], sp.csr_matrix((1, 16)))
+    assert store.append_counts([], sp.csr_matrix((0, 16))) == 0
+    assert len(store) == 0 and not len(store.score("anything"))
@@ -0,0 +1,35 @@
+import numpy as np
+
+from screener.incremental import CandidateCorpus
+from screener.scoring import rank_documents
+
+JD = "python django postgresql docker"
+TEXTS = {f"r{i}": text for i, text in enumerate([
+    "python django developer", "java spring developer", "docker and kubernetes", "registered nurse",
+    "postgresql administrator", "python data scientist",
+])}
+
+
+def test_sync_matches_a_full_refit():
+    corpus = CandidateCorpus(JD)
+    assert corpus.sync(TEXTS) == len(TEXTS)
+
+    # Drop two resumes, replace one and add a late one: only the new texts are tokenized
+    documents = {doc_id: text for doc_id, text in TEXTS.items() if doc_id not in ("r1", "r3")}
+    documents["r2"] = TEXTS["r2"]
+    documents["late"] = "django and docker engineer"
+    assert corpus.sync(documents) == 1
+    assert len(corpus) == 5 and "r1" not in corpus and "late" in corpus
+
+    doc_ids, scores = corpus.scores()
+    assert doc_ids == ["r0", "r2", "r4", "r5", "late"]
+    np.testing.assert_allclose(scores, rank_documents(JD, [documents[d] for d in doc_ids]))
+
+
+def test_replacing_a_document_moves_it_last():
+    corpus = CandidateCorpus(JD)
+    corpus.sync(TEXTS)
+    corpus.add("r0", "docker docker docker")
+    doc_ids, scores = corpus.scores()
+    assert doc_ids[-1] == "r0"
+    np.testing.assert_allclose(scores, rank_documents(JD, [TEXTS[d] for d in doc_ids[:-1]] + ["docker docker docker"]))
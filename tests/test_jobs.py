@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from benchmarks.synthetic import make_pdf
+from screener import jobs
+
+JD = "python django postgresql docker"
+RESUMES = {"backend.pdf": "python django developer with postgresql", "nurse.pdf": "registered nurse in intensive care",
+           "devops.pdf": "docker and kubernetes engineer"}
+
+
+class Upload:
+    def __init__(self, name, text):
+        self.name, self.data = name, make_pdf(text)
+
+    def getvalue(self):
+        return self.data
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return jobs.JobQueue(str(tmp_path / "jobs.sqlite"))
+
+
+def _submit(queue, **kwargs):
+    return queue.submit([Upload(name, text) for name, text in RESUMES.items()], job_description=JD, **kwargs)
+
+
+def test_job_runs_to_a_ranking(queue):
+    job_id = _submit(queue, dedup=False)
+    worker = jobs._worker_id()
+    assert queue._claim(worker) == job_id
+    queue.run_job(worker, job_id, chunk_files=2, max_workers=0)
+
+    status = queue.status(job_id)
+    assert (status.status, status.files_done, status.n_files) == ("done", 3, 3)
+    assert status.partial[0][0] == "backend.pdf"
+    ranking, trace = queue.result(job_id)
+    assert ranking.names == list(RESUMES) and trace is not None
+
+
+def test_heartbeat_covers_a_long_final_ranking(queue, monkeypatch):
+    monkeypatch.setattr(jobs, "STALE_SECONDS", 0.5)
+    monkeypatch.setattr(jobs, "HEARTBEAT_SECONDS", 0.05)
+    screen = jobs._screen
+    reclaimed = []
+
+    def slow_screen(params, extraction_results):
+        if len(extraction_results) == len(RESUMES):  # the final ranking, not a provisional one
+            time.sleep(1.5)
+            reclaimed.append(jobs.JobQueue(queue.path)._claim("otherhost:1"))
+        return screen(params, extraction_results)
+
+    monkeypatch.setattr(jobs, "_screen", slow_screen)
+    job_id = _submit(queue)
+    worker = jobs._worker_id()
+    queue._claim(worker)
+    queue.run_job(worker, job_id, max_workers=0)
+
+    assert reclaimed == [None]
+    assert queue.status(job_id).status == "done"
+
+
+def test_cancelled_job_stops_at_its_next_chunk(queue):
+    job_id = _submit(queue)
+    worker = jobs._worker_id()
+    queue._claim(worker)
+    queue.cancel(job_id)
+    queue.run_job(worker, job_id, chunk_files=1, max_workers=0)
+    assert queue.status(job_id).status == "cancelled" and queue.result(job_id) is None
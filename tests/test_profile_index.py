@@ -0,0 +1,48 @@
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes
+from screener import profile_index
+from screener.core import rank_resumes
+from screener.profile_index import ProfileIndex, get_profile_index, profiles_fingerprint
+
+PROFILES = {jd.doc_id: jd.text for jd in generate_job_descriptions(seed=1)}
+RESUMES = [r.text for r in generate_resumes(40, doc_words=150, seed=2)]
+
+
+def test_scores_match_a_tfidf_fit_on_the_profiles():
+    index = ProfileIndex.build(PROFILES)
+    reference = TfidfVectorizer(stop_words="english").fit(list(PROFILES.values()))
+    expected = (reference.transform(list(PROFILES.values())) @ reference.transform(RESUMES).T).toarray().T
+    np.testing.assert_allclose([index.scores(text) for text in RESUMES], expected, atol=1e-6)
+    np.testing.assert_allclose([list(m.values()) for m in index.match_many(RESUMES)],
+                               -np.sort(-expected, axis=1), atol=1e-6)
+
+
+def test_best_profile_agrees_with_rank_resumes():
+    index = ProfileIndex.build(PROFILES)
+    for text in RESUMES:
+        best = next(iter(index.match(text)))
+        assert best == list(PROFILES)[int(np.argmax(rank_resumes(text, list(PROFILES.values()))))]
+
+
+def test_fingerprint_is_hashed_once_per_dict(monkeypatch):
+    profiles = dict(PROFILES)
+    first = profiles_fingerprint(profiles)
+    monkeypatch.setattr(profile_index.hashlib, "sha256", None)  # any re-hash would fail
+    assert profiles_fingerprint(profiles) == first
+    assert get_profile_index(profiles) is get_profile_index(profiles)
+
+
+def test_changed_profiles_invalidate_the_index():
+    profiles = dict(PROFILES)
+    index = get_profile_index(profiles)
+    profiles["Nurse"] = "registered nurse intensive care patients"
+    changed = get_profile_index(profiles)
+    assert changed is not index and "Nurse" in changed.profile_names
+    assert next(iter(changed.match("intensive care nurse"))) == "Nurse"
+
+    profiles["Nurse"] = "pastry chef bakery desserts"  # edited in place
+    edited = get_profile_index(profiles)
+    assert edited is not changed and next(iter(edited.match("bakery desserts chef"))) == "Nurse"
+    assert profiles_fingerprint(dict(profiles)) == profiles_fingerprint(profiles)
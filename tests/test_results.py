@@ -0,0 +1,107 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+import st_results
+from screener.results import SCORE_BANDS, RankedResults
+
+NAMES = ["a.pdf", "b.pdf", "c.pdf", "d.pdf", "e.pdf"]
+SCORES = [0.5, 0.9, 0.1, 0.9, 0.65]
+
+
+def _csv_rows(data):
+    return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+def _download_data(monkeypatch, render):
+    """The `data` passed to every download button `render()` draws, by key."""
+    captured = {}
+
+    def download_button(self, label, data, *args, key=None, **kwargs):
+        captured[key] = data
+
+    monkeypatch.setattr(DeltaGenerator, "download_button", download_button)
+    render()
+    return captured
+
+
+def test_ranking_order_and_ties():
+    results = RankedResults(NAMES, SCORES)
+    page = results.page(page_size=10)
+    assert page.names == ["b.pdf", "d.pdf", "e.pdf", "a.pdf", "c.pdf"]  # ties keep input order
+    assert page.ranks == [1, 2, 3, 4, 5]
+    assert page.scores[0] == "90.00%"
+    assert results.ranks.dtype == np.int32 and results.scores.dtype == np.float32
+
+
+def test_bands_sorting_and_paging():
+    results = RankedResults(NAMES, SCORES)
+    assert results.band_counts() == {"All scores": 5, "> 80%": 2, "60% - 80%": 1, "40% - 60%": 1, "< 40%": 1}
+    assert results.page(band="> 80%", sort="Name (A-Z)").names == ["b.pdf", "d.pdf"]
+    assert results.page(sort="Worst first", page_size=2).names == ["c.pdf", "a.pdf"]
+    last = results.page(page=99, page_size=2)
+    assert (last.page, last.n_pages, last.names) == (3, 3, ["c.pdf"])
+    with pytest.raises(ValueError):
+        results.page(sort="Random")
+
+
+def test_top_k_and_min_score_narrow_the_selection():
+    results = RankedResults(NAMES, SCORES)
+    page = results.page(page_size=10, top_k=3)
+    assert (page.names, page.ranks, page.n_selected) == (["b.pdf", "d.pdf", "e.pdf"], [1, 2, 3], 3)
+    assert results.page(page_size=10, min_score=0.5).names == ["b.pdf", "d.pdf", "e.pdf", "a.pdf"]
+    assert results.page(sort="Worst first", top_k=3, min_score=0.6).names == ["e.pdf", "d.pdf", "b.pdf"]
+    assert results.page(sort="Name (A-Z)", top_k=2).names == ["b.pdf", "d.pdf"]
+    assert results.band_counts(min_score=0.6)["All scores"] == 3
+
+
+def test_pages_match_the_full_sort_without_making_it():
+    rng = np.random.default_rng(3)
+    scores = np.round(rng.random(2000), 2)  # many ties
+    names = [f"{i}.pdf" for i in range(2000)]
+    expected = RankedResults(names, scores)
+    for band, _, _ in SCORE_BANDS:
+        for sort in ("Best first", "Worst first"):
+            for page_number in (1, 2, 40):
+                results = RankedResults(names, scores)
+                page = results.page(page_number, 25, band, sort)
+                rows = expected.selection(band, sort)[(page.page - 1) * 25:page.page * 25]
+                assert page.rows.tolist() == rows.tolist()
+                assert page.ranks == expected.ranks[rows].tolist()
+                assert results._order is None
+
+
+def test_export_bytes_is_capped():
+    results = RankedResults(NAMES, SCORES)
+    assert st_results.export_bytes(lambda: results.export("csv"), max_bytes=1000)().startswith(b"Rank,")
+    with pytest.raises(ValueError, match="larger than"):
+        st_results.export_bytes(lambda: results.export("csv"), max_bytes=20)()
+
+
+def test_csv_export_is_chunked_and_complete():
+    results = RankedResults(NAMES, SCORES)
+    with results.export("csv", band="All scores", chunk_rows=2) as output:
+        rows = _csv_rows(output.read())
+    assert rows[0] == ["Rank", "Resume File Name", "Match Score (%)"]
+    assert rows[1:] == [["1", "b.pdf", "90.00"], ["2", "d.pdf", "90.00"], ["3", "e.pdf", "65.00"],
+                        ["4", "a.pdf", "50.00"], ["5", "c.pdf", "10.00"]]
+
+
+def test_results_view_downloads_pass_streamlits_conversion(monkeypatch):
+    results = RankedResults(NAMES, SCORES)
+    captured = _download_data(monkeypatch, lambda: st_results.results_view(results, "t"))
+    assert "t_download_csv" in captured
+
+    data, _ = convert_data_to_bytes_and_infer_mime(captured["t_download_csv"](), TypeError("unsupported"))
+    assert _csv_rows(data)[1] == ["1", "b.pdf", "90.00"]
+    assert len(_csv_rows(data)) == 6
+
+    if "t_download_parquet" in captured:
+        pq = pytest.importorskip("pyarrow.parquet")
+        data, _ = convert_data_to_bytes_and_infer_mime(captured["t_download_parquet"](), TypeError("unsupported"))
+        table = pq.read_table(io.BytesIO(data))
+        assert table.column("Resume File Name").to_pylist() == ["b.pdf", "d.pdf", "e.pdf", "a.pdf", "c.pdf"]
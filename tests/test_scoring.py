@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from benchmarks.synthetic import generate_job_descriptions, generate_resumes
+from screener import screen_resumes
+from screener.extraction import ExtractionResult
+from screener.hashing import rank_documents_hashed, score_matrix_hashed
+from screener.scoring import rank_batches, rank_documents, rank_documents_with_stats, score_matrix, top_k_indices
+
+TEXTS = [r.text for r in generate_resumes(60, doc_words=80, seed=5)]
+JDS = [jd.text for jd in generate_job_descriptions(3, seed=6)]
+
+
+def _reference(queries, documents):
+    """Dense sklearn TF-IDF + cosine similarity, fitted over queries and documents together."""
+    matrix = TfidfVectorizer(stop_words="english").fit_transform(list(queries) + list(documents)).toarray()
+    return cosine_similarity(matrix[:len(queries)], matrix[len(queries):])
+
+
+def test_rank_documents_matches_sklearn():
+    np.testing.assert_allclose(rank_documents(JDS[0], TEXTS), _reference(JDS[:1], TEXTS)[0], atol=1e-12)
+    scores, stats = rank_documents_with_stats(JDS[0], TEXTS)
+    assert stats["n_documents"] == len(TEXTS) and stats["nnz"] > 0 and stats["peak_memory_bytes"] > 0
+
+
+def test_score_matrix_shares_one_fit():
+    np.testing.assert_allclose(score_matrix(JDS, TEXTS), _reference(JDS, TEXTS), atol=1e-12)
+
+
+def test_rank_batches_matches_separate_rankings():
+    batches = [TEXTS[:10], TEXTS[10:45], TEXTS[45:]]
+    for scores, batch in zip(rank_batches(JDS[1], batches), batches):
+        np.testing.assert_allclose(scores, rank_documents(JDS[1], batch), atol=1e-12)
+
+
+def test_hashed_engine_agrees_with_the_exact_one():
+    # 2^20 columns: no collisions in a vocabulary this small
+    np.testing.assert_allclose(rank_documents_hashed(JDS[0], iter(TEXTS), chunk_size=7),
+                               rank_documents(JDS[0], TEXTS), atol=1e-6)
+    np.testing.assert_allclose(score_matrix_hashed(JDS, TEXTS), score_matrix(JDS, TEXTS), atol=1e-6)
+
+
+@pytest.mark.parametrize("k, min_score, expected", [
+    (None, None, [1, 3, 4, 0, 2]),  # ties keep input order
+    (2, None, [1, 3]),
+    (10, None, [1, 3, 4, 0, 2]),
+    (0, None, []),
+    (None, 0.5, [1, 3, 4, 0]),
+    (3, 0.7, [1, 3]),
+])
+def test_top_k_indices(k, min_score, expected):
+    assert top_k_indices([0.5, 0.9, 0.1, 0.9, 0.65], k, min_score).tolist() == expected
+
+
+def test_top_k_indices_breaks_ties_at_the_cut_by_input_order():
+    scores = np.array([0.2, 0.5] * 50 + [0.9])
+    assert top_k_indices(scores, 4).tolist() == [100, 1, 3, 5]
+    for k in (1, 10, 51, 60):
+        assert top_k_indices(scores, k).tolist() == np.argsort(-scores, kind="stable")[:k].tolist()
+
+
+def test_screen_resumes_reports_skipped_files():
+    results = [
+        ExtractionResult(0, "a.pdf", TEXTS[0], [], None),
+        ExtractionResult(1, "empty.pdf", "  ", [], None),
+        ExtractionResult(2, "broken.pdf", "", [], "PdfReadError: EOF marker not found"),
+        ExtractionResult(3, "b.pdf", TEXTS[1], ["page 2: unreadable"], None, True),
+    ]
+    ranking = screen_resumes(JDS[0], results, dedup=False)
+    assert ranking.names == ["a.pdf", "b.pdf"]
+    assert ranking.scores.dtype == np.float32
+    np.testing.assert_allclose(ranking.scores, rank_documents(JDS[0], TEXTS[:2]), rtol=1e-6)
+    assert [(w.code, w.name) for w in ranking.warnings] == [
+        ("empty_text", "empty.pdf"), ("unreadable_file", "broken.pdf"),
+        ("page_unreadable", "b.pdf"), ("truncated", "b.pdf")]
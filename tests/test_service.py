@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import service
+from benchmarks.synthetic import make_pdf
+from screener import extraction
+
+PROFILES = {"Backend": "python django rest api postgresql docker",
+            "Designer": "figma wireframes usability research prototypes"}
+
+fork_only = pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                               reason="the patched parser only reaches forked workers")
+
+
+def _call(app, method, path, body=None):
+    """`(status, payload)` of one request through the ASGI app."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps(body or {}).encode(), "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app({"type": "http", "method": method, "path": path}, receive, send))
+    return messages[0]["status"], json.loads(messages[1]["body"])
+
+
+_parse_pdf_bytes = extraction.parse_pdf_bytes
+
+
+def _flaky_parse(data, name="", **options):
+    if data == b"hang":
+        time.sleep(60)
+    if data == b"crash":
+        os._exit(1)
+    return _parse_pdf_bytes(data, name, **options)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(extraction, "parse_pdf_bytes", _flaky_parse)  # before the workers fork
+    scoring = service.ScoringService(job_profiles=PROFILES, pdf_workers=1, pdf_timeout=1)
+    app = service.create_app(scoring)
+    scoring.start()
+    yield app
+    scoring.stop()
+
+
+def test_rank_orders_and_cuts(app):
+    resumes = [{"name": "designer", "text": "figma usability research"},
+               {"name": "backend", "text": "python django docker postgresql"},
+               {"name": "empty", "text": "   "}]
+    status, body = _call(app, "POST", "/v1/rank", {"job_description": "python django developer",
+                                                   "resumes": resumes, "top_k": 1})
+    assert status == 200
+    assert [r["name"] for r in body["results"]] == ["backend"]
+    assert body["n_scored"] == 2
+    assert [w["code"] for w in body["warnings"]] == ["empty_text"]
+
+
+@pytest.mark.parametrize("extra, message", [
+    ({"top_k": "3"}, "'top_k' must be a positive integer"),
+    ({"top_k": 0}, "'top_k' must be a positive integer"),
+    ({"top_k": True}, "'top_k' must be a positive integer"),
+    ({"min_score": "0.5"}, "'min_score' must be a number between 0 and 1"),
+    ({"min_score": 1.5}, "'min_score' must be a number between 0 and 1"),
+    ({"resumes": ["plain string"]}, "resumes[0] must be an object"),
+])
+def test_rank_rejects_bad_parameters(app, extra, message):
+    body = {"job_description": "python", "resumes": [{"text": "python"}], **extra}
+    assert _call(app, "POST", "/v1/rank", body) == (400, {"error": message})
+
+
+def test_match_validates_top_k(app):
+    assert _call(app, "POST", "/v1/match", {"resume_text": "figma", "top_k": "1"})[0] == 400
+    status, body = _call(app, "POST", "/v1/match", {"resume_text": "figma usability", "top_k": 1})
+    assert status == 200 and [m["profile"] for m in body["matches"]] == ["Designer"]
+
+
+@fork_only
+def test_hung_and_crashed_pdfs_do_not_take_the_workers_down(app):
+    good = base64.b64encode(make_pdf("python django docker engineer")).decode()
+    resumes = [{"name": "hangs.pdf", "pdf_base64": base64.b64encode(b"hang").decode()},
+               {"name": "crashes.pdf", "pdf_base64": base64.b64encode(b"crash").decode()},
+               {"name": "good.pdf", "pdf_base64": good}]
+    status, body = _call(app, "POST", "/v1/rank", {"job_description": "python django", "resumes": resumes})
+    assert status == 200
+    assert [r["name"] for r in body["results"]] == ["good.pdf"]
+    messages = {w["name"]: w["message"] for w in body["warnings"]}
+    assert "timed out" in messages["hangs.pdf"] and "crashed" in messages["crashes.pdf"]
+
+    # The single worker was replaced both times and still parses new uploads
+    assert _call(app, "GET", "/v1/stats")[1]["pdf_workers"]["replaced"] == 2
+    fresh = base64.b64encode(make_pdf("figma wireframes usability")).decode()
+    status, body = _call(app, "POST", "/v1/match", {"pdf_base64": fresh})
+    assert status == 200 and body["matches"][0]["profile"] == "Designer"
+
+
+def test_traces_include_the_stages_run_in_worker_threads(app):
+    body = {"job_description": "python django", "resumes": [{"name": "a", "text": "python django"}], "trace": True}
+    status, response = _call(app, "POST", "/v1/rank", body)
+    assert status == 200
+    stages = [s["stage"] for s in response["timings"]["stages"]]
+    assert {"tokenize", "score_batches", "score_batched"} <= set(stages)
+
+
+def test_unexpected_errors_are_logged_not_returned(app, monkeypatch, caplog):
+    def broken(*args):
+        raise RuntimeError("secret path /srv/data")
+
+    monkeypatch.setattr(service, "_rank_batch", broken)
+    body = {"job_description": "python", "resumes": [{"text": "python"}]}
+    with caplog.at_level("ERROR", logger="screener.service"):
+        assert _call(app, "POST", "/v1/rank", body) == (500, {"error": "internal server error"})
+    assert "secret path" in caplog.text
+
+
+def test_importing_builds_no_app():
+    assert not hasattr(service, "app")
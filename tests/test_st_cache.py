@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import st_cache
+from screener.hashing import rank_documents_hashed
+from screener.scoring import rank_documents
+
+JD = "python django postgresql docker"
+RESUMES = ["python django developer", "java spring developer", "python django developer", "registered nurse"]
+
+
+@pytest.mark.parametrize("engine, expected", [
+    ("tfidf", rank_documents),
+    ("hashing", rank_documents_hashed),
+])
+def test_rank_incremental_uses_the_requested_engine(engine, expected):
+    scores = st_cache.rank_incremental("test", JD, RESUMES, engine=engine)
+    np.testing.assert_allclose(scores, expected(JD, RESUMES), atol=1e-6)
+    # A rerun with a late resume gives the same scores as a full ranking
+    scores = st_cache.rank_incremental("test", JD, RESUMES + ["docker engineer"], engine=engine)
+    np.testing.assert_allclose(scores, expected(JD, RESUMES + ["docker engineer"]), atol=1e-6)
+
+
+def test_rank_incremental_follows_the_default_engine(monkeypatch):
+    monkeypatch.setattr(st_cache, "DEFAULT_ENGINE", "hashing")
+    np.testing.assert_allclose(st_cache.rank_incremental("test", JD, RESUMES), rank_documents_hashed(JD, RESUMES))
+
+
+def test_rank_incremental_rejects_unknown_engines():
+    with pytest.raises(ValueError):
+        st_cache.rank_incremental("test", JD, RESUMES, engine="bm25")
@@ -0,0 +1,43 @@
+import pytest
+
+from screener.structure import StructureMatcher
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return StructureMatcher.from_profiles()
+
+
+def degrees(matcher, text):
+    found, _ = matcher.scan(text)
+    return sorted(matcher.terms[t].name for t in found if matcher.terms[t].kind == "degree")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("B.E. in Computer Science", ["b.e"]),
+    ("B. S. Mathematics, 2015", ["b.s"]),
+    ("Ph.D. in physics", ["ph.d"]),
+    ("M.Sc Data Science", ["m.sc"]),
+    ("Master of Science in Statistics", ["master"]),
+    ("Master's degree in Economics", ["master"]),
+    ("Masters degree, Bachelor of Arts", ["bachelor", "master"]),
+    ("PhD, MBA", ["mba", "phd"]),
+])
+def test_degree_mentions(matcher, text, expected):
+    assert degrees(matcher, text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Certified Scrum Master for three agile teams",
+    "Plan b e was to ship early",
+    "Going from plan a to plan b s quickly",
+    "See the docs at example.be or e.g. b.sx",
+])
+def test_ordinary_text_is_not_a_degree(matcher, text):
+    assert degrees(matcher, text) == []
+
+
+def test_degree_level_uses_the_highest_mention(matcher):
+    features = matcher.extract_many(["B.S. then Master of Science", "Scrum Master, B.E.", "Scrum Master"])
+    assert features.degree_level.tolist() == [3, 2, 0]
+    assert matcher.requirements("Requires a B.E. or Master's degree").degree_level == 2
@@ -0,0 +1,84 @@
+import base64
+import io
+import os
+import random
+import sqlite3
+
+from screener import text_cache
+from screener.text_cache import TextCache, content_key, read_file_bytes
+
+
+def _text(seed, n_bytes=3000):
+    return base64.b64encode(random.Random(seed).randbytes(n_bytes)).decode("ascii")  # barely compressible
+
+
+def test_round_trip_and_keys(tmp_path):
+    cache = TextCache(str(tmp_path / "texts.sqlite"))
+    key = content_key(b"%PDF-1.4 ...", "v1")
+    assert key != content_key(b"%PDF-1.4 ...", "v2")
+    assert cache.get(key) is None
+    cache.put(key, "résumé text")
+    assert cache.get(key) == "résumé text"
+    # A new process (here: a new instance) reads it back from disk
+    assert TextCache(cache.path).get(key) == "résumé text"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entries_keep_page_warnings_and_truncation(tmp_path):
+    cache = TextCache(str(tmp_path / "texts.sqlite"))
+    cache.put("k", "text", ["Could not extract text from page 2"], truncated=True)
+    for reader in (cache, TextCache(cache.path)):  # memory, then disk
+        assert reader.get_entry("k") == ("text", ("Could not extract text from page 2",), True)
+        assert reader.get("k") == "text"
+
+
+def test_stores_without_warning_columns_are_upgraded(tmp_path):
+    path = str(tmp_path / "texts.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, text BLOB NOT NULL, size INTEGER NOT NULL,"
+                     " last_access REAL NOT NULL)")
+    cache = TextCache(path)
+    cache.put("k", "text", ["w"], True)
+    assert TextCache(path).get_entry("k") == ("text", ("w",), True)
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    cache = TextCache(str(tmp_path / "texts.sqlite"), max_disk_bytes=20000, max_memory_entries=0)
+    for i in range(5):
+        cache.put(f"k{i}", _text(i))
+    cache.get("k0")  # now the most recently used
+    for i in range(5, 8):
+        cache.put(f"k{i}", _text(i))
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 20000
+    assert cache._disk_bytes == stats["disk_bytes"]  # the running size matches the table
+    assert cache.get("k0") is not None and cache.get("k7") is not None
+    assert cache.get("k1") is None
+
+
+def test_running_size_follows_replacements_and_other_writers(tmp_path, monkeypatch):
+    path = str(tmp_path / "texts.sqlite")
+    cache, other = TextCache(path, max_disk_bytes=12000), TextCache(path, max_disk_bytes=12000)
+    cache.put("a", _text(1))
+    cache.put("a", _text(2, 1000))  # replacing an entry does not count it twice
+    assert cache._disk_bytes == cache.stats()["disk_bytes"]
+
+    for i in range(3):
+        other.put(f"o{i}", _text(10 + i))
+    cache.put("b", _text(3))
+    assert cache.stats()["disk_bytes"] > 12000  # the other writer's entries are not counted yet
+
+    monkeypatch.setattr(text_cache, "SIZE_RESYNC_SECONDS", 0.0)
+    cache.put("c", "small")
+    assert cache.stats()["disk_bytes"] <= 12000
+
+
+def test_read_file_bytes(tmp_path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"data")
+    handle = io.BytesIO(b"xxdata")
+    handle.seek(2)
+    assert read_file_bytes(str(path)) == read_file_bytes(os.fspath(path)) == b"data"
+    assert read_file_bytes(handle) == b"xxdata" and handle.tell() == 2
+    assert read_file_bytes(bytearray(b"raw")) == b"raw"
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from screener import tokens
+from screener.incremental import CandidateCorpus
+from screener.structure import StructureMatcher
+
+JD = "Senior Python engineer: 5 years of Django, PostgreSQL and AWS; CI/CD a plus."
+RESUMES = [
+    "Python developer, 6 years of Django and PostgreSQL. Built CI/CD pipelines on AWS.",
+    "Java engineer with Spring and Kafka experience; some Python scripting.",
+    "Registered nurse, 10 years in intensive care.",
+    "The and of a",  # stop words only
+]
+
+
+@pytest.fixture
+def retire_vocabulary(monkeypatch):
+    """Fill the shared vocabulary so the next caller gets a new one; returns the new one."""
+    def retire():
+        before = tokens.current_vocabulary()
+        monkeypatch.setattr(tokens, "MAX_VOCABULARY_WORDS", len(before) + 1)
+        tokens.token_ids("unseenword%d" % id(before))
+        after = tokens.current_vocabulary()
+        assert after is not before and len(after) == 0
+        return after
+    return retire
+
+
+def test_tfidf_matches_sklearn():
+    expected = TfidfVectorizer(stop_words="english").fit_transform([JD] + RESUMES)
+    vectorizer = tokens.TermTfidfVectorizer()
+    actual = vectorizer.fit_transform([JD] + RESUMES)
+    assert vectorizer.terms == sorted(TfidfVectorizer(stop_words="english").fit([JD] + RESUMES).vocabulary_)
+    np.testing.assert_allclose(actual.toarray(), expected.toarray(), atol=1e-12)
+
+
+def test_cache_is_keyed_by_digest():
+    text = "a resume that must not be kept alive by the token cache " * 10
+    ids = tokens.token_ids(text)
+    assert tokens.token_ids(text) is ids
+    assert all(isinstance(key, bytes) and len(key) == 16 for key in tokens._cache)
+    assert text not in tokens._cache
+
+
+def test_vocabulary_is_replaced_when_full(retire_vocabulary):
+    text = "cached before the reset"
+    old_ids = tokens.token_ids(text)
+    vocabulary = retire_vocabulary()
+    assert not tokens._cache
+    new_ids = tokens.token_ids(text)
+    assert new_ids is not old_ids and len(vocabulary) == 4
+    assert [vocabulary.words[i] for i in new_ids] == ["cached", "before", "the", "reset"]
+
+
+def test_results_survive_a_vocabulary_reset(retire_vocabulary):
+    vectorizer = tokens.TermTfidfVectorizer()
+    vectorizer.fit([JD] + RESUMES)
+    matcher = StructureMatcher.from_profiles()
+    corpus = CandidateCorpus(JD)
+    corpus.sync({i: text for i, text in enumerate(RESUMES)})
+    before = (vectorizer.transform(RESUMES).toarray(), [matcher.scan(text) for text in RESUMES], corpus.scores()[1])
+
+    retire_vocabulary()
+    corpus.add("late", "Python and Django engineer")
+    after = (vectorizer.transform(RESUMES).toarray(), [matcher.scan(text) for text in RESUMES], corpus.scores()[1])
+
+    np.testing.assert_allclose(after[0], before[0])
+    assert after[1] == before[1]
+    expected = CandidateCorpus(JD)
+    expected.sync({**{i: text for i, text in enumerate(RESUMES)}, "late": "Python and Django engineer"})
+    np.testing.assert_allclose(after[2], expected.scores()[1])